@@ -1,4 +1,14 @@
+import os
+
 # NCS
 DIMACS_WORKINGFILE_PATH = "./src/ncs/workingfile.cnf"
 DIMACS_WORKINGFILE_PATH_RELAXED = "./src/ncs/workingfile_relaxed.wcnf"
 GOPHERSAT_PATH = "./src/ncs/gophersat"
+
+# Cache des données générées
+DATASET_CACHE_PATH = "./datasets_cache"
+DATASET_CACHE_MAX_BYTES = 1 << 30
+
+# Solveur des programmes linéaires MR-Sort ("gurobi" ou "highs"), modifiable par la
+# variable d'environnement MILP_BACKEND
+MILP_BACKEND = os.environ.get("MILP_BACKEND", "gurobi")
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Mapping, Optional
+import numpy as np
+
+from src.datasets.dataset import label_dtype
+from src.datasets.partition import Partition
+
+# Bornes de la taille des lots tirés à chaque étape
+MIN_BATCH_SIZE = 1 << 10
+MAX_BATCH_SIZE = 1 << 20
+
+
+def generate_balanced(
+    generator: Any,
+    counts: Mapping[Any, int],
+    noise: Optional[float] = None,
+    noise_model: Optional[str] = None,
+    max_rows: int = 100_000_000,
+) -> Partition:
+    """
+    Pour générer exactement counts[catégorie] données de chaque catégorie
+    Les données sont tirées par lots et seules les lignes des catégories encore
+    incomplètes sont gardées. La taille du lot suivant est calculée à partir de la
+    fréquence observée des catégories manquantes, pour qu'un lot suffise en général
+    :param generator: un générateur du projet (avec les méthodes sample et partition)
+    :param counts: le nombre de données voulu pour chaque catégorie, sous la forme {catégorie: nombre}
+    :param noise: la variance du bruit blanc à ajouter aux données (les catégories sont celles des données non bruitées)
+    :param noise_model: "row" ou "element" (par défaut, celui du générateur)
+    :param max_rows: le nombre maximal de lignes à tirer avant d'abandonner
+    :return: les données sous la forme {catégorie: ensembles de notes}
+    """
+    names = generator.partition(*generator.sample(0)).names
+    wanted = np.zeros(len(names), dtype=np.int64)
+    for name, count in counts.items():
+        wanted[names.index(name)] = count
+    missing = wanted.copy()
+    seen = np.zeros(len(names), dtype=np.int64)
+    found: Dict[int, list] = {label: [] for label in range(len(names))}
+    nb_drawn = 0
+    batch_size = MIN_BATCH_SIZE
+
+    while missing.any():
+        if nb_drawn >= max_rows:
+            rare = [names[label] for label in np.flatnonzero(missing)]
+            raise ValueError(
+                f"Catégories trop rares après {nb_drawn} tirages: {rare} "
+                f"(fréquences observées: {(seen / nb_drawn).tolist()})"
+            )
+        if noise_model is None:
+            data, labels = generator.sample(batch_size, noise)
+        else:
+            data, labels = generator.sample(batch_size, noise, noise_model)
+        nb_drawn += batch_size
+        seen += np.bincount(labels, minlength=len(names))
+        for label in np.flatnonzero(missing):
+            rows = np.flatnonzero(labels == label)[: missing[label]]
+            found[label].append(data[rows])
+            missing[label] -= len(rows)
+
+        # fréquence estimée (a priori uniforme) des catégories manquantes
+        rates = (seen[missing > 0] + 1) / (nb_drawn + 2)
+        needed = (missing[missing > 0] / rates).max() if missing.any() else 0
+        batch_size = int(np.clip(1.2 * needed, MIN_BATCH_SIZE, MAX_BATCH_SIZE))
+        batch_size = min(batch_size, max(max_rows - nb_drawn, 1))
+
+    blocks = [block for label in range(len(names)) for block in found[label]]
+    if not blocks:
+        return generator.partition(*generator.sample(0))
+    data = np.concatenate(blocks)
+    labels = np.repeat(np.arange(len(names), dtype=label_dtype(len(names))), wanted)
+    return generator.partition(data, labels)
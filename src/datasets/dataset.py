@@ -0,0 +1,236 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+from src.datasets.partition import Partition
+
+
+def label_dtype(nb_labels: int) -> np.dtype:
+    """
+    Pour choisir le plus petit type entier signé pouvant contenir les étiquettes
+    :param nb_labels: le nombre d'étiquettes possibles, de 0 à nb_labels - 1
+    :return: le type (int8 jusqu'à 128 étiquettes, puis int16...)
+    """
+    # le plus petit type signé contenant -nb_labels contient aussi nb_labels - 1
+    return np.promote_types(np.int8, np.min_scalar_type(-max(int(nb_labels), 1)))
+
+
+def grade_dtype(max_grade: int) -> np.dtype:
+    """
+    Pour choisir le plus petit type entier non signé pouvant contenir les notes
+    :param max_grade: la note maximale
+    :return: le type (uint8 jusqu'à 255, puis uint16...)
+    """
+    return np.min_scalar_type(int(max_grade))
+
+
+def stack_classified(
+    classified: Dict[Any, Any], categories: Optional[Sequence[Any]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pour rassembler des données classées par catégorie en un tableau de notes et un tableau d'étiquettes
+    :param classified: les données sous la forme {catégorie: ensembles de notes}
+    :param categories: les noms des catégories, l'étiquette étant la position dans la liste (par défaut, les clés sont les étiquettes)
+    :return: le tableau (nb_données, nb_notes) des notes et le tableau des étiquettes (voir label_dtype)
+             Pour une Partition ou un Dataset, ses tableaux sont renvoyés sans copie, dans l'ordre d'origine
+    """
+    if isinstance(classified, Partition) and (
+        categories is None or list(categories) == classified.names
+    ):
+        return classified.data, classified.labels
+    if isinstance(classified, Dataset) and (
+        categories is None or list(categories) == classified.names
+    ):
+        return classified.grades, classified.labels
+    if categories is None:
+        nb_labels = max(classified.keys(), default=-1) + 1
+    else:
+        nb_labels = len(categories)
+    dtype = label_dtype(nb_labels)
+    blocks = []
+    labels = []
+    for category, grades in classified.items():
+        grades = np.asarray(grades)
+        if grades.size == 0:
+            continue
+        blocks.append(grades.reshape(len(grades), -1))
+        label = category if categories is None else list(categories).index(category)
+        labels.append(np.full(len(grades), label, dtype=dtype))
+    if not blocks:
+        return np.zeros((0, 0)), np.zeros(0, dtype=dtype)
+    return np.concatenate(blocks), np.concatenate(labels)
+
+
+class Dataset:
+    """
+    Données étiquetées: une matrice contiguë de notes, un tableau d'étiquettes (int8
+    jusqu'à 128 catégories, voir label_dtype) et, éventuellement, le poids de chaque
+    ligne (par exemple son nombre d'occurrences)
+    L'étiquette d'une ligne est la position de sa catégorie dans names. Aucun objet n'est
+    créé par ligne, et np.asarray(dataset) renvoie la matrice des notes, ce qui permet de
+    passer un Dataset directement aux méthodes classify_many des classifieurs.
+    """
+
+    __slots__ = ("grades", "labels", "weights", "names")
+
+    def __init__(
+        self,
+        grades: np.ndarray,
+        labels: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        names: Optional[Sequence[Any]] = None,
+    ):
+        """
+        Pour initialiser les données
+        :param grades: la matrice (nb_données, nb_notes) des notes
+        :param labels: l'étiquette de chaque ligne
+        :param weights: le poids de chaque ligne, None si toutes les lignes comptent une fois
+        :param names: le nom de chaque étiquette (par défaut, l'étiquette elle-même)
+        """
+        self.grades = np.ascontiguousarray(grades)
+        labels = np.asarray(labels)
+        if names is None:
+            names = range(int(labels.max()) + 1 if len(labels) else 0)
+        self.names = list(names)
+        if len(labels) and not 0 <= labels.min() <= labels.max() < len(self.names):
+            raise ValueError(
+                f"Les étiquettes doivent être comprises entre 0 et {len(self.names) - 1}"
+            )
+        self.labels = labels.astype(label_dtype(len(self.names)), copy=False)
+        self.weights = None if weights is None else np.asarray(weights)
+
+    @classmethod
+    def from_classified(
+        cls,
+        classified: Union[Mapping[Any, Any], "Dataset"],
+        categories: Optional[Sequence[Any]] = None,
+    ) -> "Dataset":
+        """
+        Pour construire les données à partir du format {catégorie: ensembles de notes}
+        Une Partition (renvoyée par les générateurs et les classifieurs) est convertie sans copie
+        :param classified: les données sous la forme {catégorie: ensembles de notes}, ou un Dataset
+        :param categories: les noms des catégories, l'étiquette étant la position dans la liste (par défaut, les clés sont les étiquettes)
+        :return: les données
+        """
+        if isinstance(classified, Dataset):
+            return classified
+        if categories is None and isinstance(classified, Partition):
+            categories = classified.names
+        grades, labels = stack_classified(classified, categories)
+        if categories is None:
+            categories = range(max(classified.keys(), default=-1) + 1)
+        return cls(grades, labels, names=categories)
+
+    def to_partition(self) -> Partition:
+        """
+        Pour regrouper les données par catégorie
+        :return: les données sous la forme {catégorie: ensembles de notes}
+        """
+        return Partition(self.grades, self.labels, len(self.names), self.names)
+
+    def to_dict(self) -> Dict[Any, np.ndarray]:
+        """
+        Pour obtenir les données sous la forme d'un dictionnaire {catégorie: ensembles de notes}
+        :return: le dictionnaire, de la plus haute catégorie à la plus basse
+        """
+        return dict(self.to_partition())
+
+    def category_weights(self, name: Any) -> np.ndarray:
+        """
+        Pour obtenir le poids des lignes d'une catégorie
+        :param name: la catégorie
+        :return: le poids de chaque ligne, dans l'ordre de to_partition()[name] (1 sans poids)
+        """
+        rows = self.labels == self.names.index(name)
+        if self.weights is None:
+            return np.ones(int(rows.sum()), dtype=np.int64)
+        return self.weights[rows]
+
+    def positions(self) -> np.ndarray:
+        """
+        Pour connaître la position de chaque ligne dans sa catégorie
+        :return: pour chaque ligne, son indice dans to_partition()[catégorie]
+        """
+        order = np.argsort(self.labels, kind="stable")
+        counts = np.bincount(self.labels, minlength=len(self.names))
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        positions = np.empty(len(self), dtype=np.int64)
+        positions[order] = np.arange(len(self)) - starts[self.labels[order]]
+        return positions
+
+    def collapse(
+        self, return_inverse: bool = False
+    ) -> Union["Dataset", Tuple["Dataset", np.ndarray]]:
+        """
+        Pour regrouper les lignes identiques (mêmes notes et même étiquette) en une seule
+        Le poids d'une ligne gardée est la somme des poids des lignes qu'elle remplace,
+        c'est-à-dire leur nombre d'occurrences quand les données n'ont pas de poids. Les
+        lignes gardées sont triées par étiquette puis par notes.
+        :param return_inverse: pour renvoyer aussi, pour chaque ligne d'origine, l'indice de la ligne qui la remplace
+        :return: les données sans doublon, avec leurs poids (et l'indice de remplacement de chaque ligne)
+        """
+        if len(self) == 0:
+            weights = np.zeros(0) if self.weights is None else self.weights
+            collapsed = Dataset(self.grades, self.labels, weights, self.names)
+            inverse = np.zeros(0, dtype=np.int64)
+            return (collapsed, inverse) if return_inverse else collapsed
+        # tri lexicographique par étiquette puis par notes (plus rapide que np.unique
+        # avec axis=0, qui compare des lignes entières)
+        keys = np.column_stack((self.labels, self.grades))
+        order = np.lexsort(keys.T[::-1])
+        sorted_keys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)
+        index = order[first]
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.cumsum(first) - 1
+        weights = np.bincount(inverse, weights=self.weights, minlength=len(index))
+        collapsed = Dataset(self.grades[index], self.labels[index], weights, self.names)
+        return (collapsed, inverse) if return_inverse else collapsed
+
+    def expand_rows(
+        self,
+        collapsed: "Dataset",
+        inverse: np.ndarray,
+        rows: Sequence[Tuple[Any, int]],
+    ) -> List[Tuple[Any, int]]:
+        """
+        Pour retrouver les lignes d'origine correspondant à des lignes des données regroupées
+        :param collapsed: les données renvoyées par collapse
+        :param inverse: l'indice de remplacement de chaque ligne, renvoyé par collapse
+        :param rows: des lignes des données regroupées, sous la forme (catégorie, position dans la catégorie)
+        :return: toutes les lignes d'origine remplacées par ces lignes, sous la même forme
+        """
+        selected = np.zeros(len(collapsed), dtype=bool)
+        collapsed_rows = {
+            name: np.flatnonzero(collapsed.labels == label)
+            for label, name in enumerate(collapsed.names)
+        }
+        for name, position in rows:
+            selected[collapsed_rows[name][position]] = True
+        original = np.flatnonzero(selected[inverse])
+        positions = self.positions()[original]
+        return sorted(
+            (self.names[label], int(position))
+            for label, position in zip(self.labels[original].tolist(), positions)
+        )
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self.grades if dtype is None else self.grades.astype(dtype)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __repr__(self) -> str:
+        counts = np.bincount(self.labels, minlength=len(self.names))
+        return f"Dataset({dict(zip(self.names, counts.tolist()))})"
+
+
+def as_classified(data: Union[Mapping[Any, Any], Dataset]) -> Mapping[Any, Any]:
+    """
+    Pour obtenir des données sous la forme {catégorie: ensembles de notes}, quel que soit
+    leur format
+    :param data: un Dataset, une Partition ou un dictionnaire
+    :return: une Partition pour un Dataset, les données elles-mêmes sinon
+    """
+    if isinstance(data, Dataset):
+        return data.to_partition()
+    return data
@@ -0,0 +1,125 @@
+from typing import List, Tuple
+import numpy as np
+
+from src.datasets.dataset import Dataset
+
+# Nombre de lignes comparées d'un coup aux lignes déjà gardées
+DEFAULT_BLOCK_SIZE = 1024
+
+# Nombre de lignes gardées auxquelles chaque bloc est d'abord comparé
+MIN_PIVOTS = 16
+
+
+def skyline(
+    grades: np.ndarray, maximal: bool = False, block_size: int = DEFAULT_BLOCK_SIZE
+) -> np.ndarray:
+    """
+    Pour trouver les ensembles de notes Pareto-minimaux (ou maximaux) d'une matrice sans doublon
+    Les lignes sont triées par somme croissante: une ligne ne peut être dominée que par
+    une ligne placée avant elle, et il suffit de la comparer aux lignes minimales déjà
+    trouvées et aux lignes de son bloc
+    :param grades: la matrice (nb_données, nb_notes) des notes, sans ligne en double
+    :param maximal: pour chercher les lignes maximales plutôt que minimales
+    :param block_size: le nombre de lignes comparées d'un coup
+    :return: les indices (croissants) des lignes qui ne sont dominées par aucune autre
+    """
+    grades = np.asarray(grades)
+    if maximal:
+        grades = -grades.astype(np.result_type(grades, np.int8))
+    order = np.argsort(grades.sum(axis=1), kind="stable")
+    kept = np.zeros(0, dtype=np.int64)
+    for start in range(0, len(order), block_size):
+        block = order[start : start + block_size]
+        # les lignes minimales déjà trouvées sont prises par paquets de taille
+        # croissante: les premières (de petite somme) éliminent en général presque
+        # tout le bloc
+        pivot, nb_pivots = 0, MIN_PIVOTS
+        while pivot < len(kept) and len(block):
+            pivots = grades[kept[pivot : pivot + nb_pivots]]
+            dominated = (pivots[:, None, :] <= grades[block][None, :, :]).all(axis=2)
+            block = block[~dominated.any(axis=0)]
+            pivot, nb_pivots = pivot + nb_pivots, min(2 * nb_pivots, block_size)
+        # dominées par une autre ligne du bloc (sans doublon, l'égalité est exclue)
+        rows = grades[block]
+        inside = (rows[:, None, :] <= rows[None, :, :]).all(axis=2)
+        np.fill_diagonal(inside, False)
+        kept = np.concatenate([kept, block[~inside.any(axis=0)]])
+    return np.sort(kept)
+
+
+def prune_dominated(
+    dataset: Dataset, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Tuple[Dataset, int]:
+    """
+    Pour supprimer les lignes redondantes pour un modèle monotone (MR-Sort, NCS sans intervalles)
+    Une ligne d'une catégorie qui domine une autre ligne de la même catégorie est
+    forcément classée au moins aussi haut, et une ligne dominée par une autre est
+    classée au plus aussi haut: seules les lignes minimales (sauf pour la plus basse
+    catégorie) et maximales (sauf pour la plus haute) de chaque catégorie contraignent
+    le modèle. Les lignes en double sont d'abord regroupées avec collapse.
+    :param dataset: les données
+    :param block_size: le nombre de lignes comparées d'un coup
+    :return: les données réduites et le nombre de lignes supprimées
+    """
+    collapsed = dataset.collapse()
+    nb_labels = len(collapsed.names)
+    kept = []
+    minimal = []
+    maximal = []
+    for label in range(nb_labels):
+        rows = np.flatnonzero(collapsed.labels == label)
+        grades = collapsed.grades[rows]
+        lower = rows[skyline(grades, False, block_size)]
+        upper = rows[skyline(grades, True, block_size)]
+        minimal.append(lower)
+        maximal.append(upper)
+        if label == 0:
+            kept.append(upper)
+        elif label == nb_labels - 1:
+            kept.append(lower)
+        else:
+            kept.append(np.union1d(lower, upper))
+    check_consistency(collapsed, minimal, maximal, block_size)
+
+    rows = np.concatenate(kept) if kept else np.zeros(0, dtype=np.int64)
+    pruned = Dataset(
+        collapsed.grades[rows],
+        collapsed.labels[rows],
+        collapsed.weights[rows],
+        collapsed.names,
+    )
+    return pruned, len(dataset) - len(pruned)
+
+
+def check_consistency(
+    dataset: Dataset,
+    minimal: List[np.ndarray],
+    maximal: List[np.ndarray],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> None:
+    """
+    Pour vérifier qu'aucune ligne n'est dominée par une ligne d'une catégorie plus basse,
+    auquel cas aucun modèle monotone ne peut classer correctement les données
+    Il suffit de comparer les lignes minimales de chaque catégorie aux lignes maximales
+    des catégories plus basses
+    :param dataset: les données, sans ligne en double
+    :param minimal: pour chaque étiquette, les indices de ses lignes minimales
+    :param maximal: pour chaque étiquette, les indices de ses lignes maximales
+    :param block_size: le nombre de lignes comparées d'un coup
+    :return: None
+    """
+    for label in range(1, len(minimal)):
+        below = np.concatenate(maximal[:label])
+        ceilings = dataset.grades[below]
+        for start in range(0, len(minimal[label]), block_size):
+            rows = minimal[label][start : start + block_size]
+            grades = dataset.grades[rows]
+            dominated = (grades[:, None, :] <= ceilings[None, :, :]).all(axis=2)
+            if dominated.any():
+                row, other = np.argwhere(dominated)[0]
+                raise ValueError(
+                    "Données incohérentes: "
+                    f"{grades[row].tolist()} ({dataset.names[label]}) est dominé par "
+                    f"{ceilings[other].tolist()} "
+                    f"({dataset.names[dataset.labels[below[other]]]})"
+                )
@@ -0,0 +1,42 @@
+from typing import Optional
+import numpy as np
+
+# "row": un même bruit pour toutes les notes d'une ligne, "element": un bruit par note
+NOISE_MODELS = ("row", "element")
+
+
+def add_noise(
+    data: np.ndarray,
+    noise_var: float,
+    noise_model: str = "row",
+    max_grade: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Pour ajouter un bruit gaussien à toute une matrice de notes en une seule opération
+    :param data: la matrice (nb_données, nb_notes) des notes
+    :param noise_var: l'écart-type du bruit
+    :param noise_model: "row" pour un bruit par ligne, "element" pour un bruit par note
+    :param max_grade: pour des notes entières, la note maximale: les notes bruitées sont arrondies à l'entier inférieur et ramenées entre 0 et max_grade
+    :param rng: le générateur aléatoire à utiliser (par défaut, un générateur sans graine)
+    :param out: la matrice où écrire les notes bruitées (éventuellement data elle-même), None pour en créer une; le bruit, et pour des notes entières les notes bruitées avant arrondi, restent des tableaux temporaires
+    :return: la matrice contiguë des notes bruitées, du même type que data pour des notes entières
+    """
+    if noise_model not in NOISE_MODELS:
+        raise ValueError(
+            f"Modèle de bruit inconnu: {noise_model} (possibles: {NOISE_MODELS})"
+        )
+    data = np.asarray(data)
+    shape = (data.shape[0], 1) if noise_model == "row" else data.shape
+    rng = np.random.default_rng() if rng is None else rng
+    noise = rng.normal(0, noise_var, shape)
+    if max_grade is None:
+        return np.add(data, noise, out=out)
+    noisy = data + noise
+    np.floor(noisy, out=noisy)
+    np.clip(noisy, 0, max_grade, out=noisy)
+    if out is None:
+        return noisy.astype(data.dtype)
+    np.copyto(out, noisy, casting="unsafe")
+    return out
@@ -0,0 +1,87 @@
+from multiprocessing import Pool
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+from src.datasets.partition import Partition
+
+# Nombre de lignes tirées avec chaque flux aléatoire
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+# État de chaque processus de calcul, initialisé par _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(generator: Any, noise: Optional[float], noise_model: Optional[str]):
+    """
+    Pour transmettre le générateur et les paramètres du bruit à un processus de calcul
+    :param generator: le générateur à utiliser
+    :param noise: la variance du bruit blanc à ajouter aux données
+    :param noise_model: le modèle de bruit (None pour celui du générateur par défaut)
+    :return: None
+    """
+    _worker_state["generator"] = generator
+    _worker_state["noise"] = noise
+    _worker_state["noise_model"] = noise_model
+
+
+def _sample_block(
+    block: Tuple[int, np.random.SeedSequence],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pour tirer un bloc de lignes avec son propre flux aléatoire
+    :param block: le nombre de lignes du bloc et la graine de son flux
+    :return: la matrice des notes et le tableau des étiquettes du bloc
+    """
+    nb_rows, seed = block
+    return _worker_state["generator"].sample(
+        nb_rows,
+        _worker_state["noise"],
+        _worker_state["noise_model"],
+        np.random.default_rng(seed),
+    )
+
+
+def generate_parallel(
+    generator: Any,
+    nb_data: int,
+    noise: Optional[float] = None,
+    noise_model: Optional[str] = None,
+    seed: Optional[Any] = None,
+    nb_workers: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Partition:
+    """
+    Pour générer nb_data données en répartissant les tirages sur plusieurs processus
+    Les lignes sont découpées en blocs de block_size lignes, et le bloc b est tiré avec
+    le b-ième flux de SeedSequence(seed).spawn: pour une même graine et une même taille
+    de bloc, les données sont identiques quel que soit le nombre de processus
+    :param generator: un générateur du projet (avec les méthodes sample et partition)
+    :param nb_data: nombre de données à générer
+    :param noise: la variance du bruit blanc à ajouter aux données
+    :param noise_model: "row" ou "element" (par défaut, celui du générateur)
+    :param seed: la graine (entier ou SeedSequence), None pour une graine aléatoire
+    :param nb_workers: le nombre de processus (par défaut, le nombre de cœurs)
+    :param block_size: le nombre de lignes de chaque bloc
+    :return: les données sous la forme {catégorie: ensembles de notes}
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    sizes = [
+        min(block_size, nb_data - start) for start in range(0, nb_data, block_size)
+    ]
+    blocks = list(zip(sizes, seed.spawn(len(sizes))))
+    if nb_workers == 1:
+        _init_worker(generator, noise, noise_model)
+        results = [_sample_block(block) for block in blocks]
+    else:
+        with Pool(
+            nb_workers,
+            initializer=_init_worker,
+            initargs=(generator, noise, noise_model),
+        ) as pool:
+            results = pool.map(_sample_block, blocks)
+    if not results:
+        return generator.partition(*generator.sample(0))
+    data = np.concatenate([block_data for block_data, _ in results])
+    labels = np.concatenate([block_labels for _, block_labels in results])
+    return generator.partition(data, labels)
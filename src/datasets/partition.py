@@ -0,0 +1,63 @@
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional, Sequence
+import numpy as np
+
+
+class Partition(Mapping):
+    """
+    Données classées, vues comme un dictionnaire {catégorie: ensembles de notes}
+    Les données ne sont pas découpées: seuls un tableau d'étiquettes, une permutation
+    stable qui regroupe les lignes par catégorie et le début de chaque catégorie dans
+    cette permutation sont stockés. Les données sont réordonnées une seule fois, au
+    premier accès à une catégorie, et chaque catégorie est ensuite une vue.
+    Les catégories sont parcourues de la plus haute étiquette à la plus basse.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        labels: np.ndarray,
+        nb_labels: int,
+        names: Optional[Sequence[Any]] = None,
+    ):
+        """
+        Pour initialiser la partition
+        :param data: les ensembles de notes
+        :param labels: l'étiquette de chaque ensemble de notes, entre 0 et nb_labels - 1
+        :param nb_labels: le nombre d'étiquettes possibles
+        :param names: le nom de chaque étiquette (par défaut, l'étiquette elle-même)
+        """
+        self.data = data
+        self.labels = labels
+        self.nb_labels = nb_labels
+        self.names = list(range(nb_labels)) if names is None else list(names)
+        self.order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nb_labels)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.__label_of = {name: label for label, name in enumerate(self.names)}
+        self.__sorted_data = None
+
+    def __getitem__(self, name: Any) -> np.ndarray:
+        label = self.__label_of[name]
+        if self.__sorted_data is None:
+            self.__sorted_data = self.data[self.order]
+        return self.__sorted_data[self.offsets[label] : self.offsets[label + 1]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return reversed(self.names)
+
+    def __len__(self) -> int:
+        return self.nb_labels
+
+    def __repr__(self) -> str:
+        counts = {name: self.count(name) for name in self}
+        return f"Partition({counts})"
+
+    def count(self, name: Any) -> int:
+        """
+        Pour connaître le nombre d'ensembles de notes d'une catégorie, sans accéder aux données
+        :param name: la catégorie
+        :return: le nombre d'ensembles de notes
+        """
+        label = self.__label_of[name]
+        return int(self.offsets[label + 1] - self.offsets[label])
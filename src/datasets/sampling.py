@@ -0,0 +1,187 @@
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+from src.datasets.dataset import grade_dtype, label_dtype
+from src.datasets.noise import add_noise
+from src.datasets.partition import Partition
+
+
+class BaseGenerator:
+    """
+    Tirage des données commun aux générateurs du projet
+    Une sous-classe renseigne rng, nb_grades, max_grade et classifier (avec la méthode
+    classify_many), et nb_categories ou sa propre méthode partition
+    """
+
+    # pour des notes entières entre 0 et max_grade, du plus petit type possible
+    # (uint8 jusqu'à une note maximale de 255), sinon réelles entre 0 et max_grade
+    integer_grades = False
+
+    # le modèle de bruit par défaut, "row" ou "element"
+    noise_model = "row"
+
+    def _grade_dtype(self) -> np.dtype:
+        """
+        Pour connaître le type des notes tirées
+        :return: le type numpy des notes
+        """
+        if self.integer_grades:
+            return grade_dtype(self.max_grade)
+        return np.dtype(np.float64)
+
+    def _draw(self, nb_rows: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Pour tirer des notes uniformes entre 0 et max_grade
+        :param nb_rows: le nombre de lignes
+        :param rng: le générateur aléatoire à utiliser
+        :return: la matrice (nb_rows, nb_grades) des notes
+        """
+        if self.integer_grades:
+            return rng.integers(
+                0,
+                int(self.max_grade) + 1,
+                size=(nb_rows, self.nb_grades),
+                dtype=self._grade_dtype(),
+            )
+        return rng.random((nb_rows, self.nb_grades)) * self.max_grade
+
+    def _classify(self, data: np.ndarray) -> np.ndarray:
+        """
+        Pour classer les notes tirées
+        :param data: la matrice des notes
+        :return: l'étiquette de chaque ensemble de notes
+        """
+        return self.classifier.classify_many(data)
+
+    def _add_noise(
+        self,
+        data: np.ndarray,
+        noise_var: float,
+        noise_model: Optional[str],
+        rng: np.random.Generator,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Pour bruiter des notes (voir add_noise): des notes entières restent entières et
+        entre 0 et max_grade
+        :param data: la matrice des notes
+        :param noise_var: la variance du bruit blanc à ajouter aux données
+        :param noise_model: "row" ou "element", None pour celui du générateur
+        :param rng: le générateur aléatoire à utiliser
+        :param out: la matrice où écrire les notes bruitées, None pour en créer une
+        :return: la matrice des notes bruitées
+        """
+        noise_model = self.noise_model if noise_model is None else noise_model
+        max_grade = self.max_grade if self.integer_grades else None
+        return add_noise(data, noise_var, noise_model, max_grade, rng, out)
+
+    def sample(
+        self,
+        nb_data: int,
+        noise_var: Optional[float] = None,
+        noise_model: Optional[str] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pour tirer nb_data ensembles de notes et leurs étiquettes, sans les regrouper par catégorie
+        Les données sont classées avant l'ajout du bruit
+        :param nb_data: nombre de données à générer
+        :param noise_var: la variance du bruit blanc à ajouter aux données
+        :param noise_model: "row" pour un bruit par ligne, "element" pour un bruit par note (par défaut, celui du générateur)
+        :param rng: le générateur aléatoire à utiliser (par défaut, celui du générateur)
+        :return: la matrice des notes et le tableau des étiquettes
+        """
+        rng = self.rng if rng is None else rng
+        data = self._draw(nb_data, rng)
+        labels = self._classify(data)
+        if noise_var is not None:
+            data = self._add_noise(data, noise_var, noise_model, rng)
+        return data, labels
+
+    def partition(self, data: np.ndarray, labels: np.ndarray) -> Partition:
+        """
+        Pour regrouper des données étiquetées par catégorie
+        :param data: la matrice des notes
+        :param labels: l'étiquette de chaque ensemble de notes
+        :return: les données sous la forme {catégorie: ensembles de notes}
+        """
+        return Partition(data, labels, self.nb_categories + 1)
+
+    def generate(
+        self,
+        nb_data: int,
+        noise_var: Optional[float] = None,
+        noise_model: Optional[str] = None,
+    ) -> Partition:
+        """
+        Pour générer nb_data nouvelles données, avec du bruit
+        Les données sont classées avant l'ajout du bruit
+        :param nb_data: nombre de données à générer
+        :param noise_var: la variance du bruit blanc à ajouter aux données
+        :param noise_model: "row" pour un bruit par ligne, "element" pour un bruit par note (par défaut, celui du générateur)
+        :return: les données sous la forme {catégorie: np.array([[1, 2, 3, 4, 5], [1, 1, 1, 1, 1]])} (voir partition)
+        """
+        return self.partition(*self.sample(nb_data, noise_var, noise_model))
+
+    def iter_generate(
+        self,
+        chunk_size: int,
+        total: Optional[int] = None,
+        noise_var: Optional[float] = None,
+        noise_model: Optional[str] = None,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Pour générer des données sans fin (ou jusqu'à total lignes), par blocs de chunk_size lignes
+        La mémoire utilisée est bornée par la taille des blocs: les notes sont tirées
+        directement dans des tableaux alloués une seule fois, et chaque bloc renvoyé est
+        une vue de ces tableaux, écrasée au bloc suivant (la copier pour la conserver)
+        Les notes entières sont tirées comme partie entière de réels uniformes: pour une
+        même graine, seules les notes réelles sont celles de sample
+        :param chunk_size: le nombre de lignes de chaque bloc (au moins 1)
+        :param total: le nombre total de lignes à générer, None pour un flux sans fin
+        :param noise_var: la variance du bruit blanc à ajouter aux données
+        :param noise_model: "row" pour un bruit par ligne, "element" pour un bruit par note (par défaut, celui du générateur)
+        :return: un itérateur sur les couples (notes, étiquettes) de chaque bloc
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"Taille de bloc invalide: {chunk_size}")
+        return self.__iter_chunks(chunk_size, total, noise_var, noise_model)
+
+    def __iter_chunks(
+        self,
+        chunk_size: int,
+        total: Optional[int],
+        noise_var: Optional[float],
+        noise_model: Optional[str],
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Pour générer les blocs de iter_generate, une fois ses paramètres vérifiés
+        :param chunk_size: voir iter_generate
+        :param total: voir iter_generate
+        :param noise_var: voir iter_generate
+        :param noise_model: voir iter_generate
+        :return: un itérateur sur les couples (notes, étiquettes) de chaque bloc
+        """
+        data = np.empty((chunk_size, self.nb_grades), dtype=self._grade_dtype())
+        labels = np.empty(
+            chunk_size, dtype=label_dtype(self.classifier.nb_categories + 1)
+        )
+        # integer grades are floored from uniform floats drawn into this buffer
+        uniform = np.empty(data.shape) if self.integer_grades else data
+        produced = 0
+        while total is None or produced < total:
+            nb_rows = chunk_size if total is None else min(chunk_size, total - produced)
+            chunk = data[:nb_rows]
+            draws = uniform[:nb_rows]
+            self.rng.random(out=draws)
+            if self.integer_grades:
+                draws *= int(self.max_grade) + 1
+                np.floor(draws, out=draws)
+                np.copyto(chunk, draws, casting="unsafe")
+            else:
+                draws *= self.max_grade
+            labels[:nb_rows] = self._classify(chunk)
+            if noise_var is not None:
+                self._add_noise(chunk, noise_var, noise_model, self.rng, chunk)
+            yield chunk, labels[:nb_rows]
+            produced += nb_rows
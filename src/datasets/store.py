@@ -0,0 +1,208 @@
+from os import PathLike
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+
+from src import config
+from src.datasets.partition import Partition
+from src.ncs.coalitions import CoalitionSet
+
+METADATA_FILE = "metadata.json"
+
+
+def _to_json(value: Any) -> Any:
+    """
+    Pour convertir les paramètres d'un générateur en valeurs JSON
+    :param value: un paramètre (tableau numpy, CoalitionSet, liste, dictionnaire...)
+    :return: la valeur équivalente composée de listes, de dictionnaires et de nombres
+    """
+    if isinstance(value, CoalitionSet):
+        return [list(coalition) for coalition in value.to_list()]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+class DatasetStore:
+    """
+    Cache sur disque des données générées
+    Chaque jeu de données est rangé dans un dossier dont le nom est le hash du type de
+    générateur, de ses paramètres (get_parameters), du nombre de données, du bruit, du
+    modèle de bruit et de la graine: les notes et les étiquettes sont des fichiers .npy
+    ouverts en memmap, accompagnés d'un fichier JSON de métadonnées. Quand la taille
+    totale dépasse max_bytes, les jeux utilisés le moins récemment sont supprimés.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, PathLike] = config.DATASET_CACHE_PATH,
+        max_bytes: int = config.DATASET_CACHE_MAX_BYTES,
+    ):
+        """
+        Pour initialiser le cache
+        :param root: le dossier du cache, créé à la première écriture
+        :param max_bytes: la taille maximale du cache, en octets
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        generator: Any,
+        nb_data: int,
+        noise: Optional[float],
+        seed: Any,
+        noise_model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Pour décrire un jeu de données de façon unique
+        :param generator: le générateur
+        :param nb_data: le nombre de données
+        :param noise: la variance du bruit blanc ajouté aux données
+        :param seed: la graine
+        :param noise_model: "row" ou "element" (par défaut, celui du générateur)
+        :return: la description, sous forme de dictionnaire JSON
+        """
+        return {
+            "generator": type(generator).__name__,
+            "parameters": _to_json(generator.get_parameters()),
+            "nb_data": nb_data,
+            "noise": noise,
+            "noise_model": (
+                generator.noise_model if noise_model is None else noise_model
+            ),
+            "seed": _to_json(seed),
+        }
+
+    def path(self, description: Dict[str, Any]) -> Path:
+        """
+        Pour obtenir le dossier d'un jeu de données
+        :param description: la description renvoyée par key
+        :return: le chemin du dossier
+        """
+        digest = hashlib.sha256(
+            json.dumps(description, sort_keys=True).encode()
+        ).hexdigest()
+        return self.root / digest[:32]
+
+    def get(
+        self,
+        generator: Any,
+        nb_data: int,
+        noise: Optional[float] = None,
+        seed: Optional[Any] = None,
+        noise_model: Optional[str] = None,
+    ) -> Partition:
+        """
+        Pour obtenir un jeu de données, lu dans le cache ou généré puis enregistré
+        Sans graine, les données ne sont pas reproductibles: elles sont générées sans cache
+        :param generator: le générateur (avec les méthodes sample et partition)
+        :param nb_data: le nombre de données
+        :param noise: la variance du bruit blanc à ajouter aux données
+        :param seed: la graine (entier ou liste d'entiers)
+        :param noise_model: "row" ou "element" (par défaut, celui du générateur)
+        :return: les données sous la forme {catégorie: ensembles de notes}, les notes étant ouvertes en memmap
+        """
+        if seed is None:
+            return generator.partition(*generator.sample(nb_data, noise, noise_model))
+        description = self.key(generator, nb_data, noise, seed, noise_model)
+        folder = self.path(description)
+        if (folder / METADATA_FILE).exists():
+            self.__touch(folder)
+        else:
+            data, labels = generator.sample(
+                nb_data, noise, noise_model, rng=np.random.default_rng(seed)
+            )
+            self.__write(folder, description, data, labels)
+            self.evict()
+            if not (folder / METADATA_FILE).exists():
+                # le jeu de données dépasse à lui seul la taille du cache
+                return generator.partition(data, labels)
+        return generator.partition(
+            np.load(folder / "grades.npy", mmap_mode="r"),
+            np.load(folder / "labels.npy"),
+        )
+
+    def __write(
+        self,
+        folder: Path,
+        description: Dict[str, Any],
+        data: np.ndarray,
+        labels: np.ndarray,
+    ) -> None:
+        """
+        Pour enregistrer un jeu de données dans un dossier temporaire, renommé à la fin
+        pour qu'un jeu incomplet ne soit jamais lu
+        :param folder: le dossier du jeu de données
+        :param description: la description renvoyée par key
+        :param data: la matrice des notes
+        :param labels: les étiquettes
+        :return: None
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{folder.name}.{os.getpid()}.tmp"
+        tmp.mkdir(exist_ok=True)
+        np.save(tmp / "grades.npy", data)
+        np.save(tmp / "labels.npy", labels)
+        metadata = dict(description, nb_bytes=int(data.nbytes + labels.nbytes))
+        with open(tmp / METADATA_FILE, "w") as file:
+            json.dump(metadata, file)
+        try:
+            os.replace(tmp, folder)
+            self.__touch(folder)
+        except OSError:
+            # un autre processus a déjà enregistré le même jeu de données
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @staticmethod
+    def __touch(folder: Path) -> None:
+        """
+        Pour marquer un jeu de données comme utilisé maintenant
+        L'horloge des fichiers n'avance que par pas de quelques millisecondes: la date
+        est donnée explicitement, à la nanoseconde, pour ne pas confondre deux accès
+        rapprochés
+        :param folder: le dossier du jeu de données
+        :return: None
+        """
+        now = time.time_ns()
+        os.utime(folder / METADATA_FILE, ns=(now, now))
+
+    def evict(self) -> None:
+        """
+        Pour supprimer les jeux de données utilisés le moins récemment jusqu'à ce que
+        la taille du cache ne dépasse plus max_bytes
+        :return: None
+        """
+        entries = []
+        for metadata_path in self.root.glob(f"*/{METADATA_FILE}"):
+            if metadata_path.parent.name.startswith("."):
+                continue
+            with open(metadata_path) as file:
+                nb_bytes = json.load(file)["nb_bytes"]
+            entries.append(
+                (metadata_path.stat().st_mtime_ns, nb_bytes, metadata_path.parent)
+            )
+        total = sum(nb_bytes for _, nb_bytes, _ in entries)
+        for _, nb_bytes, folder in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(folder, ignore_errors=True)
+            total -= nb_bytes
+
+    def clear(self) -> None:
+        """
+        Pour vider le cache
+        :return: None
+        """
+        shutil.rmtree(self.root, ignore_errors=True)
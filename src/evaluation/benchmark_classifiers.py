@@ -0,0 +1,243 @@
+import time
+import numpy as np
+
+from src.datasets.partition import Partition
+from src.mr_sort.binary_classifier import BinaryClassifier
+from src.mr_sort.classifier import Classifier
+from src.ncs.classifier import Classifier as NcsClassifier
+from src.ncs.compiled_model import CompiledModel
+from src.ncs.interval_classifier import IntervalClassifier
+from src.scoring.parallel import classify_parallel
+from src.scoring.scorer import compile_scorer
+
+# latence visée pour une décision d'un classifieur compilé, en microsecondes
+SCORER_TARGET = 2.0
+
+
+def print_throughput(name: str, nb_data: int, duration: float):
+    """
+    Pour afficher le débit d'une méthode de classification
+    :param name: le nom de la méthode
+    :param nb_data: le nombre de lignes classées
+    :param duration: la durée de la classification, en secondes
+    :return: None
+    """
+    print(f"{name:<16} {nb_data / duration:>14,.0f} lignes/s ({duration:.3f}s)")
+
+
+def benchmark_mr_sort_classify(
+    nb_data: int = 1_000_000, nb_grades: int = 5, nb_categories: int = 5
+):
+    """
+    Compare le débit de classify_many à celui de classify_one ligne par ligne
+    :param nb_data: le nombre de lignes à classer
+    :param nb_grades: le nombre de matières
+    :param nb_categories: le nombre de catégories
+    :return: None
+    """
+    classifier = Classifier(
+        borders=[
+            [20 * (h + 1) / (nb_categories + 1) for _ in range(nb_grades)]
+            for h in range(nb_categories)
+        ],
+        poids=[1 / nb_grades for _ in range(nb_grades)],
+        lam=0.6,
+    )
+    data = np.random.rand(nb_data, nb_grades) * 20
+
+    print(f"MR-Sort, {nb_grades} matières")
+    start = time.time()
+    classifier.classify_many(data)
+    print_throughput("classify_many", nb_data, time.time() - start)
+
+    nb_loop = min(nb_data, 10_000)
+    start = time.time()
+    for row in data[:nb_loop]:
+        classifier.classify_one(row)
+    print_throughput("classify_one", nb_loop, time.time() - start)
+
+
+def benchmark_ncs_classify(
+    nb_data: int = 1_000_000, nb_grades_to_eval=(5, 10, 16), nb_categories: int = 3
+):
+    """
+    Compare le débit de classify_many (table de masques) à celui de classify_one,
+    pour les classifieurs NCS avec et sans intervalles
+    :param nb_data: le nombre de lignes à classer
+    :param nb_grades_to_eval: les nombres de matières à tester
+    :param nb_categories: le nombre de catégories
+    :return: None
+    """
+    for nb_grades in nb_grades_to_eval:
+        valid_set = [
+            list(range(1, nb_grades // 2 + 2)),
+            list(range(nb_grades // 2, nb_grades + 1)),
+        ]
+        borders = [
+            [20 * (h + 1) // (nb_categories + 1) for _ in range(nb_grades)]
+            for h in range(nb_categories)
+        ]
+        interval_borders = [
+            (
+                [10 - 10 * (h + 1) // (nb_categories + 1) for _ in range(nb_grades)],
+                [10 + 10 * (h + 1) // (nb_categories + 1) for _ in range(nb_grades)],
+            )
+            for h in range(nb_categories - 1, -1, -1)
+        ]
+        data = np.random.randint(0, 21, size=(nb_data, nb_grades))
+
+        for name, classifier in [
+            ("NCS", NcsClassifier(borders=borders, valid_set=valid_set)),
+            (
+                "NCS intervalles",
+                IntervalClassifier(borders=interval_borders, valid_set=valid_set),
+            ),
+        ]:
+            print(f"{name}, {nb_grades} matières")
+            start = time.time()
+            classifier.classify_many(data)
+            print_throughput("classify_many", nb_data, time.time() - start)
+
+            nb_loop = min(nb_data, 200)
+            start = time.time()
+            for row in data[:nb_loop]:
+                classifier.classify_one(row)
+            print_throughput("classify_one", nb_loop, time.time() - start)
+
+
+def benchmark_compiled_ncs(
+    nb_data: int = 1_000_000, nb_grades_to_eval=(5, 10, 16)
+) -> dict:
+    """
+    Compare le débit du modèle NCS compilé (notes uint8) à celui de classify, pour les
+    classifieurs NCS avec et sans intervalles: dans les deux cas, le résultat est la
+    Partition des données, et classify_many est chronométré pour référence
+    :param nb_data: le nombre de lignes à classer
+    :param nb_grades_to_eval: les nombres de matières à tester
+    :return: le rapport des débits du modèle compilé et de classify, {(nom, nombre de matières): rapport}
+    """
+    speedups = {}
+    for nb_grades in nb_grades_to_eval:
+        valid_set = [
+            list(range(1, nb_grades // 2 + 2)),
+            list(range(nb_grades // 2, nb_grades + 1)),
+        ]
+        interval_borders = [
+            ([4] * nb_grades, [16] * nb_grades),
+            ([7] * nb_grades, [13] * nb_grades),
+        ]
+        data = np.random.randint(0, 21, size=(nb_data, nb_grades)).astype(np.uint8)
+
+        for name, classifier in [
+            (
+                "NCS",
+                NcsClassifier(
+                    borders=[[8] * nb_grades, [12] * nb_grades], valid_set=valid_set
+                ),
+            ),
+            (
+                "NCS intervalles",
+                IntervalClassifier(borders=interval_borders, valid_set=valid_set),
+            ),
+        ]:
+            compiled = CompiledModel.from_classifier(classifier, max_grade=20)
+            print(f"{name} compilé, {nb_grades} matières")
+            durations = {}
+            for method_name, method in [
+                ("classify", classifier.classify),
+                ("classify_many", classifier.classify_many),
+                (
+                    "compilé",
+                    lambda data: Partition(
+                        data,
+                        compiled.classify_many(data),
+                        classifier.nb_categories + 1,
+                    ),
+                ),
+            ]:
+                start = time.time()
+                method(data)
+                durations[method_name] = time.time() - start
+                print_throughput(method_name, nb_data, durations[method_name])
+            speedup = durations["classify"] / durations["compilé"]
+            comparison = "plus rapide" if speedup >= 1 else "plus lent"
+            print(f"compilé {max(speedup, 1 / speedup):.2f}x {comparison} que classify")
+            speedups[(name, nb_grades)] = speedup
+    return speedups
+
+
+def benchmark_scorers(nb_calls: int = 100_000, target: float = SCORER_TARGET):
+    """
+    Compare la latence d'une décision du classifieur compilé à celle de classify_one,
+    et vérifie que le classifieur compilé décide en moins de target microsecondes, que
+    les notes soient une liste ou un tableau numpy
+    :param nb_calls: le nombre de décisions à chronométrer
+    :param target: la latence visée pour une décision du classifieur compilé, en microsecondes
+    :return: True si la latence visée est atteinte pour tous les classifieurs
+    """
+    row = [11, 13, 9, 15, 12]
+    reached = True
+    for name, classifier in [
+        (
+            "MR-Sort",
+            Classifier(borders=[[8] * 5, [12] * 5, [16] * 5], poids=[0.2] * 5, lam=0.6),
+        ),
+        (
+            "MR-Sort binaire",
+            BinaryClassifier(border=[12] * 5, poids=[0.2] * 5, lam=0.6),
+        ),
+        (
+            "NCS",
+            NcsClassifier(borders=[[10] * 5, [14] * 5], valid_set=[[1, 3], [2, 4]]),
+        ),
+        (
+            "NCS intervalles",
+            IntervalClassifier(borders=[([8] * 5, [12] * 5)], valid_set=[[1, 3]]),
+        ),
+    ]:
+        print(name)
+        scorer = compile_scorer(classifier)
+        latencies = {}
+        for method_name, method, grades, nb_loop in [
+            ("classify_one", classifier.classify_one, np.array(row), nb_calls // 10),
+            ("compilé (liste)", scorer.classify_one, row, nb_calls),
+            ("compilé (numpy)", scorer.classify_one, np.array(row), nb_calls),
+        ]:
+            start = time.perf_counter()
+            for _ in range(nb_loop):
+                method(grades)
+            latencies[method_name] = (time.perf_counter() - start) / nb_loop * 1e6
+            print(f"{method_name:<16} {latencies[method_name]:>8.2f} µs/décision")
+        worst = max(latencies["compilé (liste)"], latencies["compilé (numpy)"])
+        speedup = latencies["classify_one"] / worst
+        status = "atteint" if worst < target else "manqué"
+        print(f"objectif < {target:g} µs {status}, {speedup:.1f}x plus rapide")
+        reached &= worst < target
+    return reached
+
+
+def benchmark_parallel_classify(nb_data: int = 10_000_000, nb_workers=None):
+    """
+    Mesure le débit de chaque processus lors d'une classification répartie
+    :param nb_data: le nombre de lignes à classer
+    :param nb_workers: le nombre de processus (par défaut, le nombre de cœurs)
+    :return: None
+    """
+    classifier = Classifier(
+        borders=[[8] * 5, [12] * 5, [16] * 5], poids=[0.2] * 5, lam=0.6
+    )
+    data = np.random.rand(nb_data, 5) * 20
+
+    start = time.time()
+    _, stats = classify_parallel(classifier, data, nb_workers=nb_workers)
+    print_throughput("total", nb_data, time.time() - start)
+    for worker in stats:
+        print_throughput(f"pid {worker['worker']}", worker["rows"], worker["seconds"])
+
+
+if __name__ == "__main__":
+    benchmark_mr_sort_classify()
+    benchmark_ncs_classify()
+    benchmark_compiled_ncs()
+    benchmark_scorers()
+    benchmark_parallel_classify()
@@ -0,0 +1,303 @@
+from typing import Any, Optional, Tuple
+import numpy as np
+
+from src.datasets.dataset import Dataset
+from src.mr_sort.backends import BACKENDS, BackendError
+from src.mr_sort.binary_generator import BinaryGenerator
+from src.mr_sort.binary_solver import BinarySolver
+from src.mr_sort.generator import Generator
+from src.mr_sort.multiclass_solver import MulticlassSolver
+from src.mr_sort.relaxed_binary_solver import RelaxedBinarySolver
+
+
+def time_solver(solver: Any, *args, **kwargs) -> Tuple[float, Optional[float]]:
+    """
+    Pour mesurer séparément la construction du modèle et sa résolution par le backend
+    :param solver: le solveur (avec l'attribut build_time renseigné par solve)
+    :param args: les arguments de solve
+    :param kwargs: les arguments nommés de solve
+    :return: la durée de construction et la durée de résolution, en secondes (None si le backend n'a pas pu résoudre, par exemple avec une licence Gurobi limitée)
+    """
+    solver.solution = None
+    try:
+        solver.solve(*args, **kwargs)
+    except BackendError as error:
+        print(f"  {error}")
+        return solver.build_time, None
+    return solver.build_time, solver.solution.runtime
+
+
+def print_times(name: str, solver: Any, times: Tuple[float, Optional[float]]):
+    """
+    Pour afficher la taille du modèle et les durées de construction et de résolution
+    :param name: le nom de la configuration
+    :param solver: le solveur, après l'appel à solve
+    :param times: les durées renvoyées par time_solver
+    :return: None
+    """
+    build, optimize = times
+    if optimize is None:
+        optimize = "-"
+    else:
+        optimize = f"{optimize:.3f}s ({solver.solution.node_count:.0f} nœuds)"
+    print(
+        f"{name:<40} {solver.model.nb_variables:>8} variables "
+        f"{solver.model.nb_constraints:>8} contraintes "
+        f"{solver.model.nb_nonzeros:>9} non-zéros "
+        f"construction {build:.3f}s, résolution {optimize}"
+    )
+
+
+def benchmark_binary_solvers(
+    nb_students_to_eval=(100, 1_000, 3_000), nb_grades: int = 5, noise: float = 1
+):
+    """
+    Compare la durée de construction des modèles des solveurs binaires à celle de leur
+    résolution, selon le nombre d'étudiants
+    :param nb_students_to_eval: les nombres d'étudiants à tester
+    :param nb_grades: le nombre de matières
+    :param noise: la variance du bruit des données du solveur relâché
+    :return: None
+    """
+    for nb_students in nb_students_to_eval:
+        print(f"{nb_students} étudiants, {nb_grades} matières")
+        generator = BinaryGenerator(
+            seed=0,
+            border=[12] * nb_grades,
+            poids=[1 / nb_grades] * nb_grades,
+            lam=0.6,
+        )
+        data = Dataset.from_classified(generator.generate(nb_students))
+        noisy = Dataset.from_classified(generator.generate(nb_students, noise=noise))
+
+        for name, solver_class, dataset, options in [
+            ("BinarySolver", BinarySolver, data, {"prune": False}),
+            ("BinarySolver (prune)", BinarySolver, data, {}),
+            ("RelaxedBinarySolver", RelaxedBinarySolver, noisy, {}),
+        ]:
+            solver = solver_class(nb_grades=nb_grades, nb_students=nb_students)
+            print_times(name, solver, time_solver(solver, dataset, **options))
+
+
+def benchmark_multiclass_solver(
+    nb_students_to_eval=(100, 500, 1_000), nb_grades: int = 5, nb_categories: int = 3
+):
+    """
+    Mesure la taille du modèle MR-Sort multiclasse et les durées de construction et de
+    résolution, selon le nombre d'étudiants
+    :param nb_students_to_eval: les nombres d'étudiants à tester
+    :param nb_grades: le nombre de matières
+    :param nb_categories: le nombre de catégories (sans compter la catégorie 0)
+    :return: None
+    """
+    generator = Generator(
+        seed=0,
+        borders=[
+            [20 * (h + 1) / (nb_categories + 1)] * nb_grades
+            for h in range(nb_categories)
+        ],
+        poids=[1 / nb_grades] * nb_grades,
+        lam=0.6,
+    )
+    for nb_students in nb_students_to_eval:
+        print(f"{nb_students} étudiants, {nb_grades} matières")
+        data = Dataset.from_classified(generator.generate(nb_students))
+        solver = MulticlassSolver(
+            nb_grades=nb_grades, nb_students=nb_students, nb_categories=nb_categories
+        )
+        print_times("MulticlassSolver", solver, time_solver(solver, data))
+
+
+def benchmark_big_m(
+    nb_students_to_eval=(10, 20, 50, 70, 90, 150, 200, 250, 300, 350, 400, 450, 500),
+    nb_grades: int = 5,
+    nb_categories: int = 2,
+):
+    """
+    Compare le nombre de nœuds explorés et la durée de résolution des modèles MR-Sort
+    avec une constante big-M unique et avec les constantes et les bornes déduites des
+    données (tight_bounds), aux tailles de compare_time_num_students
+    :param nb_students_to_eval: les nombres d'étudiants à tester
+    :param nb_grades: le nombre de matières
+    :param nb_categories: le nombre de catégories (sans compter la catégorie 0)
+    :return: None
+    """
+    generator = Generator(
+        seed=0,
+        borders=[
+            [20 * (h + 1) / (nb_categories + 1)] * nb_grades
+            for h in range(nb_categories)
+        ],
+        poids=[1 / nb_grades] * nb_grades,
+        lam=0.6,
+    )
+    binary_generator = BinaryGenerator(
+        seed=0, border=[12] * nb_grades, poids=[1 / nb_grades] * nb_grades, lam=0.6
+    )
+    print(f"{'':<28} {'big-M unique':>24} {'big-M des données':>24}")
+    for nb_students in nb_students_to_eval:
+        data = Dataset.from_classified(generator.generate(nb_students))
+        noisy = Dataset.from_classified(binary_generator.generate(nb_students, noise=1))
+        for name, new_solver, dataset in [
+            (
+                "MulticlassSolver",
+                lambda: MulticlassSolver(nb_grades, nb_students, nb_categories),
+                data,
+            ),
+            (
+                "RelaxedBinarySolver",
+                lambda: RelaxedBinarySolver(nb_grades, nb_students),
+                noisy,
+            ),
+        ]:
+            results = []
+            for tight_bounds in (False, True):
+                solver = new_solver()
+                _, optimize = time_solver(solver, dataset, tight_bounds=tight_bounds)
+                results.append(
+                    "-"
+                    if optimize is None
+                    else f"{solver.solution.node_count:.0f} nœuds {optimize:.3f}s"
+                )
+            print(f"{name + f' ({nb_students})':<28} {results[0]:>24} {results[1]:>24}")
+
+
+def benchmark_breakpoints(nb_students_to_eval=(20, 50, 70), nb_grades: int = 5):
+    """
+    Compare la formulation big-M des solveurs MR-Sort à la formulation par chaînes de
+    variables binaires sur les notes distinctes (formulation="breakpoints"), sur des
+    notes réelles et sur des notes arrondies à l'entier, qui ont beaucoup moins de
+    valeurs distinctes
+    :param nb_students_to_eval: les nombres d'étudiants à tester
+    :param nb_grades: le nombre de matières
+    :return: None
+    """
+    generator = Generator(
+        seed=0,
+        borders=[[8] * nb_grades, [13] * nb_grades],
+        poids=[1 / nb_grades] * nb_grades,
+        lam=0.6,
+    )
+    binary_generator = BinaryGenerator(
+        seed=0, border=[12] * nb_grades, poids=[1 / nb_grades] * nb_grades, lam=0.6
+    )
+    for nb_students in nb_students_to_eval:
+        print(f"{nb_students} étudiants, {nb_grades} matières")
+        data = Dataset.from_classified(generator.generate(nb_students))
+        clean = Dataset.from_classified(binary_generator.generate(nb_students))
+        noisy = Dataset.from_classified(binary_generator.generate(nb_students, noise=1))
+        rounded = Dataset(
+            np.round(noisy.grades), noisy.labels, noisy.weights, noisy.names
+        )
+        for name, new_solver, dataset in [
+            ("BinarySolver", lambda: BinarySolver(nb_grades, nb_students), clean),
+            (
+                "RelaxedBinarySolver",
+                lambda: RelaxedBinarySolver(nb_grades, nb_students),
+                noisy,
+            ),
+            (
+                "RelaxedBinarySolver (entiers)",
+                lambda: RelaxedBinarySolver(nb_grades, nb_students),
+                rounded,
+            ),
+            (
+                "MulticlassSolver",
+                lambda: MulticlassSolver(nb_grades, nb_students, nb_categories=2),
+                data,
+            ),
+        ]:
+            for formulation in ("big-m", "breakpoints"):
+                solver = new_solver()
+                times = time_solver(solver, dataset, formulation=formulation)
+                print_times(f"{name} {formulation}", solver, times)
+
+
+def benchmark_backends(nb_students_to_eval=(20, 50, 70), nb_grades: int = 5):
+    """
+    Compare les durées de résolution des solveurs MR-Sort avec chaque backend MILP
+    (Gurobi et HiGHS), sur les mêmes modèles
+    :param nb_students_to_eval: les nombres d'étudiants à tester
+    :param nb_grades: le nombre de matières
+    :return: None
+    """
+    generator = Generator(
+        seed=0,
+        borders=[[8] * nb_grades, [13] * nb_grades],
+        poids=[1 / nb_grades] * nb_grades,
+        lam=0.6,
+    )
+    binary_generator = BinaryGenerator(
+        seed=0, border=[12] * nb_grades, poids=[1 / nb_grades] * nb_grades, lam=0.6
+    )
+    for nb_students in nb_students_to_eval:
+        print(f"{nb_students} étudiants, {nb_grades} matières")
+        data = Dataset.from_classified(generator.generate(nb_students))
+        clean = Dataset.from_classified(binary_generator.generate(nb_students))
+        noisy = Dataset.from_classified(binary_generator.generate(nb_students, noise=1))
+        for name, solver_class, dataset, options in [
+            ("BinarySolver", BinarySolver, clean, {}),
+            ("RelaxedBinarySolver", RelaxedBinarySolver, noisy, {}),
+            ("MulticlassSolver", MulticlassSolver, data, {"nb_categories": 2}),
+        ]:
+            for backend in BACKENDS:
+                solver = solver_class(
+                    nb_grades, nb_students, backend=backend, **options
+                )
+                times = time_solver(solver, dataset)
+                print_times(f"{name} ({backend})", solver, times)
+
+
+def benchmark_template(
+    nb_students: int = 30, nb_grades: int = 3, nb_datasets: int = 10, backend=None
+):
+    """
+    Compare le réentraînement du solveur multiclasse sur plusieurs jeux de données de
+    même forme, en reconstruisant le modèle à chaque fois ou en réutilisant le modèle
+    précédent (template=True), dont seuls les seconds membres, les bornes et l'objectif
+    sont mis à jour
+    :param nb_students: le nombre d'étudiants de chaque jeu de données
+    :param nb_grades: le nombre de matières
+    :param nb_datasets: le nombre de jeux de données
+    :param backend: le solveur MILP (par défaut, config.MILP_BACKEND)
+    :return: None
+    """
+    datasets = [
+        Dataset.from_classified(
+            Generator(
+                seed=seed,
+                borders=[[8] * nb_grades, [13] * nb_grades],
+                poids=[1 / nb_grades] * nb_grades,
+                lam=0.6,
+            ).generate(nb_students)
+        )
+        for seed in range(nb_datasets)
+    ]
+    print(f"{nb_datasets} jeux de {nb_students} étudiants, {nb_grades} matières")
+    for template in (False, True):
+        solver = MulticlassSolver(nb_grades, nb_students, backend=backend)
+        build = load = optimize = 0
+        rebuilds = 0
+        for dataset in datasets:
+            model = solver.model
+            times = time_solver(solver, dataset, template=template)
+            if times[1] is None:
+                return
+            build += times[0]
+            load += solver.solution.load_time
+            optimize += times[1]
+            rebuilds += solver.model is not model
+        print(
+            f"{'template' if template else 'reconstruction':<16} "
+            f"{rebuilds:>3} constructions, construction {build:.3f}s, "
+            f"chargement {load:.3f}s, résolution {optimize:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_binary_solvers()
+    benchmark_multiclass_solver()
+    benchmark_big_m()
+    benchmark_breakpoints()
+    benchmark_backends()
+    benchmark_template()
@@ -5,6 +5,7 @@ import time
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from src.datasets.dataset import stack_classified
 from src.mr_sort.binary_solver import BinarySolver
 from src.mr_sort.binary_generator import BinaryGenerator
 from src.mr_sort.binary_classifier import BinaryClassifier
@@ -33,23 +34,10 @@ def eval_binary(gen_params: Dict[str, Any], solver_params: Dict[str, Any]):
         lam=solver_params["lam"],
     )
     # Verify data
-    true_classes = []
-    pred_classes = []
-
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            print(classifier_solver.classify_one(grades_real))
-            if classifier_solver.classify_one(grades_real) == "accepted":
-
-                pred_classes.append(1)
-            else:
-                pred_classes.append(0)
-            print(category_real)
-            if category_real == "accepted":
-
-                true_classes.append(1)
-            else:
-                true_classes.append(0)
+    grades, true_classes = stack_classified(
+        data_true_classified, BinaryClassifier.categories
+    )
+    pred_classes = classifier_solver.classify_many(grades)
     return f1_score(true_classes, pred_classes)
 
 
@@ -72,15 +60,10 @@ def show_multiclass_matrix_confusion(
         lam=solver_params["lam"],
     )
     # Verify data
-
-    pred_classes = []
-    true_classes = []
-
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            category_classified = classifier_solver.classify_one(grades_real)
-            pred_classes.append(category_classified)
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(
+        data_true_classified, BinaryClassifier.categories
+    )
+    pred_classes = classifier_solver.classify_many(grades)
 
     confusion_mat = confusion_matrix(pred_classes, true_classes)
     ax = sns.heatmap(confusion_mat, annot=True, cmap="Blues")
@@ -8,6 +8,8 @@ import time
 import pandas as pd
 from src.evaluation.evaluate_ncs import confusion_matrix_ncs
 
+from src.datasets.dataset import stack_classified
+from src.datasets.store import DatasetStore
 from src.mr_sort.binary_generator import BinaryGenerator
 from src.mr_sort.generator import Generator
 from src.mr_sort.binary_classifier import BinaryClassifier
@@ -20,6 +22,11 @@ plt.rcParams.update({"font.size": 28})
 
 COLORS = ["red", "green", "blue", "orange", "black", "purple", "yellow"]
 
+# Graines des données d'entraînement et de test, mises en cache d'une exécution à l'autre
+TRAIN_SEED = 0
+TEST_SEED = 1
+store = DatasetStore()
+
 
 def eval_binary(gen_params: Dict[str, Any], solver_params: Dict[str, Any]):
     """
@@ -37,20 +44,17 @@ def eval_binary(gen_params: Dict[str, Any], solver_params: Dict[str, Any]):
         poids=gen_params["poids"],
         lam=gen_params["lam"],
     )
-    data_true_classified = generator.generate(200)
+    data_true_classified = store.get(generator, 200, seed=TEST_SEED)
     classifier_solver = BinaryClassifier(
         border=solver_params["border"],
         poids=solver_params["poids"],
         lam=solver_params["lam"],
     )
     # Verify data
-    true_classes = []
-    pred_classes = []
-
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(
+        data_true_classified, BinaryClassifier.categories
+    )
+    pred_classes = classifier_solver.classify_many(grades)
     return f1_score(true_classes, pred_classes)
 
 
@@ -71,7 +75,7 @@ def evaluate_multiclass(gen_params: Dict[str, float], solver_params: Dict[str, f
         lam=gen_params["lam"],
     )
 
-    test_data = generator.generate(200)
+    test_data = store.get(generator, 200, seed=TEST_SEED)
 
     solver_classifier = Classifier(
         borders=solver_params["borders"],
@@ -79,13 +83,8 @@ def evaluate_multiclass(gen_params: Dict[str, float], solver_params: Dict[str, f
         lam=solver_params["lam"],
     )
 
-    true_classes = []
-    pred_classes = []
-
-    for category_real, grades_set_real in test_data.items():
-        for grades_real in grades_set_real:
-            true_classes.append(category_real)
-            pred_classes.append(solver_classifier.classify_one(grades_real))
+    grades, true_classes = stack_classified(test_data)
+    pred_classes = solver_classifier.classify_many(grades)
 
     return f1_score(true_classes, pred_classes, average="macro")
 
@@ -102,22 +101,15 @@ def show_multiclass_matrix_confusion(
         poids=gen_params["poids"],
         lam=gen_params["lam"],
     )
-    data_true_classified = generator.generate(200)
+    data_true_classified = store.get(generator, 200, seed=TEST_SEED)
     classifier_solver = Classifier(
         borders=solver_params["borders"],
         poids=solver_params["poids"],
         lam=solver_params["lam"],
     )
     # Verify data
-
-    pred_classes = []
-    true_classes = []
-
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            category_classified = classifier_solver.classify_one(grades_real)
-            pred_classes.append(category_classified)
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     confusion_mat = confusion_matrix(pred_classes, true_classes)
     ax = sns.heatmap(confusion_mat, annot=True, cmap="Blues")
@@ -149,7 +141,7 @@ def compare_on_num_courses():
                 poids=[1 / num_grades for _ in range(num_grades)],
             )
 
-            data = generator.generate(num_students)
+            data = store.get(generator, num_students, seed=TRAIN_SEED)
 
             true_params = generator.get_parameters()
 
@@ -182,8 +174,6 @@ def compare_time_num_students():
     y = []
     for num_students in tqdm(students, total=len(students)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.set_parameters(
@@ -195,12 +185,14 @@ def compare_time_num_students():
             poids=[1 / num_courses for _ in range(num_courses)],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = MulticlassSolver(
             nb_grades=num_courses, nb_students=num_students, nb_categories=2
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_students)
@@ -230,8 +222,6 @@ def compare_time_num_categories():
 
     for num_category in tqdm(num_categories, total=len(num_categories)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.set_parameters(
@@ -243,12 +233,14 @@ def compare_time_num_categories():
             poids=[1 / num_grades for _ in range(num_grades)],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = MulticlassSolver(
             nb_grades=num_grades, nb_students=num_students, nb_categories=num_category
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_category)
@@ -279,8 +271,6 @@ def compare_time_num_grades():
 
     for num_grades in tqdm(ggra, total=len(ggra)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.set_parameters(
@@ -292,12 +282,14 @@ def compare_time_num_grades():
             poids=[1 / num_grades for _ in range(num_grades)],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = MulticlassSolver(
             nb_grades=num_grades, nb_students=num_students, nb_categories=num_category
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_grades)
@@ -341,7 +333,7 @@ def compare_on_num_categories():
                 poids=[1 / num_grades for _ in range(num_grades)],
             )
 
-            data = generator.generate(num_students, noise_var=2)
+            data = store.get(generator, num_students, 2, seed=TRAIN_SEED)
 
             true_params = generator.get_parameters()
 
@@ -386,9 +378,7 @@ def confusion_matrix_mr_sort():
     )
     true_params = generator.get_parameters()
 
-    data = generator.generate(
-        num_students,
-    )
+    data = store.get(generator, num_students, seed=TRAIN_SEED)
 
     solver = MulticlassSolver(
         nb_grades=num_grades, nb_categories=num_categories, nb_students=num_students
@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import time
 
+from src.datasets.dataset import stack_classified
+from src.datasets.store import DatasetStore
 from src.ncs.classifier import Classifier
 from src.ncs.generator import Generator
 from src.ncs.solver import NcsSolver
@@ -14,6 +16,11 @@ plt.rcParams.update({"font.size": 28})
 
 COLORS = ["red", "green", "blue", "orange", "black", "purple", "yellow"]
 
+# Graines des données d'entraînement et de test, mises en cache d'une exécution à l'autre
+TRAIN_SEED = 0
+TEST_SEED = 1
+store = DatasetStore()
+
 
 def evaluate_ncs(gen_params: Dict[str, Any], solver_params: Dict[str, Any]) -> None:
     """
@@ -29,16 +36,12 @@ def evaluate_ncs(gen_params: Dict[str, Any], solver_params: Dict[str, Any]) -> N
         borders=gen_params["borders"],
         valid_set=gen_params["valid_set"],
     )
-    data_true_classified = generator.generate(200)
+    data_true_classified = store.get(generator, 200, seed=TEST_SEED)
     classifier_solver = Classifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     return f1_score(pred_classes, true_classes, average="macro")
 
@@ -52,16 +55,12 @@ def confusion_matrix_ncs(
         borders=gen_params["borders"],
         valid_set=gen_params["valid_set"],
     )
-    data_true_classified = generator.generate(200)
+    data_true_classified = store.get(generator, 200, seed=TEST_SEED)
     classifier_solver = Classifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     result = confusion_matrix(pred_classes, true_classes)
     sns.heatmap(result, annot=True, cmap="Blues")
@@ -94,7 +93,7 @@ def compare_on_num_categories():
                 ],
             )
 
-            data = generator.generate(num_students)
+            data = store.get(generator, num_students, seed=TRAIN_SEED)
 
             true_params = generator.get_parameters()
 
@@ -138,7 +137,7 @@ def compare_on_num_courses():
                 borders=[[j * 20 / 2 for _ in range(num_grades)] for j in range(2)],
             )
 
-            data = generator.generate(num_students)
+            data = store.get(generator, num_students, seed=TRAIN_SEED)
 
             true_params = generator.get_parameters()
 
@@ -169,8 +168,6 @@ def compare_time_num_students():
     y = []
     for num_students in tqdm(students, total=len(students)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.reset_parameters(
@@ -181,10 +178,12 @@ def compare_time_num_students():
             ],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = NcsSolver(nb_grades=num_courses, nb_categories=2, max_grade=20)
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_students)
@@ -214,8 +213,6 @@ def compare_time_lambda():
     for i in range(1, 10):
         lam = max(0.5, i / 10)
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.reset_parameters(
@@ -227,10 +224,12 @@ def compare_time_lambda():
             lam=lam,
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = NcsSolver(nb_grades=num_courses, nb_categories=2, max_grade=20)
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(lam)
@@ -259,8 +258,6 @@ def compare_time_num_categories():
     y = []
     for num_category in tqdm(num_categories, total=len(num_categories)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.reset_parameters(
@@ -271,12 +268,14 @@ def compare_time_num_categories():
             ],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = NcsSolver(
             nb_grades=num_courses, nb_categories=num_category, max_grade=20
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_category)
@@ -306,8 +305,6 @@ def compare_time_num_grades():
     y = []
     for num_courses in tqdm(num_grades, total=len(num_grades)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.reset_parameters(
@@ -318,12 +315,14 @@ def compare_time_num_grades():
             ],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = NcsSolver(
             nb_grades=num_courses, nb_categories=num_category, max_grade=20
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(num_courses)
@@ -352,8 +351,6 @@ def compare_time_max_grade():
     y = []
     for max_grade in tqdm(max_grades, total=len(max_grades)):
 
-        start_time = time.time()
-
         generator = Generator()
 
         generator.reset_parameters(
@@ -364,12 +361,14 @@ def compare_time_max_grade():
             ],
         )
 
-        data = generator.generate(num_students)
+        data = store.get(generator, num_students, seed=TRAIN_SEED)
 
         solver = NcsSolver(
             nb_grades=num_courses, nb_categories=num_category, max_grade=max_grade
         )
 
+        # only the solve is timed, not the generation or the cache reads
+        start_time = time.time()
         solver.solve(data)
 
         x.append(max_grade)
@@ -407,7 +406,7 @@ def get_matrix_conf():
     )
     true_params = generator.get_parameters()
 
-    data = generator.generate(num_students)
+    data = store.get(generator, num_students, seed=TRAIN_SEED)
 
     solver = NcsSolver(nb_grades=num_grades, nb_categories=num_categories, max_grade=20)
 
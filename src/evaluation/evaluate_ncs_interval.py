@@ -5,6 +5,7 @@ from typing import Dict, List, Any
 from sklearn.metrics import confusion_matrix, f1_score
 import seaborn as sns
 
+from src.datasets.dataset import stack_classified
 from src.ncs.solver_relaxed_interval import RelaxedIntervalNcsSolver
 from src.ncs.generator_interval import IntervalGenerator
 from src.ncs.classifier_interval import IntervalClassifier
@@ -30,12 +31,8 @@ def evaluate_ncs(gen_params: Dict[str, Any], solver_params: Dict[str, Any]) -> N
     classifier_solver = IntervalClassifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     return f1_score(pred_classes, true_classes, average="macro")
 
@@ -53,12 +50,8 @@ def confusion_matrix_ncs(
     classifier_solver = IntervalClassifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     result = confusion_matrix(pred_classes, true_classes)
     sns.heatmap(result, annot=True, cmap="Blues")
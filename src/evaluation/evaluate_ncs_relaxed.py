@@ -6,6 +6,7 @@ import seaborn as sns
 import time
 from src.evaluation.evaluate_mr_sort import evaluate_multiclass
 
+from src.datasets.dataset import stack_classified
 from src.ncs.classifier import Classifier
 from src.ncs.generator import Generator
 from src.ncs.solver_relaxed import RelaxedNcsSolver
@@ -34,12 +35,8 @@ def evaluate_ncs(gen_params: Dict[str, Any], solver_params: Dict[str, Any]) -> N
     classifier_solver = Classifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     return f1_score(pred_classes, true_classes, average="macro")
 
@@ -57,12 +54,8 @@ def confusion_matrix_ncs(
     classifier_solver = Classifier(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
-    pred_classes = []
-    true_classes = []
-    for category_real, grades_set_real in data_true_classified.items():
-        for grades_real in grades_set_real:
-            pred_classes.append(classifier_solver.classify_one(grades_real))
-            true_classes.append(category_real)
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
 
     result = confusion_matrix(pred_classes, true_classes)
     sns.heatmap(result, annot=True, cmap="Blues")
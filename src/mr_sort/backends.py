@@ -0,0 +1,464 @@
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+import time
+import numpy as np
+from scipy import sparse
+
+from src import config
+
+# Un terme d'une contrainte ou de l'objectif: des coefficients et des indices de
+# variables, diffusés l'un à l'autre
+Term = Tuple[Union[float, np.ndarray], Union[int, np.ndarray]]
+
+
+class BackendError(RuntimeError):
+    """
+    Le backend n'a pas pu résoudre le modèle (paquet absent, licence limitée...)
+    """
+
+
+class MatrixModel:
+    """
+    Programme linéaire en nombres mixtes sous forme de matrice creuse, indépendant du
+    solveur qui le résout
+    Les variables sont désignées par leurs indices, rangés dans des tableaux numpy de
+    la forme voulue. Chaque famille de contraintes est ajoutée d'un coup:
+    lower <= somme des coefficients * variables <= upper, les termes étant diffusés
+    à la forme des contraintes (un terme avec une dimension de plus est sommé sur sa
+    dernière dimension)
+    """
+
+    def __init__(self, name: str = "MR sort"):
+        """
+        Pour créer un modèle vide
+        :param name: le nom du modèle
+        """
+        self.name = name
+        self.lb = np.zeros(0)
+        self.ub = np.zeros(0)
+        self.integrality = np.zeros(0, dtype=bool)
+        self.lower = np.zeros(0)
+        self.upper = np.zeros(0)
+        self.objective = np.zeros(0)
+        self.maximize = False
+        # incrémenté à chaque ajout de variables ou de contraintes: un backend peut
+        # réutiliser un modèle déjà chargé tant que la version ne change pas
+        self.version = 0
+        self.__rows: List[np.ndarray] = []
+        self.__columns: List[np.ndarray] = []
+        self.__values: List[np.ndarray] = []
+        self.__matrix: Optional[sparse.csr_matrix] = None
+
+    @property
+    def nb_variables(self) -> int:
+        return len(self.lb)
+
+    @property
+    def nb_constraints(self) -> int:
+        return len(self.lower)
+
+    @property
+    def nb_nonzeros(self) -> int:
+        return self.matrix.nnz
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """
+        La matrice (nb_contraintes, nb_variables) des coefficients des contraintes
+        """
+        if self.__matrix is None:
+            self.__matrix = sparse.csr_matrix(
+                (
+                    np.concatenate([np.zeros(0)] + self.__values),
+                    (
+                        np.concatenate([np.zeros(0, dtype=np.int64)] + self.__rows),
+                        np.concatenate([np.zeros(0, dtype=np.int64)] + self.__columns),
+                    ),
+                ),
+                shape=(self.nb_constraints, self.nb_variables),
+            )
+        return self.__matrix
+
+    def add_variables(
+        self,
+        shape: Union[int, Tuple[int, ...]],
+        lb: Union[float, np.ndarray] = 0.0,
+        ub: Union[float, np.ndarray] = np.inf,
+        binary: bool = False,
+    ) -> np.ndarray:
+        """
+        Pour ajouter un tableau de variables
+        :param shape: la forme du tableau
+        :param lb: la borne inférieure des variables
+        :param ub: la borne supérieure des variables
+        :param binary: pour des variables binaires (les bornes sont alors 0 et 1)
+        :return: les indices des variables, sous la forme voulue
+        """
+        indices = self.nb_variables + np.arange(int(np.prod(shape))).reshape(shape)
+        if binary:
+            lb, ub = 0.0, 1.0
+        self.lb = np.concatenate([self.lb, np.broadcast_to(lb, indices.shape).ravel()])
+        self.ub = np.concatenate([self.ub, np.broadcast_to(ub, indices.shape).ravel()])
+        self.integrality = np.concatenate(
+            [self.integrality, np.full(indices.size, binary)]
+        )
+        self.objective = np.concatenate([self.objective, np.zeros(indices.size)])
+        self.__matrix = None
+        self.version += 1
+        return indices
+
+    def set_bounds(
+        self,
+        variables: np.ndarray,
+        lb: Optional[Union[float, np.ndarray]] = None,
+        ub: Optional[Union[float, np.ndarray]] = None,
+    ) -> None:
+        """
+        Pour modifier les bornes de variables existantes
+        :param variables: les indices des variables
+        :param lb: la nouvelle borne inférieure (inchangée si None)
+        :param ub: la nouvelle borne supérieure (inchangée si None)
+        :return: None
+        """
+        if lb is not None:
+            self.lb[variables] = lb
+        if ub is not None:
+            self.ub[variables] = ub
+
+    def add_constraints(
+        self,
+        shape: Union[int, Tuple[int, ...]],
+        terms: Sequence[Term],
+        lower: Union[float, np.ndarray] = -np.inf,
+        upper: Union[float, np.ndarray] = np.inf,
+    ) -> np.ndarray:
+        """
+        Pour ajouter une famille de contraintes lower <= somme des termes <= upper
+        :param shape: la forme du tableau des contraintes
+        :param terms: les termes (coefficients, indices des variables), diffusés à la forme des contraintes ou, avec une dimension de plus, sommés sur cette dimension
+        :param lower: la borne inférieure de chaque contrainte (-inf pour une contrainte <=)
+        :param upper: la borne supérieure de chaque contrainte (inf pour une contrainte >=)
+        :return: les indices des contraintes, sous la forme voulue
+        """
+        rows = self.nb_constraints + np.arange(int(np.prod(shape))).reshape(shape)
+        for coefficients, variables in terms:
+            variables = np.asarray(variables)
+            coefficients = np.asarray(coefficients, dtype=float)
+            target = rows.shape
+            expanded = rows
+            if variables.ndim > rows.ndim:
+                target = rows.shape + variables.shape[-1:]
+                expanded = rows[..., None]
+            values = np.broadcast_to(coefficients, target).ravel()
+            nonzero = values != 0
+            self.__rows.append(np.broadcast_to(expanded, target).ravel()[nonzero])
+            self.__columns.append(np.broadcast_to(variables, target).ravel()[nonzero])
+            self.__values.append(values[nonzero])
+        self.lower = np.concatenate(
+            [self.lower, np.broadcast_to(lower, rows.shape).ravel()]
+        )
+        self.upper = np.concatenate(
+            [self.upper, np.broadcast_to(upper, rows.shape).ravel()]
+        )
+        self.__matrix = None
+        self.version += 1
+        return rows
+
+    def set_constraint_bounds(
+        self,
+        rows: np.ndarray,
+        lower: Optional[Union[float, np.ndarray]] = None,
+        upper: Optional[Union[float, np.ndarray]] = None,
+    ) -> None:
+        """
+        Pour modifier les bornes (seconds membres) de contraintes existantes
+        :param rows: les indices des contraintes
+        :param lower: la nouvelle borne inférieure (inchangée si None)
+        :param upper: la nouvelle borne supérieure (inchangée si None)
+        :return: None
+        """
+        if lower is not None:
+            self.lower[rows] = lower
+        if upper is not None:
+            self.upper[rows] = upper
+
+    def set_objective(self, terms: Iterable[Term], maximize: bool = False) -> None:
+        """
+        Pour définir l'objectif, somme de tous les coefficients * variables des termes
+        :param terms: les termes (coefficients, indices des variables)
+        :param maximize: pour maximiser l'objectif plutôt que le minimiser
+        :return: None
+        """
+        self.objective = np.zeros(self.nb_variables)
+        for coefficients, variables in terms:
+            variables = np.asarray(variables)
+            coefficients = np.broadcast_to(
+                np.asarray(coefficients, dtype=float), variables.shape
+            )
+            np.add.at(self.objective, variables.ravel(), coefficients.ravel())
+        self.maximize = maximize
+
+
+class Solution:
+    """
+    Solution optimale d'un MatrixModel
+    """
+
+    __slots__ = ("x", "objective", "runtime", "node_count", "load_time")
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        objective: float,
+        runtime: float,
+        node_count: Optional[float],
+        load_time: float,
+    ):
+        """
+        :param x: la valeur de chaque variable
+        :param objective: la valeur de l'objectif
+        :param runtime: la durée de résolution, en secondes
+        :param node_count: le nombre de nœuds explorés par le branch and bound (None si le backend ne le donne pas)
+        :param load_time: la durée de transmission du modèle au backend, en secondes
+        """
+        self.x = x
+        self.objective = objective
+        self.runtime = runtime
+        self.node_count = node_count
+        self.load_time = load_time
+
+
+class GurobiBackend:
+    """
+    Résolution avec Gurobi, importé seulement à la première résolution
+    """
+
+    name = "gurobi"
+
+    def __init__(self, **params: Any):
+        """
+        :param params: les paramètres Gurobi (par exemple TimeLimit). DualReductions vaut 0 par défaut, pour distinguer un modèle infaisable d'un modèle non borné
+        """
+        self.params = {"OutputFlag": 0, "DualReductions": 0, **params}
+        self.model = None
+        # the MatrixModel loaded in self.model, and its version when it was loaded
+        self.source = None
+        self.version = None
+        self.x = None
+        self.constraints = None
+        # the ranged rows (both bounds finite and different) and their <= upper half
+        self.ranged = None
+        self.upper_constraints = None
+
+    def solve(self, model: MatrixModel) -> Solution:
+        """
+        Pour résoudre un modèle
+        Si le même modèle a déjà été chargé et que seules ses bornes, les seconds
+        membres de ses contraintes ou son objectif ont changé, le modèle Gurobi est mis
+        à jour (setAttr) et réoptimisé au lieu d'être reconstruit
+        :param model: le modèle
+        :return: la solution optimale
+        """
+        try:
+            import gurobipy as gp
+        except ImportError as error:
+            raise BackendError("gurobipy n'est pas installé") from error
+
+        start = time.perf_counter()
+        try:
+            if (
+                self.source is model
+                and self.version == model.version
+                and np.array_equal(self.ranged, self.__ranged(model))
+            ):
+                self.__update(gp, model)
+            else:
+                self.__load(gp, model)
+            load_time = time.perf_counter() - start
+            self.model.optimize()
+        except gp.GurobiError as error:
+            raise BackendError(f"Gurobi: {error}") from error
+
+        status = self.model.status
+        if status == gp.GRB.INFEASIBLE:
+            raise ValueError("Model was proven to be infeasible.")
+        if status == gp.GRB.INF_OR_UNBD:
+            raise ValueError("Model was proven to be either infeasible or unbounded.")
+        if status == gp.GRB.UNBOUNDED:
+            raise ValueError("Model was proven to be unbounded.")
+        if status != gp.GRB.OPTIMAL:
+            logging.warning("Model status code: %s", status)
+            raise ValueError("Model didn't find optimal solution.")
+        return Solution(
+            self.x.X,
+            self.model.ObjVal,
+            self.model.Runtime,
+            self.model.NodeCount,
+            load_time,
+        )
+
+    def __load(self, gp: Any, model: MatrixModel) -> None:
+        """
+        Pour construire le modèle Gurobi
+        :param gp: le module gurobipy
+        :param model: le modèle
+        :return: None
+        """
+        self.source, self.version = None, None
+        self.model = gp.Model(model.name)
+        for name, value in self.params.items():
+            self.model.setParam(name, value)
+        integral = model.integrality
+        vtype = np.where(integral, gp.GRB.INTEGER, gp.GRB.CONTINUOUS)
+        vtype[integral & (model.lb == 0) & (model.ub == 1)] = gp.GRB.BINARY
+        self.x = self.model.addMVar(
+            model.nb_variables, lb=model.lb, ub=model.ub, vtype=vtype
+        )
+        sense, rhs = self.__sense(gp, model)
+        self.constraints = self.model.addMConstr(model.matrix, self.x, sense, rhs)
+        # Gurobi has no matrix ranged constraints: the rows keep lower <= ... and
+        # ranged rows get a second constraint ... <= upper
+        self.ranged = self.__ranged(model)
+        self.upper_constraints = None
+        if self.ranged.size:
+            self.upper_constraints = self.model.addMConstr(
+                model.matrix[self.ranged],
+                self.x,
+                gp.GRB.LESS_EQUAL,
+                model.upper[self.ranged],
+            )
+        self.__set_objective(gp, model)
+        self.model.update()
+        self.source, self.version = model, model.version
+
+    def __update(self, gp: Any, model: MatrixModel) -> None:
+        """
+        Pour reporter les bornes, les seconds membres et l'objectif d'un modèle déjà
+        chargé
+        :param gp: le module gurobipy
+        :param model: le modèle
+        :return: None
+        """
+        self.x.setAttr("LB", model.lb)
+        self.x.setAttr("UB", model.ub)
+        sense, rhs = self.__sense(gp, model)
+        self.constraints.setAttr("Sense", sense)
+        self.constraints.setAttr("RHS", rhs)
+        if self.upper_constraints is not None:
+            self.upper_constraints.setAttr("RHS", model.upper[self.ranged])
+        self.__set_objective(gp, model)
+        self.model.update()
+
+    @staticmethod
+    def __sense(gp: Any, model: MatrixModel) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pour écrire les contraintes lower <= ... <= upper sous la forme de Gurobi
+        (un sens et un second membre): les contraintes à deux bornes finies gardent
+        lower <= ..., leur borne supérieure est ajoutée à part (voir __ranged)
+        :param gp: le module gurobipy
+        :param model: le modèle
+        :return: le sens et le second membre de chaque contrainte
+        """
+        sense = np.where(
+            model.lower == model.upper,
+            gp.GRB.EQUAL,
+            np.where(np.isinf(model.lower), gp.GRB.LESS_EQUAL, gp.GRB.GREATER_EQUAL),
+        )
+        rhs = np.where(sense == gp.GRB.LESS_EQUAL, model.upper, model.lower)
+        return sense, rhs
+
+    @staticmethod
+    def __ranged(model: MatrixModel) -> np.ndarray:
+        """
+        Pour trouver les contraintes à deux bornes finies et différentes
+        :param model: le modèle
+        :return: les indices de ces contraintes
+        """
+        return np.flatnonzero(
+            np.isfinite(model.lower)
+            & np.isfinite(model.upper)
+            & (model.lower != model.upper)
+        )
+
+    def __set_objective(self, gp: Any, model: MatrixModel) -> None:
+        """
+        Pour reporter l'objectif du modèle
+        :param gp: le module gurobipy
+        :param model: le modèle
+        :return: None
+        """
+        self.x.setAttr("Obj", model.objective)
+        self.model.ModelSense = gp.GRB.MAXIMIZE if model.maximize else gp.GRB.MINIMIZE
+
+
+class HighsBackend:
+    """
+    Résolution avec HiGHS, par scipy.optimize.milp (sans licence)
+    """
+
+    name = "highs"
+
+    def __init__(self, **options: Any):
+        """
+        :param options: les options de scipy.optimize.milp (par exemple time_limit)
+        """
+        self.options = options
+
+    def solve(self, model: MatrixModel) -> Solution:
+        """
+        Pour résoudre un modèle
+        :param model: le modèle
+        :return: la solution optimale
+        """
+        try:
+            from scipy.optimize import Bounds, LinearConstraint, milp
+        except ImportError as error:
+            raise BackendError(
+                "scipy.optimize.milp demande scipy 1.9 ou plus récent"
+            ) from error
+
+        start = time.perf_counter()
+        sign = -1 if model.maximize else 1
+        constraints = []
+        if model.nb_constraints:
+            constraints = [LinearConstraint(model.matrix, model.lower, model.upper)]
+        load_time = time.perf_counter() - start
+        result = milp(
+            sign * model.objective,
+            integrality=model.integrality.astype(np.uint8),
+            bounds=Bounds(model.lb, model.ub),
+            constraints=constraints,
+            options=self.options,
+        )
+        runtime = time.perf_counter() - start - load_time
+
+        if result.status == 2:
+            raise ValueError("Model was proven to be infeasible.")
+        if result.status == 3:
+            raise ValueError("Model was proven to be unbounded.")
+        if result.status != 0:
+            logging.warning("Model status: %s", result.message)
+            raise ValueError("Model didn't find optimal solution.")
+        return Solution(
+            result.x,
+            sign * result.fun,
+            runtime,
+            getattr(result, "mip_node_count", None),
+            load_time,
+        )
+
+
+BACKENDS = {backend.name: backend for backend in (GurobiBackend, HighsBackend)}
+
+
+def get_backend(name: Optional[str] = None, **options: Any):
+    """
+    Pour créer un backend à partir de son nom
+    :param name: "gurobi" ou "highs" (par défaut, config.MILP_BACKEND)
+    :param options: les paramètres du backend
+    :return: le backend
+    """
+    name = config.MILP_BACKEND if name is None else name
+    if name not in BACKENDS:
+        raise ValueError(f"Backend inconnu: {name} (backends: {list(BACKENDS)})")
+    return BACKENDS[name](**options)
@@ -1,9 +1,16 @@
 from typing import List, Dict
 from itertools import combinations, chain
 import numpy as np
+from src.datasets.dataset import label_dtype
+from src.datasets.partition import Partition
 
 
 class BinaryClassifier:
+    # Noms des catégories, l'étiquette renvoyée par classify_many étant leur position
+    categories = ("rejected", "accepted")
+    # Nombre de catégories sans compter la catégorie nulle, comme pour les autres classifieurs
+    nb_categories = 1
+
     def __init__(self, **kwargs):
         """
         Pour initialiser le générateur
@@ -26,16 +33,24 @@ class BinaryClassifier:
         self.poids = poids
         self.lam = lam
 
-    def classify(self, data: List[List[int]]) -> Dict[str, List[List[int]]]:
+    def classify_many(self, data: List[List[int]]) -> np.ndarray:
         """
-        To classify elements according to the parameters
+        Pour classer un ensemble de notes sans le découper par catégorie
         :param data: les ensembles de notes à classer
-        :return: les ensembles de notes classés
+        :return: l'étiquette de chaque ensemble de notes (1 pour "accepted", 0 pour "rejected")
         """
+        data = np.asarray(data)
         results = ((data >= self.border) * self.poids).sum(axis=1) > self.lam
-        accepted = data[results, :]
-        rejected = data[~results, :]
-        return {"accepted": accepted, "rejected": rejected}
+        return results.astype(label_dtype(self.nb_categories + 1))
+
+    def classify(self, data: List[List[int]]) -> Partition:
+        """
+        To classify elements according to the parameters
+        :param data: les ensembles de notes à classer
+        :return: les ensembles de notes classés, sous la forme {"accepted": ..., "rejected": ...}
+        """
+        data = np.asarray(data)
+        return Partition(data, self.classify_many(data), 2, self.categories)
 
     def classify_one(self, grades: List[int]) -> str:
         """
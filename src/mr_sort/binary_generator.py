@@ -1,16 +1,21 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 import numpy as np
-import random as rd
 from math import floor
+from src.datasets.partition import Partition
+from src.datasets.sampling import BaseGenerator
 from src.mr_sort.binary_classifier import BinaryClassifier
 
 
-class BinaryGenerator:
-    def __init__(self, **kwargs):
+class BinaryGenerator(BaseGenerator):
+    noise_model = "element"
+
+    def __init__(self, seed: Optional[Any] = None, **kwargs):
         """
         Pour initialiser le générateur
         Appelle reset_parameter
+        :param seed: la graine du générateur aléatoire (entier, SeedSequence...), None pour une graine aléatoire
         """
+        self.rng = np.random.default_rng(seed)
         self.nb_grades = None
         self.max_grade = None
         self.border = None
@@ -49,15 +54,16 @@ class BinaryGenerator:
         Génère des paramètres de génération des données aléatoires
         :return: None
         """
-        self.nb_grades = rd.randint(3, 10)
-        self.max_grade = rd.randint(5, 100)
+        self.nb_grades = int(self.rng.integers(3, 11))
+        self.max_grade = int(self.rng.integers(5, 101))
         self.border = [
-            floor(rd.random() * (self.max_grade + 1)) for _ in range(self.nb_grades)
+            floor(self.rng.random() * (self.max_grade + 1))
+            for _ in range(self.nb_grades)
         ]
-        poids = [rd.random() for _ in range(self.nb_grades)]
+        poids = [self.rng.random() for _ in range(self.nb_grades)]
         total = sum(poids)
         self.poids = [p / total for p in poids]
-        self.lam = rd.random()
+        self.lam = self.rng.random()
         self.classifier = BinaryClassifier(
             border=self.border, poids=self.poids, lam=self.lam
         )
@@ -75,21 +81,24 @@ class BinaryGenerator:
             "lam": self.lam,
         }
 
-    def generate(self, nb_data: int, noise: Optional[float] = None):
+    def partition(self, data: np.ndarray, labels: np.ndarray) -> Partition:
+        """
+        Pour regrouper des données étiquetées par catégorie
+        :param data: la matrice des notes
+        :param labels: l'étiquette de chaque ensemble de notes (1 pour "accepted", 0 pour "rejected")
+        :return: les données sous la forme {"accepted": ..., "rejected": ...}
+        """
+        return Partition(data, labels, 2, BinaryClassifier.categories)
+
+    def generate(
+        self, nb_data: int, noise: Optional[float] = None, noise_model: str = "element"
+    ) -> Partition:
         """
         Pour générer nb_data nouvelles données, avec du bruit
+        Les données sont classées avant l'ajout du bruit
         :param nb_data: nombre de données à générer
-        :param noise_var: la variance du bruit blanc à ajouter aux données
-        :param raw: si les données brutes doivent être renvoyées ou non
+        :param noise: la variance du bruit blanc à ajouter aux données
+        :param noise_model: "element" pour un bruit par note, "row" pour un bruit par ligne
         :return: les données sous la forme {"accepted": np.array([[1, 2, 3, 4, 5], [1, 1, 1, 1, 1]]), "rejected" : np.array([[1, 5, 6, 7, 8]])}
         """
-        data = np.random.rand(nb_data, self.nb_grades) * self.max_grade
-        results = self.classifier.classify(data)
-        accepted = results["accepted"]
-        rejected = results["rejected"]
-        if noise is not None:
-            accepted = accepted + np.random.normal(0, noise, accepted.shape)
-            rejected = rejected + np.random.normal(0, noise, rejected.shape)
-        classified = {"accepted": accepted, "rejected": rejected}
-
-        return classified
+        return super().generate(nb_data, noise, noise_model)
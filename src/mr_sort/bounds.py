@@ -0,0 +1,26 @@
+from typing import Tuple
+import numpy as np
+
+
+def boundary_bounds(
+    grades: np.ndarray, small: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pour borner les frontières de chaque matière à partir des notes observées et en
+    déduire la plus petite constante big-M valable pour chaque matière
+    Une frontière inférieure à la note minimale valide la matière pour tous les
+    étudiants, comme une frontière égale à cette note, et une frontière supérieure à la
+    note maximale (plus small) ne la valide pour aucun: borner les frontières ne change
+    donc pas les classements possibles des données
+    :param grades: la matrice (nb_étudiants, nb_matières) des notes
+    :param small: l'écart minimal entre une note et une frontière qu'elle ne dépasse pas
+    :return: la borne inférieure et la borne supérieure de chaque frontière, et la constante big-M de chaque matière
+    """
+    grades = np.asarray(grades, dtype=float)
+    if len(grades) == 0:
+        zeros = np.zeros(grades.shape[1])
+        return zeros, zeros + small, zeros + small
+    low = grades.min(axis=0)
+    high = grades.max(axis=0) + small
+    # |note - frontière| <= high - low pour toute note et toute frontière bornée
+    return low, high, high - low
@@ -0,0 +1,77 @@
+from typing import List, Tuple
+import numpy as np
+
+from src.mr_sort.backends import MatrixModel
+
+# Formulations des solveurs MR-Sort: une variable binaire par (matière, étudiant)
+# reliée à la frontière par une constante big-M, ou une chaîne de variables binaires
+# sur les notes distinctes de chaque matière
+FORMULATIONS = ("big-m", "breakpoints")
+
+
+def check_formulation(formulation: str) -> None:
+    """
+    Pour vérifier le nom d'une formulation
+    :param formulation: le nom de la formulation
+    :return: None
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(
+            f"Formulation inconnue: {formulation} (formulations: {FORMULATIONS})"
+        )
+
+
+def grade_breakpoints(grades: np.ndarray) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Pour trouver les notes distinctes de chaque matière
+    Sur des données d'entraînement, une frontière n'importe que par les notes
+    observées qu'elle laisse au-dessus d'elle: elle peut être choisie parmi les notes
+    distinctes de sa matière (ou au-dessus de la plus grande)
+    :param grades: la matrice (nb_étudiants, nb_matières) des notes
+    :return: les notes distinctes triées de chaque matière, et la matrice (nb_étudiants, nb_matières) de la position de chaque note dans la concaténation de ces listes
+    """
+    grades = np.asarray(grades, dtype=float)
+    values = []
+    index = np.empty(grades.shape, dtype=np.int64)
+    offset = 0
+    for course in range(grades.shape[1]):
+        distinct, inverse = np.unique(grades[:, course], return_inverse=True)
+        values.append(distinct)
+        index[:, course] = offset + inverse
+        offset += len(distinct)
+    return values, index
+
+
+def add_breakpoint_chain(
+    model: MatrixModel, border: np.ndarray, values: List[np.ndarray], small: float
+) -> np.ndarray:
+    """
+    Pour modéliser des frontières par des chaînes de variables binaires
+    z[k] vaut 1 si la k-ième note distincte (voir grade_breakpoints) est au-dessus de
+    la frontière de sa matière: dans chaque matière, z est croissant et la frontière
+    vaut la plus petite note validée, ou la plus grande note plus small si aucune
+    ne l'est
+    :param model: le modèle
+    :param border: les indices des frontières de chaque matière
+    :param values: les notes distinctes triées de chaque matière
+    :param small: l'écart entre la plus grande note et une frontière qui ne la valide pas
+    :return: les indices des variables binaires z, une par note distincte
+    """
+    z = model.add_variables(sum(map(len, values)), binary=True)
+    offset = 0
+    for course, distinct in enumerate(values):
+        chain = z[offset : offset + len(distinct)]
+        offset += len(distinct)
+        if len(distinct) == 0:
+            continue
+        model.add_constraints(
+            len(distinct) - 1, [(1, chain[:-1]), (-1, chain[1:])], upper=0
+        )
+        # each grade that is not validated moves the border up to the next one:
+        # border = distinct[0] + steps @ (1 - chain)
+        steps = np.append(np.diff(distinct), small)
+        top = distinct[0] + steps.sum()
+        model.add_constraints(
+            (), [(1, border[course]), (steps, chain)], lower=top, upper=top
+        )
+    return z
@@ -1,6 +1,14 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from itertools import combinations, chain
 import numpy as np
+from src.datasets.dataset import label_dtype
+from src.datasets.partition import Partition
+from src.ncs.coalitions import (
+    MAX_TABLE_GRADES,
+    CoalitionSet,
+    pack_masks,
+    weighted_coalitions,
+)
 
 
 class Classifier:
@@ -26,27 +34,63 @@ class Classifier:
         self.borders = borders
         self.poids = poids
         self.lam = lam
+        self.__coalitions = None
 
-    def classify(self, data: List[List[int]]) -> Dict[int, List[List[int]]]:
+    @property
+    def coalitions(self) -> Optional[CoalitionSet]:
+        """
+        Les coalitions suffisantes équivalentes aux poids et au seuil, calculées au
+        premier accès (un attribut, comme pour les classifieurs NCS)
+        :return: l'ensemble des coalitions (avec sa table dense), ou None au-delà de MAX_TABLE_GRADES matières
+        """
+        if self.__coalitions is None and self.nb_grades <= MAX_TABLE_GRADES:
+            self.__coalitions = weighted_coalitions(self.poids, self.lam)
+        return self.__coalitions
+
+    def scores(self, data: List[List[int]]) -> np.ndarray:
+        """
+        Pour calculer les sommes pondérées des critères validés, pour chaque catégorie
+        Les poids sont accumulés critère par critère, dans le même ordre que classify_one,
+        pour obtenir exactement les mêmes flottants
+        :param data: les ensembles de notes à évaluer
+        :return: la matrice (nb_données, nb_catégories) des sommes pondérées
+        """
+        data = np.asarray(data)
+        borders = np.asarray(self.borders)
+        passed = data[:, np.newaxis, :] >= borders
+        scores = np.zeros(passed.shape[:2])
+        for i in range(self.nb_grades):
+            scores += np.where(passed[:, :, i], self.poids[i], 0.0)
+        return scores
+
+    def classify_many(self, data: List[List[int]]) -> np.ndarray:
+        """
+        Pour classer un ensemble de notes sans le découper par catégorie
+        Jusqu'à MAX_TABLE_GRADES matières, les matières validées sont codées en masque
+        et cherchées dans la table des coalitions suffisantes, comme pour NCS; au-delà,
+        les sommes pondérées sont calculées
+        :param data: les ensembles de notes à classer
+        :return: le numéro de catégorie de chaque ensemble de notes (int8 jusqu'à 127 catégories, voir label_dtype)
+        """
+        coalitions = self.coalitions
+        if coalitions is None:
+            validated = self.scores(data) >= self.lam
+        else:
+            passed = np.asarray(data)[:, np.newaxis, :] >= np.asarray(self.borders)
+            validated = coalitions.contains(pack_masks(passed))
+        labels = np.zeros(validated.shape[0], dtype=label_dtype(self.nb_categories + 1))
+        for category in range(1, self.nb_categories + 1):
+            labels[validated[:, category - 1]] = category
+        return labels
+
+    def classify(self, data: List[List[int]]) -> Partition:
         """
         To classify elements according to the parameters
         :param data: les ensembles de notes à classer
-        :return: les ensembles de notes classés
+        :return: les ensembles de notes classés, sous la forme {catégorie: ensembles de notes}
         """
-        data = np.array(data)
-        results = {}
-        for category in range(self.nb_categories, 0, -1):
-            students_in_category = []
-            for i, row in enumerate(data >= self.borders[category - 1]):
-                tot_sum = sum([self.poids[j] for j in list(np.where(row)[0])])
-                if tot_sum >= self.lam:
-                    students_in_category.append(i)
-            mask = np.zeros(data.shape[0], dtype=bool)
-            mask[students_in_category] = True
-            results[category] = data[mask, :]
-            data = data[~mask, :]
-        results[0] = data
-        return results
+        data = np.asarray(data)
+        return Partition(data, self.classify_many(data), self.nb_categories + 1)
 
     def classify_one(self, grades: List[int]) -> int:
         """
@@ -1,15 +1,17 @@
 from typing import Any, List, Dict, Optional
 import numpy as np
-import random as rd
+from src.datasets.sampling import BaseGenerator
 from src.mr_sort.classifier import Classifier
 
 
-class Generator:
-    def __init__(self, **kwargs) -> None:
+class Generator(BaseGenerator):
+    def __init__(self, seed: Optional[Any] = None, **kwargs) -> None:
         """
         Pour initialiser le générateur
         Appelle reset_parameter
+        :param seed: la graine du générateur aléatoire (entier, SeedSequence...), None pour une graine aléatoire
         """
+        self.rng = np.random.default_rng(seed)
         self.nb_grades = None
         self.max_grade = None
         self.border = None
@@ -61,33 +63,16 @@ class Generator:
         Génère des paramètres de génération des données aléatoires
         :return: None
         """
-        nb_grades = rd.randint(3, 10)
-        max_grade = rd.randint(5, 100)
-        nb_categories = rd.randint(1, 5)
+        nb_grades = int(self.rng.integers(3, 11))
+        max_grade = int(self.rng.integers(5, 101))
+        nb_categories = int(self.rng.integers(1, 6))
         borders = []
         before = [max_grade for _ in range(nb_grades)]
         for _ in range(nb_categories):
-            before = [rd.random() * before[i] for i in range(nb_grades)]
+            before = [self.rng.random() * before[i] for i in range(nb_grades)]
             borders.append(before)
-        poids = [rd.random() for _ in range(nb_grades)]
+        poids = [self.rng.random() for _ in range(nb_grades)]
         total = sum(poids)
         poids = [p / total for p in poids]
-        lam = rd.random()
+        lam = self.rng.random()
         return self.set_parameters(max_grade, borders, poids, lam)
-
-    def generate(self, nb_data: int, noise_var: Optional[float] = None):
-        """
-        Pour générer nb_data nouvelles données, avec du bruit
-        :param nb_data: nombre de données à générer
-        :param noise_var: la variance du bruit blanc à ajouter aux données
-        :param raw: si les données brutes doivent être renvoyées ou non
-        :return: les données sous la forme {"accepted": np.array([[1, 2, 3, 4, 5], [1, 1, 1, 1, 1]]), "rejected" : np.array([[1, 5, 6, 7, 8]])}
-        """
-        data = np.random.rand(nb_data, self.nb_grades) * self.max_grade
-        results = self.classifier.classify(data)
-        if noise_var is not None:
-            results = {
-                k: [x + np.random.normal(0, noise_var) for x in v]
-                for k, v in results.items()
-            }
-        return results
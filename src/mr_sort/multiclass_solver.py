@@ -1,6 +1,15 @@
-from typing import Dict, List
-import gurobipy as gp
+from typing import Dict, List, Optional, Union
+import numpy as np
 import logging
+import time
+from src.datasets.dataset import Dataset
+from src.mr_sort.backends import MatrixModel, get_backend
+from src.mr_sort.bounds import boundary_bounds
+from src.mr_sort.breakpoints import (
+    add_breakpoint_chain,
+    check_formulation,
+    grade_breakpoints,
+)
 
 
 class MulticlassSolver:
@@ -9,9 +18,19 @@ class MulticlassSolver:
     """
 
     def __init__(
-        self, nb_grades: int, nb_students: int, nb_categories: int = 2
+        self,
+        nb_grades: int,
+        nb_students: int,
+        nb_categories: int = 2,
+        backend: Optional[str] = None,
     ) -> None:
-        """Initialize solver"""
+        """
+        Initialize solver
+        :param nb_grades: le nombre de matières
+        :param nb_students: le nombre d'étudiants
+        :param nb_categories: le nombre de catégories (sans compter la catégorie 0)
+        :param backend: le solveur MILP, "gurobi" ou "highs" (par défaut, config.MILP_BACKEND)
+        """
         nb_categories += 1
 
         assert nb_grades >= 1, nb_students >= 1
@@ -26,143 +45,235 @@ class MulticlassSolver:
         self.nb_categories = nb_categories
         self.nb_grades = nb_grades
         self.nb_students = nb_students
+        self.backend = get_backend(backend)
 
-        ####################
-        # Initialize model #
-        ####################
+        # The model and its variables are created by solve, once the number of
+        # distinct students is known, and kept for the next datasets of the same
+        # shape (see the template parameter of solve)
+        self.model = None
+        self.solution = None
+        self.__template = None
+
+    def solve(
+        self,
+        classified_students: Union[Dict[int, List[List[int]]], Dataset],
+        collapse: bool = True,
+        tight_bounds: bool = True,
+        formulation: str = "big-m",
+        template: bool = False,
+    ):
+        """
+        Find the right parameters
+        :param classified_students: les notes des étudiants de chaque catégorie, sous la forme {catégorie: ensembles de notes}, ou un Dataset
+        :param collapse: pour regrouper les étudiants identiques (mêmes notes, même catégorie) en un seul, compté autant de fois qu'il apparaît dans l'objectif
+        :param tight_bounds: pour borner les frontières par les notes observées, en déduire une constante big-M par matière (sinon, self.large pour toutes les matières) et imposer que les frontières croissent avec les catégories
+        :param formulation: "big-m" pour relier une variable binaire par (matière, étudiant, catégorie) à la frontière par une constante big-M, ou "breakpoints" pour remplacer ces variables par une chaîne de variables binaires croissante sur les notes distinctes de chaque matière, pour chaque catégorie (voir add_breakpoint_chain)
+        :param template: pour réutiliser le modèle du solve précédent s'il a la même forme (même nombre d'étudiants, mêmes options) en ne changeant que les seconds membres, les bornes et l'objectif; seulement avec la formulation "big-m", dont la structure ne dépend pas des notes
+        """
+        check_formulation(formulation)
+        dataset = Dataset.from_classified(classified_students)
+        if collapse:
+            dataset = dataset.collapse()
+        start = time.perf_counter()
+
+        grades_j_i = np.asarray(dataset.grades, dtype=float)
+        labels = np.asarray(dataset.labels)
+        weights = np.ones(len(labels)) if dataset.weights is None else dataset.weights
+
+        # big-M constant of each course
+        large_i = np.full(self.nb_grades, self.large)
+        low = high = None
+        if tight_bounds or formulation == "breakpoints":
+            low, high, large_i = boundary_bounds(grades_j_i, self.small)
+
+        # the rows of the model only depend on the data through their bounds, as
+        # long as the big-M constants of the template stay valid for the new grades
+        key = (len(labels), tight_bounds, formulation)
+        reusable = template and formulation == "big-m" and self.__template == key
+        if not (reusable and np.all(large_i <= self.large_i)):
+            if reusable:
+                # keep the constants of the previous datasets, so that they quickly
+                # cover the range of the grades and the template stops being rebuilt
+                large_i = np.maximum(large_i, self.large_i)
+            self.__build(grades_j_i, tight_bounds, formulation, large_i)
+            self.__template = key
+        self.__set_data(grades_j_i, labels, weights, low, high)
+
+        model = self.model
+        self.build_time = time.perf_counter() - start
+        logging.info(
+            "MR-Sort model: %d variables, %d constraints, %d nonzeros",
+            model.nb_variables,
+            model.nb_constraints,
+            model.nb_nonzeros,
+        )
 
-        self.model = gp.Model("MR sort")
+        # Solve
+        self.solution = self.backend.solve(model)
+        x = self.solution.x
+        return {
+            "lam": x[self.lambda_],
+            "borders": x[self.b_i_h],
+            "poids": x[self.w_i],
+        }
+
+    def __build(
+        self,
+        grades_j_i: np.ndarray,
+        tight_bounds: bool,
+        formulation: str,
+        large_i: np.ndarray,
+    ) -> None:
+        """
+        Pour construire le modèle: les variables et les contraintes, dont les bornes
+        sont renseignées par __set_data
+        :param grades_j_i: la matrice (nb_étudiants, nb_matières) des notes
+        :param tight_bounds: voir solve
+        :param formulation: voir solve
+        :param large_i: la constante big-M de chaque matière
+        :return: None
+        """
+        nb_students = len(grades_j_i)
+        model = MatrixModel("MR sort")
+        self.model = model
+        self.large_i = large_i
 
         ####################################
         # Problem representation variables #
         ####################################
 
         # weights of courses
-        self.w_i = self.model.addMVar(shape=(nb_grades,), name="weights (nb_grades)")
-
-        self.lambda_ = self.model.addVar(name="lambda_", lb=0)
+        self.w_i = model.add_variables(self.nb_grades, lb=0, ub=1)
 
-        # acceptance criteria
-        self.x_j_h = self.model.addMVar(
-            shape=(self.nb_students, self.nb_categories),
-            vtype=gp.GRB.BINARY,
-            name="maximizer",
-        )
+        self.lambda_ = model.add_variables((), lb=0, ub=1)
 
-        # continuous delta
-        self.c_i_j_h = self.model.addMVar(
-            shape=(self.nb_students, self.nb_categories, self.nb_grades),
-            name="continuous weights (nb_grades, nb_students, nb_categories)",
-            lb=0,
-        )
+        # Every student is at least in category 0: only the categories h >= 1 need
+        # variables, stored at index h - 1
+        nb_levels = self.nb_categories - 1
 
         # boudaries between validated/non-validated courses
-        self.b_i_h = self.model.addMVar(
-            shape=(self.nb_categories - 1, self.nb_grades),
-            name="boundaries (nb_grades, nb_categories)",
-        )
+        self.b_i_h = model.add_variables((nb_levels, self.nb_grades))
 
-        # delta
-        self.d_i_j_h = self.model.addMVar(
-            shape=(self.nb_students, self.nb_categories, self.nb_grades),
-            vtype=gp.GRB.BINARY,
-            name="deltas (nb_grades, nb_students, nb_categories)",
-        )
+        self.x_j_h = model.add_variables((nb_students, nb_levels), binary=True)
+        self.c_i_j_h = model.add_variables((nb_students, nb_levels, self.nb_grades))
+        self.d_i_j_h = None
+        if formulation == "big-m":
+            self.d_i_j_h = model.add_variables(
+                (nb_students, nb_levels, self.nb_grades), binary=True
+            )
 
-        self.model.update()
+        model.add_constraints((), [(1, self.w_i)], lower=1, upper=1)
 
-    def solve(self, classified_students: Dict[int, List[List[int]]]):
+        large = self.large
+        if tight_bounds:
+            # the weights sum to one, so the sum of validated weights is in [0, 1]
+            large = 1 + self.small
+            # the boundary of a category is above the one of the category below
+            model.add_constraints(
+                (nb_levels - 1, self.nb_grades),
+                [(1, self.b_i_h[1:, :]), (-1, self.b_i_h[:-1, :])],
+                lower=0,
+            )
 
-        self.model.addConstr(gp.quicksum(self.w_i) == 1)
-        self.model.addConstr(self.lambda_ <= 1)
+        # one chain of breakpoints per category, replacing the d_i_j_h binaries
+        self.z_h_k = []
+        if formulation == "breakpoints":
+            values, index = grade_breakpoints(grades_j_i)
+            for h in range(1, self.nb_categories):
+                self.z_h_k.append(
+                    add_breakpoint_chain(
+                        model, self.b_i_h[h - 1, :], values, self.small
+                    )
+                )
+            if tight_bounds:
+                # a grade above the boundary of a category is above the lower ones
+                for below, above in zip(self.z_h_k, self.z_h_k[1:]):
+                    model.add_constraints(
+                        len(above), [(1, above), (-1, below)], upper=0
+                    )
 
-        offset = 0
+        # rows whose bounds depend on the data, one array per category
+        self.above_border_rows = []
+        self.below_border_rows = []
+        self.lambda_rows = []
+        shape = (nb_students, self.nb_grades)
+        for h in range(1, self.nb_categories):
+            c_i_j = self.c_i_j_h[:, h - 1, :]
+            x_j = self.x_j_h[:, h - 1]
+            boundary = self.b_i_h[h - 1, :]
 
-        self.model.addConstrs(
-            self.w_i[i] >= self.c_i_j_h[j, h, i]
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-            for h in range(self.nb_categories)
-        )
+            if formulation == "big-m":
+                d_i_j = self.d_i_j_h[:, h - 1, :]
+                # d_i_j_h = 1 if the grade is above the boundary of category h:
+                # (d_i_j - 1) * large_i <= grades_j_i - boundary
+                self.below_border_rows.append(
+                    model.add_constraints(shape, [(large_i, d_i_j), (1, boundary)])
+                )
+                # grades_j_i + small - boundary <= d_i_j * large_i
+                self.above_border_rows.append(
+                    model.add_constraints(shape, [(large_i, d_i_j), (1, boundary)])
+                )
+            else:
+                d_i_j = self.z_h_k[h - 1][index]
 
-        self.model.addConstrs(
-            self.d_i_j_h[j, h, i] >= self.c_i_j_h[j, h, i]
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-            for h in range(self.nb_categories)
-        )
-        self.model.addConstrs(
-            self.c_i_j_h[j, h, i] >= self.d_i_j_h[j, h, i] + self.w_i[i] - 1
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-            for h in range(self.nb_categories)
-        )
+            # c_i_j_h = w_i if the course is validated, 0 otherwise
+            model.add_constraints(shape, [(1, c_i_j), (-1, self.w_i)], upper=0)
+            model.add_constraints(shape, [(1, c_i_j), (-1, d_i_j)], upper=0)
+            model.add_constraints(
+                shape, [(1, c_i_j), (-1, d_i_j), (-1, self.w_i)], lower=-1
+            )
+
+            # students of category >= h should better:
+            # sum of validated weights >= lambda + large * (1 - x_j)
+            # students of category < h should worse:
+            # sum of validated weights + large * x_j + small <= lambda
+            # both read sum of validated weights - lambda + large * x_j, only the
+            # bounds depend on the category of the student
+            self.lambda_rows.append(
+                model.add_constraints(
+                    nb_students, [(1, c_i_j), (-1, self.lambda_), (large, x_j)]
+                )
+            )
+        self.lambda_large = large
+
+    def __set_data(
+        self,
+        grades_j_i: np.ndarray,
+        labels: np.ndarray,
+        weights: np.ndarray,
+        low: Optional[np.ndarray],
+        high: Optional[np.ndarray],
+    ) -> None:
+        """
+        Pour renseigner les données dans le modèle construit par __build: les bornes
+        des contraintes et des frontières, et l'objectif
+        :param grades_j_i: la matrice (nb_étudiants, nb_matières) des notes
+        :param labels: la catégorie de chaque étudiant
+        :param weights: le nombre d'occurrences de chaque étudiant
+        :param low: la borne inférieure des frontières de chaque matière (None pour ne pas les borner)
+        :param high: la borne supérieure des frontières de chaque matière
+        :return: None
+        """
+        model = self.model
+        if low is not None:
+            model.set_bounds(self.b_i_h, low, high)
 
-        for category in range(self.nb_categories):
-            for j, student_grades in enumerate(classified_students[category]):
-                j = j + offset
-                for h in range(self.nb_categories):
-                    for i in range(len(student_grades)):
-
-                        if h != 0:
-                            self.model.addConstr(
-                                self.large * (self.d_i_j_h[j, h, i] - 1)
-                                <= student_grades[i] - self.b_i_h[h - 1, i]
-                            )
-                            self.model.addConstr(
-                                student_grades[i] + self.small - self.b_i_h[h - 1, i]
-                                <= self.large * self.d_i_j_h[j, h, i]
-                            )
-
-                        if h <= category:
-                            # student should better
-                            self.model.addConstr(
-                                gp.quicksum(self.c_i_j_h[j, h])
-                                >= self.lambda_ + self.large * (1 - self.x_j_h[j, h])
-                            )
-
-                        if h > category:
-                            # student should worse
-                            self.model.addConstr(
-                                gp.quicksum(self.c_i_j_h[j, h])
-                                + self.large * self.x_j_h[j, h]
-                                + self.small
-                                <= self.lambda_
-                            )
-            offset += len(classified_students[category])
+        for rows in self.below_border_rows:
+            model.set_constraint_bounds(rows, upper=grades_j_i + self.large_i)
+        for rows in self.above_border_rows:
+            model.set_constraint_bounds(rows, lower=grades_j_i + self.small)
+
+        for h, rows in enumerate(self.lambda_rows, start=1):
+            above = labels >= h
+            model.set_constraint_bounds(
+                rows,
+                lower=np.where(above, self.lambda_large, -np.inf),
+                upper=np.where(above, np.inf, -self.small),
+            )
 
         ###############################
         # Objectif function variables #
         ###############################
 
-        self.model.setObjective(
-            gp.quicksum(
-                [
-                    self.x_j_h[j, h]
-                    for j in range(self.nb_students)
-                    for h in range(self.nb_categories)
-                ]
-            ),
-            gp.GRB.MAXIMIZE,
-        )
-
-        # Solve
-        self.model.optimize()
-
-        if self.model.status == gp.GRB.INFEASIBLE:
-            self.model.computeIIS()
-            self.model.write("model.ilp")
-            raise ValueError("Model was proven to be infeasible.")
-        if self.model.status == gp.GRB.INF_OR_UNBD:
-            raise ValueError("Model was proven to be either infeasible or unbounded.")
-        if self.model.status == gp.GRB.UNBOUNDED:
-            raise ValueError("Model was proven to be unbounded.")
-        if self.model.status != gp.GRB.OPTIMAL:
-            logging.warning("Model status code: %s", self.model.status)
-            raise ValueError("Model didn't find optimal solution.")
-
-        return {
-            "lam": self.lambda_.X,
-            "borders": self.b_i_h.X,
-            "poids": self.w_i.X,
-        }
+        # each distinct student counts as many times as it occurs
+        model.set_objective([(weights[:, None], self.x_j_h)], maximize=True)
@@ -1,6 +1,16 @@
+from typing import Optional, Union
 from nptyping import NDArray
-import gurobipy as gp
-import logging
+import numpy as np
+import time
+from src.datasets.dataset import Dataset
+from src.mr_sort.backends import MatrixModel, get_backend
+from src.mr_sort.binary_classifier import BinaryClassifier
+from src.mr_sort.bounds import boundary_bounds
+from src.mr_sort.breakpoints import (
+    add_breakpoint_chain,
+    check_formulation,
+    grade_breakpoints,
+)
 
 
 class RelaxedBinarySolver:
@@ -10,174 +20,190 @@ class RelaxedBinarySolver:
 
     """
 
-    def __init__(self, nb_grades: int, nb_students: int) -> None:
-        """Initialize solver"""
+    def __init__(
+        self, nb_grades: int, nb_students: int, backend: Optional[str] = None
+    ) -> None:
+        """
+        Initialize solver
+        :param nb_grades: le nombre de matières
+        :param nb_students: le nombre d'étudiants
+        :param backend: le solveur MILP, "gurobi" ou "highs" (par défaut, config.MILP_BACKEND)
+        """
 
         assert nb_grades >= 1, nb_students >= 1
 
         self.nb_grades = nb_grades
         self.nb_students = nb_students
+        self.backend = get_backend(backend)
 
-        self.model = gp.Model("MR sort")
+        # The model and its variables are built by solve, once the number of
+        # distinct students is known
+        self.model = None
+        self.solution = None
 
-        self.model.setParam(gp.GRB.Param.DualReductions, 0)
+        ####################
+        # Useful variables #
+        ####################
+        self.small = 1e-3
+        self.large = 100
+
+    def solve(
+        self,
+        accepted_j_i: Union[NDArray[float], Dataset],
+        refused_j_i: Optional[NDArray[float]] = None,
+        collapse: bool = True,
+        tight_bounds: bool = True,
+        formulation: str = "big-m",
+    ):
+        """
+        Find the right parameters
+        :param accepted_j_i: les notes des étudiants acceptés, ou un Dataset contenant toutes les données
+        :param refused_j_i: les notes des étudiants refusés (inutile avec un Dataset)
+        :param collapse: pour regrouper les étudiants identiques (mêmes notes, même décision) en un seul, compté autant de fois qu'il apparaît dans l'objectif
+        :param tight_bounds: pour borner les frontières par les notes observées et en déduire une constante big-M par matière (sinon, self.large pour toutes les matières)
+        :param formulation: "big-m" pour relier une variable binaire par (matière, étudiant) à la frontière par une constante big-M, ou "breakpoints" pour remplacer ces variables par une chaîne de variables binaires croissante sur les notes distinctes de chaque matière (voir add_breakpoint_chain)
+        """
+        check_formulation(formulation)
+        dataset = accepted_j_i
+        if not isinstance(dataset, Dataset):
+            dataset = Dataset.from_classified(
+                {"accepted": accepted_j_i, "rejected": refused_j_i},
+                BinaryClassifier.categories,
+            )
+        if collapse:
+            dataset = dataset.collapse()
+        classified = dataset.to_partition()
+        accepted_j_i, refused_j_i = classified["accepted"], classified["rejected"]
+        nb_accepted = len(accepted_j_i)
+        nb_students = nb_accepted + len(refused_j_i)
+        start = time.perf_counter()
+
+        # Each constraint family is added in a single call: grades_i_j[i, j] is the
+        # grade of the j-th student in course i, accepted students first
+        grades_i_j = np.concatenate(
+            [
+                np.asarray(accepted_j_i, dtype=float).reshape(-1, self.nb_grades),
+                np.asarray(refused_j_i, dtype=float).reshape(-1, self.nb_grades),
+            ]
+        ).T
+        model = MatrixModel("MR sort")
+        self.model = model
 
         ####################################
         # Problem representation variables #
         ####################################
 
         # weights of courses
-        self.w_i = self.model.addMVar(shape=(nb_grades,), name="w_i")
+        self.w_i = model.add_variables(self.nb_grades, lb=0, ub=1)
 
         # boudaries between validated/non-validated courses
-        self.b_i = self.model.addMVar(shape=(nb_grades), name="b_i")
+        self.b_i = model.add_variables(self.nb_grades)
 
         # acceptance criteria
-        self.lambda_ = self.model.addVar(name="lambda_")
+        self.lambda_ = model.add_variables((), lb=0.5, ub=1)
 
-        self.d_i_j = self.model.addMVar(
-            shape=(nb_grades, nb_students), vtype=gp.GRB.BINARY
-        )
+        self.c_i_j = model.add_variables((self.nb_grades, nb_students), lb=0, ub=1)
 
-        self.c_i_j = self.model.addMVar(
-            shape=(nb_grades, nb_students), vtype=gp.GRB.CONTINUOUS
-        )
         ###############################
         # Objectif function variables #
         ###############################
 
-        # Alpha is continuous in [0, 1]
-        self.g_j = self.model.addMVar(shape=(nb_students), vtype=gp.GRB.BINARY)
-
-        ####################
-        # Useful variables #
-        ####################
-        self.small = 1e-3
-        self.large = 100
-
-        self.model.update()
-
-    def solve(self, accepted_j_i: NDArray[float], refused_j_i: NDArray[float]):
-        """Find the right parameters"""
-        nb_accepted = len(accepted_j_i)
-        nb_refused = len(refused_j_i)
+        # g_j = 1 if the student is well classified
+        self.g_j = model.add_variables(nb_students, binary=True)
+
+        b_i = self.b_i[:, None]
+        w_i = self.w_i[:, None]
+
+        # big-M constant of each course
+        large = self.large
+        large_i = np.full((self.nb_grades, 1), self.large)
+        if tight_bounds or formulation == "breakpoints":
+            low, high, large_i = boundary_bounds(grades_i_j.T, self.small)
+            model.set_bounds(self.b_i, low, high)
+            large_i = large_i[:, None]
+            # the weights sum to one, so the sum of validated weights is in [0, 1]
+            large = 1 + self.small
+
+        self.d_i_j = None
+        self.z_k = None
+        if formulation == "big-m":
+            self.d_i_j = model.add_variables((self.nb_grades, nb_students), binary=True)
+            d_i_j = self.d_i_j
+        else:
+            # the grade of a student is validated if its breakpoint is: the d_i_j
+            # binaries are replaced by the chains
+            values, index = grade_breakpoints(grades_i_j.T)
+            self.z_k = add_breakpoint_chain(model, self.b_i, values, self.small)
+            d_i_j = self.z_k[index.T]
 
         ######################
         # Global constraints #
         ######################
 
         # sum of weights should be equal to one
-        self.model.addConstr(
-            gp.quicksum(self.w_i[i] for i in range(self.nb_grades)) == 1
-        )
-        self.model.addConstrs(
-            self.c_i_j[i, j] <= self.w_i[i]
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
+        model.add_constraints((), [(1, self.w_i)], lower=1, upper=1)
+        shape = (self.nb_grades, nb_students)
+        model.add_constraints(shape, [(1, self.c_i_j), (-1, w_i)], upper=0)
+        model.add_constraints(shape, [(1, self.c_i_j), (-1, d_i_j)], upper=0)
+        model.add_constraints(
+            shape, [(1, self.c_i_j), (-1, d_i_j), (-1, w_i)], lower=-1
         )
 
-        self.model.addConstrs(
-            self.c_i_j[i, j] <= self.d_i_j[i, j]
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-        )
-
-        self.model.addConstrs(
-            self.c_i_j[i, j] >= self.d_i_j[i, j] - 1 + self.w_i[i]
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-        )
-
-        self.model.addConstr(self.lambda_ >= 0.5)
-        self.model.addConstr(self.lambda_ <= 1)
-
-        self.model.addConstrs(self.w_i[i] <= 1 for i in range(self.nb_grades))
-        self.model.addConstrs(self.w_i[i] >= 0 for i in range(self.nb_grades))
-
-        self.model.addConstrs(
-            self.c_i_j[i, j] <= 1
-            for i in range(self.nb_grades)
-            for j in range(self.nb_grades)
-        )
-        self.model.addConstrs(
-            self.c_i_j[i, j] >= 0
-            for i in range(self.nb_grades)
-            for j in range(self.nb_students)
-        )
+        # d_i_j = 1 if the grade is above the boundary, 0 if it is below
+        if formulation == "big-m":
+            # (d_i_j - 1) * large_i <= grades_i_j - b_i
+            model.add_constraints(
+                shape, [(large_i, d_i_j), (1, b_i)], upper=grades_i_j + large_i
+            )
+            # d_i_j * large_i + small >= grades_i_j - b_i
+            model.add_constraints(
+                shape, [(large_i, d_i_j), (1, b_i)], lower=grades_i_j - self.small
+            )
 
         #################################
         # Accepted students constraints #
         #################################
 
-        for j in range(nb_accepted):
-            self.model.addConstr(
-                gp.quicksum(self.c_i_j[i, j] for i in range(self.nb_grades))
-                >= self.lambda_ - self.large * (1 - self.g_j[j]),
-                name="constraint on accepted students",
-            )
-            self.model.addConstrs(
-                (
-                    self.large * (self.d_i_j[i, j] - 1)
-                    <= accepted_j_i[j, i] - self.b_i[i]
-                )
-                for i in range(self.nb_grades)
-            )
-            self.model.addConstrs(
-                (
-                    self.large * self.d_i_j[i, j] + self.small
-                    >= accepted_j_i[j, i] - self.b_i[i]
-                )
-                for i in range(self.nb_grades)
-            )
+        # sum of validated weights >= lambda - large * (1 - g_j)
+        model.add_constraints(
+            nb_accepted,
+            [
+                (1, self.c_i_j[:, :nb_accepted].T),
+                (-1, self.lambda_),
+                (-large, self.g_j[:nb_accepted]),
+            ],
+            lower=-large,
+        )
 
         ################################
         # Refused students constraints #
         ################################
 
-        for j in range(nb_accepted, nb_accepted + nb_refused):
-            j_shifted = j - nb_accepted
-            self.model.addConstr(
-                gp.quicksum(self.c_i_j[i, j] for i in range(self.nb_grades))
-                + self.small
-                <= self.lambda_ + self.large * (1 - self.g_j[j]),
-                name="constraint on refused students",
-            )
-            self.model.addConstrs(
-                (
-                    self.large * (self.d_i_j[i, j] - 1)
-                    <= refused_j_i[j_shifted, i] - self.b_i[i]
-                )
-                for i in range(self.nb_grades)
-            )
-            self.model.addConstrs(
-                (
-                    self.large * self.d_i_j[i, j] + self.small
-                    >= refused_j_i[j_shifted, i] - self.b_i[i]
-                )
-                for i in range(self.nb_grades)
-            )
-
-        # Goal function
-        self.model.setObjective(
-            gp.quicksum(self.g_j[j] for j in range(self.nb_students)), gp.GRB.MAXIMIZE
+        # sum of validated weights + small <= lambda + large * (1 - g_j)
+        model.add_constraints(
+            nb_students - nb_accepted,
+            [
+                (1, self.c_i_j[:, nb_accepted:].T),
+                (-1, self.lambda_),
+                (large, self.g_j[nb_accepted:]),
+            ],
+            upper=large - self.small,
         )
-        self.model.params.outputflag = 0
-        self.model.optimize()
-
-        if self.model.status == gp.GRB.INFEASIBLE:
-            raise ValueError("Model was proven to be infeasible.")
-        elif self.model.status == gp.GRB.INF_OR_UNBD:
-            raise ValueError("Model was proven to be either infeasible or unbounded.")
-        elif self.model.status == gp.GRB.UNBOUNDED:
-            raise ValueError("Model was proven to be unbounded.")
-        elif self.model.status == gp.GRB.OPTIMAL:
-
-            return {
-                "lam": self.lambda_.X,
-                "border": self.b_i.X,
-                "poids": self.w_i.X,
-            }
 
-        else:
-            logging.warning("Model status code: %s", self.model.status)
-            raise ValueError("Model didn't find optimal solution.")
+        # Goal function, each distinct student counting as many times as it occurs
+        weights = np.concatenate(
+            [
+                dataset.category_weights("accepted"),
+                dataset.category_weights("rejected"),
+            ]
+        )
+        model.set_objective([(weights, self.g_j)], maximize=True)
+        self.build_time = time.perf_counter() - start
+
+        self.solution = self.backend.solve(model)
+        x = self.solution.x
+        return {
+            "lam": x[self.lambda_],
+            "border": x[self.b_i],
+            "poids": x[self.w_i],
+        }
@@ -0,0 +1,245 @@
+from typing import Iterable, List, Sequence, Tuple
+from itertools import combinations
+import numpy as np
+
+# Nombre maximal de matières pour lequel la table dense (2^n booléens) est utilisée
+MAX_TABLE_GRADES = 20
+
+
+def coalition_mask(coalition: Iterable[int]) -> int:
+    """
+    Pour coder un ensemble de matières sous forme d'entier
+    La matière i (numérotée à partir de 1) correspond au bit i - 1
+    :param coalition: les matières de l'ensemble
+    :return: le masque correspondant
+    """
+    mask = 0
+    for criterion in coalition:
+        mask |= 1 << (int(criterion) - 1)
+    return mask
+
+
+def pack_masks(passed: np.ndarray) -> np.ndarray:
+    """
+    Pour transformer des vecteurs de matières validées en masques entiers
+    :param passed: tableau booléen dont le dernier axe correspond aux matières
+    :return: le tableau des masques, avec un axe de moins
+    """
+    passed = np.asarray(passed, dtype=bool)
+    nb_grades = passed.shape[-1]
+    if nb_grades > 64:
+        raise ValueError("Les masques sont limités à 64 matières")
+    nb_bytes = next(size for size in (1, 2, 4, 8) if 8 * size >= nb_grades)
+    if nb_grades < 8 * nb_bytes:
+        padded = np.zeros(passed.shape[:-1] + (8 * nb_bytes,), dtype=bool)
+        padded[..., :nb_grades] = passed
+        passed = padded
+    # packing the flattened array is much faster than packing along the last axis
+    packed = np.packbits(np.ascontiguousarray(passed).reshape(-1), bitorder="little")
+    masks = packed.view(f"<u{nb_bytes}").reshape(passed.shape[:-1])
+    return masks.astype(f"u{nb_bytes}", copy=False)
+
+
+def minimal_masks(masks: Iterable[int]) -> np.ndarray:
+    """
+    Pour ne garder que les coalitions minimales (au sens de l'inclusion)
+    Chaque masque est comparé aux masques déjà retenus, par cardinal croissant
+    :param masks: les masques des coalitions suffisantes
+    :return: les masques des coalitions minimales, triés
+    """
+    masks = np.unique(np.asarray(list(masks), dtype=np.uint64))
+    sizes = [bin(int(mask)).count("1") for mask in masks]
+    minimal = np.zeros(0, dtype=np.uint64)
+    for mask in masks[np.argsort(sizes, kind="stable")]:
+        if not np.any((mask & minimal) == minimal):
+            minimal = np.append(minimal, mask)
+    return np.sort(minimal)
+
+
+class CoalitionSet:
+    """
+    Ensemble de coalitions suffisantes, stocké sous la forme de ses coalitions minimales
+    Une coalition est suffisante si elle contient une des coalitions minimales
+    """
+
+    def __init__(self, valid_set: Iterable[Iterable[int]], nb_grades: int):
+        """
+        Pour initialiser l'ensemble
+        :param valid_set: les ensembles de matières permettant de valider une catégorie (complété ou non)
+        :param nb_grades: le nombre de matières
+        """
+        if nb_grades > 64:
+            raise ValueError("Les masques sont limités à 64 matières")
+        self.nb_grades = nb_grades
+        self.__table = None
+        if isinstance(valid_set, CoalitionSet):
+            self.minimal = valid_set.minimal
+            if valid_set.nb_grades == nb_grades:
+                self.__table = valid_set.__table
+        else:
+            self.minimal = minimal_masks(
+                coalition_mask(coalition) for coalition in valid_set
+            )
+
+    @classmethod
+    def from_masks(cls, masks: Iterable[int], nb_grades: int) -> "CoalitionSet":
+        """
+        Pour construire l'ensemble à partir de masques
+        :param masks: les masques des coalitions suffisantes
+        :param nb_grades: le nombre de matières
+        :return: l'ensemble de coalitions
+        """
+        coalitions = cls([], nb_grades)
+        coalitions.minimal = minimal_masks(masks)
+        return coalitions
+
+    @classmethod
+    def from_table(cls, table: np.ndarray) -> "CoalitionSet":
+        """
+        Pour construire l'ensemble à partir de sa table dense, qui est conservée telle quelle
+        Les coalitions minimales sont celles de la table qui ne restent pas suffisantes
+        quand on leur retire une matière
+        :param table: le tableau booléen de taille 2^nb_grades, indexé par les masques
+        :return: l'ensemble de coalitions
+        """
+        table = np.asarray(table, dtype=bool)
+        nb_grades = table.size.bit_length() - 1
+        minimal = table.copy()
+        for i in range(nb_grades):
+            # [:, 1, :] contient les masques avec la matière i, [:, 0, :] les mêmes sans
+            without = table.reshape(-1, 2, 1 << i)[:, 0, :]
+            minimal.reshape(-1, 2, 1 << i)[:, 1, :] &= ~without
+        coalitions = cls([], nb_grades)
+        coalitions.minimal = np.flatnonzero(minimal).astype(np.uint64)
+        coalitions.__table = table
+        return coalitions
+
+    def table(self) -> np.ndarray:
+        """
+        Pour obtenir la table de correspondance dense, calculée à la première demande
+        :return: le tableau booléen de taille 2^nb_grades, indexé par les masques
+        """
+        if self.__table is None:
+            all_masks = np.arange(1 << self.nb_grades, dtype=np.uint64)
+            table = np.zeros(all_masks.shape, dtype=bool)
+            for mask in self.minimal:
+                table |= (all_masks & mask) == mask
+            self.__table = table
+        return self.__table
+
+    def contains(self, masks: np.ndarray) -> np.ndarray:
+        """
+        Pour tester si des coalitions sont suffisantes
+        La table dense est utilisée jusqu'à MAX_TABLE_GRADES matières, au-delà
+        les masques sont comparés aux coalitions minimales
+        :param masks: les masques des coalitions à tester
+        :return: le tableau booléen de même forme que masks
+        """
+        if self.nb_grades <= MAX_TABLE_GRADES:
+            return self.table()[masks]
+        masks = np.asarray(masks, dtype=np.uint64)
+        result = np.zeros(masks.shape, dtype=bool)
+        for mask in self.minimal:
+            result |= (masks & mask) == mask
+        return result
+
+    def to_list(self) -> List[Tuple[int, ...]]:
+        """
+        Pour récupérer les coalitions minimales sous forme de tuples de matières
+        :return: la liste des coalitions minimales
+        """
+        return [
+            tuple(i + 1 for i in range(self.nb_grades) if int(mask) >> i & 1)
+            for mask in self.minimal
+        ]
+
+    def sufficient(self) -> List[Tuple[int, ...]]:
+        """
+        Pour énumérer toutes les coalitions suffisantes, comme l'ensemble de validation
+        complété d'avant: chaque coalition minimale, puis ses sur-ensembles
+        Le résultat compte jusqu'à 2^nb_grades coalitions et n'est pas conservé: à
+        réserver aux petits modèles, les classifieurs n'en ont pas besoin
+        :return: la liste des coalitions suffisantes, sans doublon
+        """
+        all_sets = []
+        for coalition in self.to_list():
+            others = [i for i in range(1, self.nb_grades + 1) if i not in coalition]
+            for r in range(len(others) + 1):
+                for extra in combinations(others, r):
+                    all_sets.append(tuple(sorted(extra + coalition)))
+        return list(dict.fromkeys(all_sets))
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        return len(self.minimal)
+
+    def __repr__(self) -> str:
+        return f"CoalitionSet({self.to_list()}, nb_grades={self.nb_grades})"
+
+
+def weighted_sum(poids: Sequence[float], mask: int) -> float:
+    """
+    Pour calculer la somme des poids d'une coalition, matière par matière
+    dans l'ordre des indices, comme les classifieurs MR-Sort
+    :param poids: les poids associés aux différentes matières
+    :param mask: le masque de la coalition
+    :return: la somme des poids
+    """
+    total = 0.0
+    while mask:
+        lowest = mask & -mask
+        total += poids[lowest.bit_length() - 1]
+        mask ^= lowest
+    return total
+
+
+def weighted_coalitions(
+    poids: Sequence[float], lam: float, strict: bool = False
+) -> CoalitionSet:
+    """
+    Pour convertir les poids et le seuil d'un modèle MR-Sort en coalitions suffisantes
+    Jusqu'à MAX_TABLE_GRADES matières, la somme de chaque coalition est calculée et
+    la table dense est conservée: elle donne exactement les mêmes décisions que les
+    sommes pondérées. Au-delà, les coalitions minimales sont énumérées par un parcours
+    en profondeur, élagué quand les poids restants ne permettent plus d'atteindre lam
+    :param poids: les poids associés aux différentes matières
+    :param lam: le seuil d'acceptation
+    :param strict: True pour une coalition suffisante si sa somme est > lam (MR-Sort binaire), False pour >= lam
+    :return: l'ensemble des coalitions suffisantes
+    """
+    poids = np.asarray(poids, dtype=float)
+    nb_grades = len(poids)
+    if nb_grades <= MAX_TABLE_GRADES:
+        sums = np.zeros(1 << nb_grades)
+        for i in range(nb_grades):
+            sums.reshape(-1, 2, 1 << i)[:, 1, :] += poids[i]
+        return CoalitionSet.from_table(sums > lam if strict else sums >= lam)
+
+    if np.any(poids < 0):
+        raise ValueError("Les poids doivent être positifs pour énumérer les coalitions")
+    poids = poids.tolist()
+
+    def wins(mask: int) -> bool:
+        total = weighted_sum(poids, mask)
+        return total > lam if strict else total >= lam
+
+    remaining = np.cumsum(poids[::-1])[::-1].tolist() + [0.0]
+    tolerance = 1e-9 * max(1.0, abs(lam))
+    minimal = []
+    stack = [(0, 0, 0.0)]
+    while stack:
+        i, mask, total = stack.pop()
+        if wins(mask):
+            if all(not wins(mask ^ (1 << j)) for j in range(i) if mask >> j & 1):
+                minimal.append(mask)
+            continue
+        if i == nb_grades or total + remaining[i] < lam - tolerance:
+            continue
+        stack.append((i + 1, mask, total))
+        stack.append((i + 1, mask | 1 << i, total + poids[i]))
+    # les masques trouvés sont déjà minimaux: inutile de les comparer entre eux
+    coalitions = CoalitionSet([], nb_grades)
+    coalitions.minimal = np.sort(np.array(minimal, dtype=np.uint64))
+    return coalitions
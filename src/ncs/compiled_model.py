@@ -0,0 +1,103 @@
+from typing import Any, Iterable
+import numpy as np
+from src.datasets.dataset import label_dtype
+from src.ncs.coalitions import CoalitionSet, pack_masks
+from src.ncs.interval_classifier import IntervalClassifier
+
+
+class CompiledModel:
+    """
+    Modèle NCS compilé pour des notes entières comprises entre 0 et max_grade
+    Pour chaque catégorie et chaque matière, l'intervalle de notes entières qui valide
+    la matière est compilé en un seuil bas et une largeur, dans le plus petit type non
+    signé contenant max_grade + 1: chaque note est validée par une seule comparaison
+    entière, (note - seuil) <= largeur en non signé, ou note >= seuil sans borne haute,
+    puis les matières validées sont codées en masques et testées contre les coalitions
+    """
+
+    def __init__(
+        self,
+        low: np.ndarray,
+        high: np.ndarray,
+        valid_set: Iterable[Iterable[int]],
+        max_grade: int,
+    ):
+        """
+        Pour compiler le modèle
+        :param low: les notes minimales pour valider chaque matière, de forme (nb_categories, nb_grades)
+        :param high: les notes maximales pour valider chaque matière, de même forme
+        :param valid_set: les ensembles de matières permettant de valider une catégorie (liste ou CoalitionSet)
+        :param max_grade: la note maximale
+        """
+        low = np.asarray(low)
+        high = np.asarray(high)
+        self.nb_categories, self.nb_grades = low.shape
+        self.max_grade = int(max_grade)
+        self.coalitions = CoalitionSet(valid_set, self.nb_grades)
+
+        self.grade_dtype = np.min_scalar_type(self.max_grade + 1)
+        low = np.clip(np.ceil(low), 0, self.max_grade + 1)
+        high = np.clip(np.floor(high), -1, self.max_grade)
+        # an empty interval starts at max_grade + 1 with width 0, so no grade passes
+        empty = high < low
+        low[empty] = self.max_grade + 1
+        high[empty] = self.max_grade + 1
+        self.low = low.astype(self.grade_dtype)
+        self.width = (high - low).astype(self.grade_dtype)
+        # without upper bounds (plain NCS), the lower threshold alone decides
+        self.bounded = bool(np.any(high[~empty] < self.max_grade))
+        # the comparisons are written into rows padded to whole mask bytes
+        self.mask_width = next(
+            8 * size for size in (1, 2, 4, 8) if 8 * size >= self.nb_grades
+        )
+
+    @classmethod
+    def from_classifier(cls, classifier: Any, max_grade: int) -> "CompiledModel":
+        """
+        Pour compiler un Classifier ou un IntervalClassifier
+        :param classifier: le classifieur NCS
+        :param max_grade: la note maximale
+        :return: le modèle compilé
+        """
+        borders = np.asarray(classifier.borders, dtype=float)
+        if isinstance(classifier, IntervalClassifier):
+            low, high = borders[:, 0], borders[:, 1]
+        else:
+            low, high = borders, np.full(borders.shape, np.inf)
+        return cls(low, high, classifier.coalitions, max_grade)
+
+    def classify_many(self, data: np.ndarray) -> np.ndarray:
+        """
+        Pour classer une matrice de notes entières (uint8, uint16...)
+        :param data: les ensembles de notes à classer, entre 0 et max_grade
+        :return: le numéro de catégorie de chaque ensemble de notes (voir label_dtype)
+        """
+        data = np.asarray(data)
+        if data.dtype.kind not in "ui":
+            raise TypeError("Le modèle compilé ne classe que des notes entières")
+        if data.size and (
+            data.max() > self.max_grade or (data.dtype.kind == "i" and data.min() < 0)
+        ):
+            raise ValueError(
+                f"Les notes doivent être comprises entre 0 et {self.max_grade}"
+            )
+        # below the low threshold, the unsigned difference wraps above max_grade
+        data = data.astype(self.grade_dtype, copy=False)
+        passed = np.zeros(
+            (data.shape[0], self.nb_categories, self.mask_width), dtype=bool
+        )
+        if self.bounded:
+            np.less_equal(
+                data[:, np.newaxis, :] - self.low,
+                self.width,
+                out=passed[:, :, : self.nb_grades],
+            )
+        else:
+            np.greater_equal(
+                data[:, np.newaxis, :], self.low, out=passed[:, :, : self.nb_grades]
+            )
+        validated = self.coalitions.contains(pack_masks(passed))
+        labels = np.zeros(data.shape[0], dtype=label_dtype(self.nb_categories + 1))
+        for k in range(1, self.nb_categories + 1):
+            labels[validated[:, k - 1]] = k
+        return labels
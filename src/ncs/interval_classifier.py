@@ -1,6 +1,8 @@
 from typing import List, Dict, Tuple
-from itertools import combinations, chain
 import numpy as np
+from src.datasets.dataset import label_dtype
+from src.datasets.partition import Partition
+from src.ncs.coalitions import CoalitionSet, coalition_mask, pack_masks
 
 
 class IntervalClassifier:
@@ -21,37 +23,49 @@ class IntervalClassifier:
         """
         Pour redéfinir les paramètres de génération du modèle
         :param borders: les notes limites pour être évaluées positivement
-        :params valid_set: les ensembles de matières possibles pour valider les catégories
+        :params valid_set: les ensembles de matières possibles pour valider les catégories (liste ou CoalitionSet)
         :return: None
         """
         self.nb_grades = len(borders[0][0])
         self.nb_categories = len(borders)
         self.borders = borders
-        self.valid_set = valid_set
-        self.__complete_valid_set()
+        self.coalitions = CoalitionSet(valid_set, self.nb_grades)
 
-    def classify(self, data: List[List[int]]) -> Dict[int, List[List[int]]]:
+    @property
+    def valid_set(self) -> List[Tuple[int, ...]]:
+        """
+        Les coalitions minimales, sous forme de tuples de matières
+        Toutes les coalitions suffisantes s'obtiennent avec coalitions.sufficient()
+        """
+        return self.coalitions.to_list()
+
+    def classify_many(self, data: List[List[int]]) -> np.ndarray:
+        """
+        Pour classer un ensemble de notes sans le découper par catégorie
+        Les matières validées de chaque ligne sont codées en masque, puis testées
+        contre les coalitions suffisantes
+        :param data: les ensembles de notes à classer
+        :return: le numéro de catégorie de chaque ensemble de notes (int8 jusqu'à 127 catégories, voir label_dtype)
+        """
+        data = np.asarray(data)
+        borders = np.asarray(self.borders)
+        passed = (borders[:, 0] <= data[:, np.newaxis, :]) & (
+            data[:, np.newaxis, :] <= borders[:, 1]
+        )
+        validated = self.coalitions.contains(pack_masks(passed))
+        labels = np.zeros(validated.shape[0], dtype=label_dtype(self.nb_categories + 1))
+        for k in range(1, self.nb_categories + 1):
+            labels[validated[:, k - 1]] = k
+        return labels
+
+    def classify(self, data: List[List[int]]) -> Partition:
         """
         To classify elements according to the parameters
         :param data: les ensembles de notes à classer
-        :return: les ensembles de notes classés
+        :return: les ensembles de notes classés, sous la forme {catégorie: ensembles de notes}
         """
-        data = np.array(data)
-        results = {}
-        for k in range(self.nb_categories, 0, -1):
-            res_k = []
-            conditions_sup = data <= self.borders[k - 1][1]
-            conditions_inf = self.borders[k - 1][0] <= data
-            for i, row in enumerate(conditions_inf & conditions_sup):
-                valid_grades = tuple([x + 1 for x in list(np.where(row)[0])])
-                if valid_grades in self.valid_set:
-                    res_k.append(i)
-            mask = np.zeros(data.shape[0], dtype=bool)
-            mask[res_k] = True
-            results[k] = data[mask, :]
-            data = data[~mask, :]
-        results[0] = data
-        return results
+        data = np.asarray(data)
+        return Partition(data, self.classify_many(data), self.nb_categories + 1)
 
     def classify_one(self, grades: List[int]) -> int:
         """
@@ -66,24 +80,6 @@ class IntervalClassifier:
             conditions_inf = self.borders[k - 1][0] <= grades
             for x in list(np.where(conditions_inf & conditions_sup)[0]):
                 valid_grades.append(x + 1)
-            valid_grades = tuple(valid_grades)
-            if valid_grades in self.valid_set:
+            if self.coalitions.contains(coalition_mask(valid_grades)):
                 return k
         return 0
-
-    def __complete_valid_set(self):
-        """
-        Pour compléter l'ensemble de validation
-        :return: None
-        """
-        all_sets = []
-        for valid_elt in self.valid_set:
-            other_elts = [i for i in range(1, self.nb_grades + 1) if i not in valid_elt]
-            combi = list(
-                chain.from_iterable(
-                    combinations(other_elts, r) for r in range(len(other_elts) + 1)
-                )
-            )
-            ext_combi = [list(x) + list(valid_elt) for x in combi]
-            all_sets.extend([tuple(sorted(elt)) for elt in ext_combi])
-        self.valid_set = list(dict.fromkeys(all_sets))
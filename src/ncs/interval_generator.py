@@ -1,17 +1,23 @@
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 import numpy as np
-import random as rd
-from math import floor
 from itertools import combinations, chain
+from src.datasets.sampling import BaseGenerator
+from src.ncs.coalitions import CoalitionSet
+from src.ncs.compiled_model import CompiledModel
 from src.ncs.interval_classifier import IntervalClassifier
 
 
-class IntervalGenerator:
-    def __init__(self, **kwargs):
+class IntervalGenerator(BaseGenerator):
+    # notes entières, classées par le modèle compilé
+    integer_grades = True
+
+    def __init__(self, seed: Optional[Any] = None, **kwargs):
         """
         Pour initialiser le générateur
         Appelle reset_parameter
+        :param seed: la graine du générateur aléatoire (entier, SeedSequence...), None pour une graine aléatoire
         """
+        self.rng = np.random.default_rng(seed)
         return self.reset_parameters(**kwargs)
 
     def reset_parameters(
@@ -28,30 +34,38 @@ class IntervalGenerator:
         :param max_grade: la note maximale à générer
         :param nb_categories: le nombre de catégories que l'on consifère (sans compter la catégorie nulle)
         :param borders: les notes limites pour être évaluées positivement
-        :params valid_set: les ensembles de matières possibles pour valider les catégories
+        :params valid_set: les ensembles de matières possibles pour valider les catégories (liste ou CoalitionSet)
         :return: None
         """
         self.nb_grades = len(borders[0][0])
         self.max_grade = max_grade
         self.nb_categories = len(borders)
         self.borders = borders
-        self.valid_set = valid_set
+        self.coalitions = CoalitionSet(valid_set, self.nb_grades)
         self.classifier = IntervalClassifier(
-            borders=self.borders, valid_set=self.valid_set,
+            borders=self.borders, valid_set=self.coalitions,
         )
-        self.__complete_valid_set()
+        self.compiled = CompiledModel.from_classifier(self.classifier, int(max_grade))
+
+    @property
+    def valid_set(self) -> List[Tuple[int, ...]]:
+        """
+        Les coalitions minimales, sous forme de tuples de matières
+        Toutes les coalitions suffisantes s'obtiennent avec coalitions.sufficient()
+        """
+        return self.coalitions.to_list()
 
     def get_parameters(self):
         """
         Renvoie les paramètres de génération des données
-        :return: {"nb_grades": le nombre de paramètres (notes), "max_grade": la note maximale à générer, "borders": les notes limites pour être évaluées positivement, "valid_set": les ensembles de matières pour valider les catégories}
+        :return: {"nb_grades": le nombre de paramètres (notes), "max_grade": la note maximale à générer, "borders": les notes limites pour être évaluées positivement, "valid_set": les coalitions minimales pour valider les catégories (CoalitionSet)}
         """
         return {
             "nb_grades": self.nb_grades,
             "max_grade": self.max_grade,
             "nb_categories": self.nb_categories,
             "borders": np.array(self.borders),
-            "valid_set": np.array(self.valid_set, dtype=object),
+            "valid_set": self.coalitions,
         }
 
     def random_parameters(self):
@@ -59,16 +73,20 @@ class IntervalGenerator:
         Génère des paramètres de génération des données aléatoires
         :return: None
         """
-        nb_grades = rd.randint(3, 5)
-        max_grade = rd.randint(5, 20)
-        nb_categories = rd.randint(1, 5)
+        nb_grades = int(self.rng.integers(3, 6))
+        max_grade = int(self.rng.integers(5, 21))
+        nb_categories = int(self.rng.integers(1, 6))
         borders = []
-        before_inf = [floor(rd.randint(0, self.max_grade)) for _ in range(nb_grades)]
+        before_inf = [
+            int(self.rng.integers(0, self.max_grade + 1)) for _ in range(nb_grades)
+        ]
         before_sup = before_inf
         for _ in range(nb_categories):
-            before_inf = [floor(rd.randint(0, before_inf[i])) for i in range(nb_grades)]
+            before_inf = [
+                int(self.rng.integers(0, before_inf[i] + 1)) for i in range(nb_grades)
+            ]
             before_sup = [
-                floor(rd.randint(before_sup[i], self.max_grade))
+                int(self.rng.integers(before_sup[i], self.max_grade + 1))
                 for i in range(nb_grades)
             ]
             borders.append((before_inf, before_sup))
@@ -79,48 +97,16 @@ class IntervalGenerator:
                 for r in range(1, nb_grades + 1)
             )
         )
-        valid_set = rd.sample(all_combinations, rd.randint(1, 4))
-        return self.reset_parameters(max_grade, borders, valid_set)
-
-    def generate(self, nb_data: int, noise_var: Optional[float] = None):
-        """
-        Pour générer nb_data nouvelles données, avec du bruit
-        :param nb_data: nombre de données à générer
-        :return: les données sous la forme {i: np.array([[1, 2, 3, 4, 5], [1, 1, 1, 1, 1]])} avec i le numéro de la catégorie (0 étant la catégorie "rejetée")
-                 Si raw est true, renvoie {"raw": les données brutes, "classified": les données classifiées}
-        """
-        to_int_vect = np.vectorize(int)
-        data = to_int_vect(
-            np.random.rand(nb_data, self.nb_grades) * (self.max_grade + 1)
+        chosen = self.rng.choice(
+            len(all_combinations), int(self.rng.integers(1, 5)), replace=False
         )
-        results = self.classifier.classify(data)
-        if noise_var is not None:
-            results = {
-                k: [
-                    np.clip(
-                        np.floor(x + np.random.normal(0, noise_var)).astype(int),
-                        0,
-                        self.max_grade,
-                    )
-                    for x in v
-                ]
-                for k, v in results.items()
-            }
-        return results
+        valid_set = [all_combinations[j] for j in chosen]
+        return self.reset_parameters(max_grade, borders, valid_set)
 
-    def __complete_valid_set(self):
+    def _classify(self, data: np.ndarray) -> np.ndarray:
         """
-        Pour compléter l'ensemble de validation 
-        :return: None
+        Pour classer les notes tirées, avec le modèle compilé
+        :param data: la matrice des notes entières
+        :return: l'étiquette de chaque ensemble de notes
         """
-        all_sets = []
-        for valid_elt in self.valid_set:
-            other_elts = [i for i in range(1, self.nb_grades + 1) if i not in valid_elt]
-            combi = list(
-                chain.from_iterable(
-                    combinations(other_elts, r) for r in range(len(other_elts) + 1)
-                )
-            )
-            ext_combi = [list(x) + list(valid_elt) for x in combi]
-            all_sets.extend([tuple(sorted(elt)) for elt in ext_combi])
-        self.valid_set = list(dict.fromkeys(all_sets))
+        return self.compiled.classify_many(data)
@@ -1,8 +1,9 @@
 from src.ncs.interval_generator import IntervalGenerator
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Union
 from itertools import combinations, chain
 import subprocess
 from src import config
+from src.datasets.dataset import Dataset
 
 
 class RelaxedIntervalNcsSolver:
@@ -23,12 +24,20 @@ class RelaxedIntervalNcsSolver:
             )
         )  # Les validation possibles
 
-    def solve(self, experiences: Dict[int, Any]) -> Dict[str, Any]:
+    def solve(
+        self, experiences: Union[Dict[int, Any], Dataset], collapse: bool = True
+    ) -> Dict[str, Any]:
         """
         Pour trouver les frontières et ensembles de validation
-        :param experiences: toutes les expériences dans les différentes classes. Sous la forme de dictionnaire {i: list d'ensembles de notes qui correpondent à la classe i}
+        :param experiences: toutes les expériences dans les différentes classes. Sous la forme de dictionnaire {i: list d'ensembles de notes qui correpondent à la classe i}, ou un Dataset
+        :param collapse: pour regrouper les expériences identiques d'une même classe en une seule, dont le poids est le nombre d'occurrences
         :return: les frontières et les ensembles de validation trouvés par le programme
         """
+        dataset = Dataset.from_classified(experiences)
+        if collapse:
+            original = dataset
+            dataset, inverse = original.collapse(return_inverse=True)
+        experiences = dataset.to_partition()
 
         ################################
         ### Définition des variables ###
@@ -106,12 +115,17 @@ class RelaxedIntervalNcsSolver:
             for n_a, a in enumerate(experiences[h])
         ]
 
-        # Goals
+        # Goals, pondérés par le nombre d'occurrences de chaque expérience
         goals = [
             [v2i["z", (h, n_u)]]
             for h in self.Categories + [0]
             for n_u, _ in enumerate(experiences[h])
         ]
+        weights = [
+            int(weight)
+            for h in self.Categories + [0]
+            for weight in dataset.category_weights(h)
+        ]
 
         ######################################
         ### Solve the problem using Dimacs ###
@@ -119,11 +133,16 @@ class RelaxedIntervalNcsSolver:
 
         all_clauses = clause_1 + clause_2 + clause_3 + clause_4 + clause_5
         nb_var = len(vars_x) + len(vars_y) + len(vars_z)
-        dimacs = self.__clauses_to_dimacs(all_clauses, goals, nb_var)
+        dimacs = self.__clauses_to_dimacs(all_clauses, goals, weights, nb_var)
 
         self.__write_dimacs_file(dimacs, config.DIMACS_WORKINGFILE_PATH_RELAXED)
         result = self.__exec_gophersat(config.DIMACS_WORKINGFILE_PATH_RELAXED)
-        return self.__format_res(result, i2v)
+        res = self.__format_res(result, i2v)
+        if collapse:
+            res["discarded_data"] = original.expand_rows(
+                dataset, inverse, res["discarded_data"]
+            )
+        return res
 
     def __format_res(
         self, res: Tuple[bool, List[int]], i2v: Dict[int, Any]
@@ -165,17 +184,20 @@ class RelaxedIntervalNcsSolver:
 
     @staticmethod
     def __clauses_to_dimacs(
-        clauses: List[List[int]], goals: List[List[int]], numvar: int
+        clauses: List[List[int]],
+        goals: List[List[int]],
+        weights: List[int],
+        numvar: int,
     ) -> str:
         """
         Pour créer le fichier Dimacs à sauvegarder
         :param clauses: les clauses sous forme normale conjonctive
         :param goals: les buts sous forme normale conjonctive
+        :param weights: le poids de chaque but
         :param numvar: le nombre de variables
-        :param top: le poids des hard clauses
         :return: la transcription en format dimacs
         """
-        top = str(len(goals) + 1)
+        top = str(sum(weights) + 1)
         dimacs = (
             "c This is it\np wcnf "
             + str(numvar)
@@ -190,8 +212,8 @@ class RelaxedIntervalNcsSolver:
             for atom in clause:
                 dimacs += str(atom) + " "
             dimacs += "0\n"
-        for goal in goals:
-            dimacs += "1 "
+        for goal, weight in zip(goals, weights):
+            dimacs += str(weight) + " "
             for atom in goal:
                 dimacs += str(atom) + " "
             dimacs += "0\n"
@@ -1,7 +1,9 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Union
 from itertools import combinations, chain
 import subprocess
 from src import config
+from src.datasets.dataset import Dataset, as_classified
+from src.datasets.dominance import prune_dominated
 
 
 class RigidNcsSolver:
@@ -22,12 +24,32 @@ class RigidNcsSolver:
             )
         )  # Les validation possibles
 
-    def solve(self, experiences: Dict[int, Any]) -> Dict[str, Any]:
+    def solve(
+        self,
+        experiences: Union[Dict[int, Any], Dataset],
+        collapse: bool = True,
+        prune: bool = True,
+    ) -> Dict[str, Any]:
         """
         Pour trouver les frontières et ensembles de validation
-        :param experiences: toutes les expériences dans les différentes classes. Sous la forme de dictionnaire {i: list d'ensembles de notes qui correpondent à la classe i}
-        :return: les frontières et les ensembles de validation trouvés par le programme
+        :param experiences: toutes les expériences dans les différentes classes. Sous la forme de dictionnaire {i: list d'ensembles de notes qui correpondent à la classe i}, ou un Dataset
+        :param collapse: pour ne garder qu'une fois les expériences identiques d'une même classe, qui ajouteraient les mêmes clauses
+        :param prune: pour ne garder que les expériences minimales et maximales de chaque classe (voir prune_dominated), les autres n'ajoutant aucune contrainte. Des données incohérentes sont alors détectées sans appeler gophersat
+        :return: les frontières et les ensembles de validation trouvés par le programme, et le nombre d'expériences supprimées, ou None si le problème n'a pas de solution
         """
+        nb_pruned = 0
+        if prune:
+            try:
+                experiences, nb_pruned = prune_dominated(
+                    Dataset.from_classified(experiences)
+                )
+            except ValueError:
+                # une expérience est dominée par une expérience d'une classe plus
+                # basse: le problème n'a pas de solution
+                return None
+        elif collapse:
+            experiences = Dataset.from_classified(experiences).collapse()
+        experiences = as_classified(experiences)
 
         ################################
         ### Définition des variables ###
@@ -105,7 +127,10 @@ class RigidNcsSolver:
 
         self.__write_dimacs_file(dimacs, config.DIMACS_WORKINGFILE_PATH)
         result = self.__exec_gophersat(config.DIMACS_WORKINGFILE_PATH)
-        return self.__format_res(result, i2v)
+        res = self.__format_res(result, i2v)
+        if res is not None:
+            res["nb_pruned"] = nb_pruned
+        return res
 
     def __format_res(
         self, res: Tuple[bool, List[int]], i2v: Dict[int, Any]
@@ -185,4 +210,3 @@ class RigidNcsSolver:
             True,
             [int(x) for x in model if int(x) != 0],
         )
-
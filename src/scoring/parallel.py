@@ -0,0 +1,127 @@
+from multiprocessing import Pool, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import time
+import numpy as np
+
+from src.datasets.dataset import label_dtype
+from src.scoring.streaming import DEFAULT_CHUNK_SIZE
+
+# État de chaque processus de calcul, initialisé par __init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(
+    classifier: Any,
+    data_name: str,
+    shape: Tuple[int, ...],
+    dtype: str,
+    labels_name: str,
+    labels_dtype: str,
+) -> None:
+    """
+    Pour attacher un processus de calcul aux mémoires partagées
+    :param classifier: le classifieur à utiliser
+    :param data_name: le nom de la mémoire partagée contenant les notes
+    :param shape: la forme de la matrice de notes
+    :param dtype: le type de la matrice de notes
+    :param labels_name: le nom de la mémoire partagée où écrire les étiquettes
+    :param labels_dtype: le type des étiquettes
+    :return: None
+    """
+    data_shm = shared_memory.SharedMemory(name=data_name)
+    labels_shm = shared_memory.SharedMemory(name=labels_name)
+    _worker_state["shm"] = (data_shm, labels_shm)
+    _worker_state["classifier"] = classifier
+    _worker_state["data"] = np.ndarray(shape, dtype=dtype, buffer=data_shm.buf)
+    _worker_state["labels"] = np.ndarray(
+        shape[:1], dtype=labels_dtype, buffer=labels_shm.buf
+    )
+
+
+def _classify_rows(bounds: Tuple[int, int]) -> Tuple[int, int, float]:
+    """
+    Pour classer un bloc de lignes et écrire ses étiquettes dans la mémoire partagée
+    :param bounds: les indices de début et de fin du bloc
+    :return: le pid du processus, le nombre de lignes classées et la durée du calcul
+    """
+    start, stop = bounds
+    begin = time.perf_counter()
+    _worker_state["labels"][start:stop] = _worker_state["classifier"].classify_many(
+        _worker_state["data"][start:stop]
+    )
+    return os.getpid(), stop - start, time.perf_counter() - begin
+
+
+def classify_parallel(
+    classifier: Any,
+    data: np.ndarray,
+    nb_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[np.ndarray, List[Dict[str, float]]]:
+    """
+    Pour classer une matrice de notes en répartissant les lignes sur plusieurs processus
+    Les notes et les étiquettes sont placées en mémoire partagée: seuls les indices des
+    blocs transitent entre les processus
+    :param classifier: un classifieur du projet (avec une méthode classify_many et un attribut nb_categories)
+    :param data: la matrice de notes (np.ndarray ou np.memmap)
+    :param nb_workers: le nombre de processus (par défaut, le nombre de cœurs)
+    :param chunk_size: le nombre de lignes de chaque bloc
+    :return: les étiquettes, et pour chaque processus {"worker", "rows", "seconds", "rows_per_second"}
+    """
+    data = np.asarray(data)
+    nb_data = data.shape[0]
+    labels_dtype = label_dtype(classifier.nb_categories + 1)
+    data_shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    labels_shm = shared_memory.SharedMemory(
+        create=True, size=max(nb_data * labels_dtype.itemsize, 1)
+    )
+    try:
+        shared_data = np.ndarray(data.shape, dtype=data.dtype, buffer=data_shm.buf)
+        for start in range(0, nb_data, chunk_size):
+            shared_data[start : start + chunk_size] = data[start : start + chunk_size]
+        shared_labels = np.ndarray(
+            (nb_data,), dtype=labels_dtype, buffer=labels_shm.buf
+        )
+
+        bounds = [
+            (start, min(start + chunk_size, nb_data))
+            for start in range(0, nb_data, chunk_size)
+        ]
+        with Pool(
+            nb_workers,
+            initializer=_init_worker,
+            initargs=(
+                classifier,
+                data_shm.name,
+                data.shape,
+                data.dtype.str,
+                labels_shm.name,
+                labels_dtype.str,
+            ),
+        ) as pool:
+            results = pool.map(_classify_rows, bounds)
+        labels = shared_labels.copy()
+        del shared_data, shared_labels
+    finally:
+        data_shm.close()
+        data_shm.unlink()
+        labels_shm.close()
+        labels_shm.unlink()
+
+    stats = {}
+    for pid, nb_rows, duration in results:
+        rows, seconds = stats.get(pid, (0, 0.0))
+        stats[pid] = (rows + nb_rows, seconds + duration)
+    return (
+        labels,
+        [
+            {
+                "worker": pid,
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds > 0 else float("inf"),
+            }
+            for pid, (rows, seconds) in sorted(stats.items())
+        ],
+    )
@@ -0,0 +1,198 @@
+from typing import Any, Callable, Dict, List, Sequence, Union
+import math
+import numpy as np
+
+from src.mr_sort.binary_classifier import BinaryClassifier
+from src.mr_sort.classifier import Classifier
+from src.ncs.classifier import Classifier as NcsClassifier
+from src.ncs.coalitions import MAX_TABLE_GRADES
+from src.ncs.interval_classifier import IntervalClassifier
+
+# Signature commune des fonctions générées: un ensemble de notes, une catégorie
+Scorer = Callable[[Union[Sequence[float], np.ndarray]], Any]
+
+
+def _literal(value: Any, constants: Dict[str, Any]) -> str:
+    """
+    Pour écrire une constante dans le code généré
+    Les nombres finis sont écrits tels quels (repr redonne exactement le même nombre),
+    les autres valeurs sont passées par leur nom
+    :param value: la constante
+    :param constants: les noms des constantes qui ne sont pas écrites telles quelles, complétés au besoin
+    :return: le code de la constante
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return repr(value)
+    name = f"_c{len(constants)}"
+    constants[name] = value
+    return name
+
+
+def _compile(
+    name: str, nb_grades: int, body: List[str], constants: Dict[str, Any]
+) -> Scorer:
+    """
+    Pour compiler une fonction de classification ligne par ligne
+    Les notes sont d'abord converties en nombres Python (pour un tableau numpy) et
+    rangées dans les variables locales g0, g1...: le corps compare ces variables à des
+    constantes, sans boucle ni accès à des attributs
+    :param name: le nom de la fonction
+    :param nb_grades: le nombre de notes
+    :param body: les lignes du corps de la fonction, indentées
+    :param constants: les valeurs utilisées par leur nom dans le corps
+    :return: la fonction, qui prend un ensemble de notes et renvoie la catégorie
+    """
+    names = "".join(f"g{i}, " for i in range(nb_grades))
+    source = "\n".join(
+        [
+            f"def {name}(grades):",
+            "    if grades.__class__ is ndarray:",
+            "        grades = grades.tolist()",
+            f"    {names}= grades",
+        ]
+        + body
+    )
+    namespace = dict(constants, ndarray=np.ndarray)
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+def _mask_lines(conditions: Sequence[str]) -> List[str]:
+    """
+    Pour écrire le calcul du masque des matières validées
+    :param conditions: la condition de validation de chaque matière
+    :return: les lignes qui calculent le masque dans la variable m
+    """
+    return ["    m = 0"] + [
+        f"    if {condition}: m |= {1 << i}" for i, condition in enumerate(conditions)
+    ]
+
+
+class MrSortScorer:
+    """
+    Classification ligne par ligne d'un modèle MR-Sort, sans numpy
+    classify_one est une fonction générée pour le modèle, où les frontières et les
+    poids sont des constantes. Jusqu'à MAX_TABLE_GRADES matières, les matières validées
+    sont codées en entier et cherchées dans la table des coalitions suffisantes du
+    classifieur, comme pour NCS; au-delà, les poids sont accumulés dans le même ordre
+    que Classifier.classify_one
+    """
+
+    def __init__(self, classifier: Classifier):
+        """
+        Pour compiler le classifieur
+        :param classifier: le classifieur MR-Sort
+        """
+        coalitions = classifier.coalitions
+        self.table = None if coalitions is None else coalitions.table().tobytes()
+        constants = {"T": self.table}
+        poids = np.asarray(classifier.poids, dtype=float).tolist()
+        lam = _literal(float(classifier.lam), constants)
+        body = []
+        # de la plus haute catégorie à la plus basse
+        for category, border in reversed(list(enumerate(classifier.borders, 1))):
+            border = [_literal(b, constants) for b in np.asarray(border).tolist()]
+            if self.table is not None:
+                body += _mask_lines([f"g{i} >= {b}" for i, b in enumerate(border)])
+                body.append(f"    if T[m]: return {category}")
+            else:
+                body.append("    t = 0.0")
+                body += [
+                    f"    if g{i} >= {b}: t += {_literal(w, constants)}"
+                    for i, (b, w) in enumerate(zip(border, poids))
+                ]
+                body.append(f"    if t >= {lam}: return {category}")
+        body.append("    return 0")
+        self.classify_one = _compile(
+            "classify_one", classifier.nb_grades, body, constants
+        )
+
+
+class BinaryScorer:
+    """
+    Classification ligne par ligne d'un modèle MR-Sort binaire, sans numpy
+    classify_one est une fonction générée pour le modèle, qui accumule les poids dans
+    le même ordre que BinaryClassifier.classify_one et renvoie "accepted" ou "rejected"
+    """
+
+    def __init__(self, classifier: BinaryClassifier):
+        """
+        Pour compiler le classifieur
+        :param classifier: le classifieur MR-Sort binaire
+        """
+        constants = {}
+        poids = np.asarray(classifier.poids, dtype=float).tolist()
+        border = np.asarray(classifier.border).tolist()
+        body = ["    t = 0.0"] + [
+            f"    if g{i} >= {_literal(b, constants)}: t += {_literal(w, constants)}"
+            for i, (b, w) in enumerate(zip(border, poids))
+        ]
+        lam = _literal(float(classifier.lam), constants)
+        body.append(f'    return "accepted" if t > {lam} else "rejected"')
+        self.classify_one = _compile("classify_one", len(border), body, constants)
+
+
+class NcsScorer:
+    """
+    Classification ligne par ligne d'un modèle NCS (avec ou sans intervalles), sans numpy
+    classify_one est une fonction générée pour le modèle: les matières validées sont
+    codées en entier puis cherchées dans la table des coalitions suffisantes, convertie
+    en bytes, ou comparées aux coalitions minimales au-delà de MAX_TABLE_GRADES matières
+    """
+
+    def __init__(self, classifier: Union[NcsClassifier, IntervalClassifier]):
+        """
+        Pour compiler le classifieur
+        :param classifier: le classifieur NCS
+        """
+        borders = np.asarray(classifier.borders)
+        self.interval = isinstance(classifier, IntervalClassifier)
+        self.table = None
+        if classifier.nb_grades <= MAX_TABLE_GRADES:
+            self.table = classifier.coalitions.table().tobytes()
+        constants = {
+            "T": self.table,
+            "M": tuple(int(mask) for mask in classifier.coalitions.minimal),
+        }
+        body = []
+        # de la plus haute catégorie à la plus basse
+        for category in range(classifier.nb_categories, 0, -1):
+            if self.interval:
+                low, high = borders[category - 1].tolist()
+                conditions = [
+                    f"{_literal(lo, constants)} <= g{i} <= {_literal(hi, constants)}"
+                    for i, (lo, hi) in enumerate(zip(low, high))
+                ]
+            else:
+                conditions = [
+                    f"g{i} >= {_literal(lo, constants)}"
+                    for i, lo in enumerate(borders[category - 1].tolist())
+                ]
+            body += _mask_lines(conditions)
+            if self.table is not None:
+                body.append(f"    if T[m]: return {category}")
+            else:
+                body.append(f"    if any(m & k == k for k in M): return {category}")
+        body.append("    return 0")
+        self.classify_one = _compile(
+            "classify_one", classifier.nb_grades, body, constants
+        )
+
+
+def compile_scorer(classifier: Any) -> Any:
+    """
+    Pour obtenir le classifieur ligne par ligne correspondant à un classifieur du projet
+    :param classifier: un Classifier, BinaryClassifier, ncs.Classifier ou IntervalClassifier
+    :return: un objet dont classify_one renvoie le même résultat que celui du classifieur
+    """
+    if isinstance(classifier, Classifier):
+        return MrSortScorer(classifier)
+    if isinstance(classifier, BinaryClassifier):
+        return BinaryScorer(classifier)
+    if isinstance(classifier, (NcsClassifier, IntervalClassifier)):
+        return NcsScorer(classifier)
+    raise TypeError(f"Classifieur non pris en charge: {type(classifier).__name__}")
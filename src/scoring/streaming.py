@@ -0,0 +1,80 @@
+from os import PathLike
+from typing import Any, Dict, Iterable, Tuple, Union
+import time
+import numpy as np
+from src.datasets.dataset import label_dtype
+
+from src.datasets.dataset import Dataset
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def open_grades(source: Union[str, PathLike, np.ndarray]) -> np.ndarray:
+    """
+    Pour ouvrir une matrice de notes sans la charger en mémoire
+    :param source: un fichier .npy (ouvert en memmap), un tableau déjà ouvert (np.memmap, np.ndarray) ou un Dataset
+    :return: la matrice de notes
+    """
+    if isinstance(source, (str, PathLike)):
+        return np.load(source, mmap_mode="r")
+    if isinstance(source, Dataset):
+        return source.grades
+    return source
+
+
+def classify_stream(
+    classifier: Any,
+    source: Union[str, PathLike, np.ndarray],
+    output: Union[str, PathLike, np.ndarray],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Pour classer une matrice de notes par blocs de chunk_size lignes
+    La mémoire utilisée est bornée par la taille des blocs et non par celle des données
+    :param classifier: un classifieur du projet (avec une méthode classify_many et un attribut nb_categories)
+    :param source: la matrice de notes, ou le chemin d'un fichier .npy
+    :param output: le tableau où écrire les étiquettes, ou le chemin du fichier .npy à créer
+    :param chunk_size: le nombre de lignes classées à la fois
+    :return: le tableau des étiquettes (memmap si output est un chemin, typé par label_dtype)
+    """
+    data = open_grades(source)
+    if isinstance(output, (str, PathLike)):
+        dtype = label_dtype(classifier.nb_categories + 1)
+        labels = np.lib.format.open_memmap(
+            output, mode="w+", dtype=dtype, shape=(len(data),)
+        )
+    else:
+        labels = output
+        if len(labels) != len(data):
+            raise ValueError("La sortie doit avoir autant de lignes que les données")
+    for start in range(0, len(data), chunk_size):
+        stop = min(start + chunk_size, len(data))
+        labels[start:stop] = classifier.classify_many(data[start:stop])
+    if isinstance(labels, np.memmap):
+        labels.flush()
+    return labels
+
+
+def evaluate_stream(
+    classifier: Any, chunks: Iterable[Tuple[np.ndarray, np.ndarray]]
+) -> Dict[str, float]:
+    """
+    Pour comparer les étiquettes d'un classifieur à celles d'un flux de blocs, par exemple
+    celui de iter_generate, sans conserver les blocs
+    :param classifier: un classifieur du projet (avec une méthode classify_many)
+    :param chunks: les couples (notes, étiquettes attendues) de chaque bloc
+    :return: {"rows": nombre de lignes, "errors": nombre d'étiquettes différentes, "seconds": durée de classification, "rows_per_second"}
+    """
+    nb_rows, nb_errors, seconds = 0, 0, 0.0
+    for grades, labels in chunks:
+        begin = time.perf_counter()
+        predicted = classifier.classify_many(grades)
+        seconds += time.perf_counter() - begin
+        nb_errors += int(np.count_nonzero(predicted != labels))
+        nb_rows += len(labels)
+    return {
+        "rows": nb_rows,
+        "errors": nb_errors,
+        "seconds": seconds,
+        "rows_per_second": nb_rows / seconds if seconds > 0 else float("inf"),
+    }
@@ -0,0 +1,346 @@
+import numpy as np
+import pytest
+from src.datasets.balanced import generate_balanced
+from src.datasets.dataset import Dataset, as_classified, grade_dtype, stack_classified
+from src.datasets.dominance import prune_dominated, skyline
+from src.datasets.noise import add_noise
+from src.datasets.parallel import generate_parallel
+from src.datasets.partition import Partition
+from src.datasets.store import DatasetStore
+from src.mr_sort.binary_classifier import BinaryClassifier
+from src.mr_sort.binary_generator import BinaryGenerator
+from src.mr_sort.generator import Generator
+from src.ncs.generator import Generator as NcsGenerator
+from src.ncs.interval_generator import IntervalGenerator
+
+
+def test_stack_classified():
+    """
+    Les données classées sont rassemblées avec leurs étiquettes, catégories vides comprises
+    """
+    grades, labels = stack_classified(
+        {2: [[1, 2]], 1: np.zeros((0, 2)), 0: np.array([[3, 4], [5, 6]])}
+    )
+    assert grades.tolist() == [[1, 2], [3, 4], [5, 6]]
+    assert labels.tolist() == [2, 0, 0]
+
+
+def test_binary_classify_many():
+    """
+    Les étiquettes binaires correspondent à classify_one
+    """
+    generator = BinaryGenerator()
+    generator.random_parameters()
+    gen_params = generator.get_parameters()
+    classifier = BinaryClassifier(
+        border=gen_params["border"], poids=gen_params["poids"], lam=gen_params["lam"]
+    )
+    grades, labels = stack_classified(
+        generator.generate(200), BinaryClassifier.categories
+    )
+    assert list(classifier.classify_many(grades)) == list(labels)
+    assert [BinaryClassifier.categories[label] for label in labels] == [
+        classifier.classify_one(row) for row in grades
+    ]
+
+
+def test_partition():
+    """
+    La partition se comporte comme le dictionnaire {catégorie: ensembles de notes}
+    """
+    data = np.array([[0, 0], [1, 1], [2, 2], [3, 3], [4, 4]])
+    partition = Partition(data, np.array([1, 0, 2, 1, 0], dtype=np.int8), 3)
+    assert list(partition.keys()) == [2, 1, 0]
+    assert partition[1].tolist() == [[0, 0], [3, 3]]
+    assert partition[0].tolist() == [[1, 1], [4, 4]]
+    assert partition[1].base is partition[0].base
+    assert [len(v) for v in partition.values()] == [1, 2, 2]
+    assert 3 not in partition and partition.get(3) is None
+    grades, labels = stack_classified(partition)
+    assert grades is data and labels is partition.labels
+
+    named = Partition(data[:2], np.array([1, 0]), 2, BinaryClassifier.categories)
+    assert list(named.keys()) == ["accepted", "rejected"]
+    assert named["accepted"].tolist() == [[0, 0]]
+
+
+def test_add_noise():
+    """
+    Le bruit par ligne décale toutes les notes d'une ligne de la même valeur, le bruit
+    par note non, et les notes entières restent entières entre 0 et max_grade
+    """
+    data = np.full((1000, 5), 10.0)
+    noisy = add_noise(data, 1, "row")
+    assert noisy.shape == data.shape and noisy.flags["C_CONTIGUOUS"]
+    assert np.all(noisy == noisy[:, :1])
+    noisy = add_noise(data, 1, "element")
+    assert not np.all(noisy == noisy[:, :1])
+
+    grades = np.random.randint(0, 21, size=(1000, 5))
+    noisy = add_noise(grades, 5, "element", max_grade=20)
+    assert noisy.dtype == grades.dtype
+    assert noisy.min() >= 0 and noisy.max() <= 20
+
+
+def test_generate_noisy():
+    """
+    Les données bruitées gardent les étiquettes calculées sur les données non bruitées
+    """
+    for generator, noise_model in [
+        (Generator(), "row"),
+        (Generator(), "element"),
+        (NcsGenerator(), "element"),
+    ]:
+        generator.rng = np.random.default_rng(0)
+        clean = generator.generate(500)
+        generator.rng = np.random.default_rng(0)
+        noisy = generator.generate(500, 1, noise_model)
+        assert isinstance(noisy, Partition)
+        assert noisy.labels.tolist() == clean.labels.tolist()
+        assert noisy.data.shape == clean.data.shape
+        assert not np.array_equal(noisy.data, clean.data)
+
+
+def test_generate_integer_grades():
+    """
+    Les générateurs NCS tirent des notes entières du plus petit type possible, et les
+    étiquettes du modèle compilé correspondent à celles du classifieur
+    """
+    for generator in [NcsGenerator(), IntervalGenerator()]:
+        generator.random_parameters()
+        results = generator.generate(1000)
+        assert results.data.dtype == np.uint8
+        assert results.data.max() <= generator.max_grade
+        assert list(results.labels) == list(
+            generator.classifier.classify_many(results.data)
+        )
+    assert grade_dtype(1000) == np.uint16
+
+
+def test_generate_parallel():
+    """
+    Pour une même graine, les données générées ne dépendent pas du nombre de processus
+    """
+    for generator, noise in [
+        (Generator(), 1),
+        (BinaryGenerator(), 1),
+        (NcsGenerator(), None),
+        (IntervalGenerator(), 2),
+    ]:
+        generator.random_parameters()
+        single = generate_parallel(
+            generator, 1000, noise, seed=42, nb_workers=1, block_size=128
+        )
+        multi = generate_parallel(
+            generator, 1000, noise, seed=42, nb_workers=3, block_size=128
+        )
+        assert len(single.labels) == 1000
+        assert np.array_equal(single.data, multi.data)
+        assert np.array_equal(single.labels, multi.labels)
+        assert list(single.keys()) == list(generator.generate(10).keys())
+
+
+def test_seeded_generator():
+    """
+    Deux générateurs de même graine tirent les mêmes paramètres et les mêmes données
+    """
+    first, second = NcsGenerator(seed=3), NcsGenerator(seed=3)
+    first.random_parameters()
+    second.random_parameters()
+    assert first.get_parameters()["borders"].tolist() == (
+        second.get_parameters()["borders"].tolist()
+    )
+    assert np.array_equal(first.generate(100, 1).data, second.generate(100, 1).data)
+
+
+def test_iter_generate():
+    """
+    Les blocs réutilisent les mêmes tableaux, s'arrêtent à total lignes, et leurs
+    étiquettes sont celles du classifieur sur les données non bruitées
+    """
+    for generator in [
+        Generator(seed=1),
+        BinaryGenerator(seed=1),
+        NcsGenerator(seed=1),
+        IntervalGenerator(seed=1),
+    ]:
+        chunks = generator.iter_generate(300, total=1000)
+        bases = set()
+        nb_rows = 0
+        for grades, labels in chunks:
+            bases.add(id(grades.base))
+            nb_rows += len(grades)
+            assert list(labels) == list(generator.classifier.classify_many(grades))
+        assert nb_rows == 1000 and len(bases) == 1
+
+        noisy = generator.iter_generate(300, None, 1)
+        for _ in range(5):
+            grades, labels = next(noisy)
+            assert grades.shape == (300, generator.nb_grades) and len(labels) == 300
+
+        with pytest.raises(ValueError, match="Taille de bloc"):
+            generator.iter_generate(0)
+
+    # un flux de notes réelles tire les mêmes notes que sample, pour une même graine
+    for generator_class in [Generator, BinaryGenerator]:
+        first, _ = next(generator_class(seed=2).iter_generate(50))
+        assert np.array_equal(first, generator_class(seed=2).sample(50)[0])
+
+
+def test_generate_balanced():
+    """
+    Les données équilibrées contiennent exactement le nombre demandé de chaque
+    catégorie, même rare, et une catégorie impossible à atteindre est signalée
+    """
+    generator = Generator(seed=0, borders=[[18] * 5])
+    results = generate_balanced(generator, {0: 200, 1: 200})
+    assert [results.count(k) for k in [1, 0]] == [200, 200]
+    assert list(generator.classifier.classify_many(results[1])) == [1] * 200
+
+    binary = BinaryGenerator(seed=0, border=[17] * 5)
+    results = generate_balanced(binary, {"accepted": 50, "rejected": 10}, noise=1)
+    assert results.count("accepted") == 50 and results.count("rejected") == 10
+
+    ncs = NcsGenerator(seed=0, borders=[[15] * 5, [19] * 5])
+    results = generate_balanced(ncs, {2: 30, 1: 30, 0: 30})
+    assert results.data.dtype == np.uint8
+    assert list(ncs.classifier.classify_many(results.data)) == list(results.labels)
+
+    impossible = Generator(seed=0, borders=[[25] * 5])
+    with pytest.raises(ValueError):
+        generate_balanced(impossible, {1: 1}, max_rows=10_000)
+
+
+def test_dataset_store(tmp_path):
+    """
+    Un jeu de données enregistré est relu en memmap à l'identique, la clé dépend des
+    paramètres, du modèle de bruit et de la graine, et les jeux les plus anciens sont supprimés
+    """
+    store = DatasetStore(tmp_path, max_bytes=1 << 20)
+    generator = NcsGenerator()
+    first = store.get(generator, 1000, 1, seed=7)
+    second = store.get(generator, 1000, 1, seed=7)
+    assert isinstance(second.data, np.memmap)
+    assert np.array_equal(first.data, second.data)
+    assert np.array_equal(first.labels, second.labels)
+    clean = store.get(generator, 1000, seed=7)
+    assert list(generator.classifier.classify_many(clean[1])) == [1] * clean.count(1)
+
+    other = store.get(generator, 1000, 1, seed=8)
+    assert not np.array_equal(first.data, other.data)
+    element = store.get(generator, 1000, 1, seed=7, noise_model="element")
+    assert not np.array_equal(first.data, element.data)
+    generator.reset_parameters(borders=[[10] * 5])
+    assert store.path(store.key(generator, 1000, 1, 7)) != store.path(
+        store.key(NcsGenerator(), 1000, 1, 7)
+    )
+
+    small = DatasetStore(tmp_path / "small", max_bytes=100_000)
+    mr_sort = Generator()
+    for seed in [0, 1, 0, 2]:
+        small.get(mr_sort, 1000, seed=seed)
+    assert len(list((tmp_path / "small").iterdir())) == 2
+    assert not small.path(small.key(mr_sort, 1000, None, 1)).exists()
+
+
+def test_dataset():
+    """
+    Un Dataset se convertit sans copie depuis et vers les formats par catégorie, et
+    se passe directement aux classifieurs
+    """
+    generator = Generator(seed=0, borders=[[8] * 5, [14] * 5])
+    partition = generator.generate(300)
+    dataset = Dataset.from_classified(partition)
+    assert dataset.grades is partition.data and dataset.labels is partition.labels
+    assert not hasattr(dataset, "__dict__")
+    assert len(dataset) == 300 and dataset.names == [0, 1, 2]
+    assert list(generator.classifier.classify_many(dataset)) == list(dataset.labels)
+    assert stack_classified(dataset)[0] is dataset.grades
+    assert {k: v.tolist() for k, v in dataset.to_dict().items()} == {
+        k: v.tolist() for k, v in partition.items()
+    }
+    assert as_classified(dataset)[2].tolist() == partition[2].tolist()
+
+    legacy = {"accepted": [[15, 15], [18, 12]], "rejected": [[1, 2]]}
+    binary = Dataset.from_classified(legacy, BinaryClassifier.categories)
+    assert binary.labels.tolist() == [1, 1, 0]
+    assert binary.to_partition()["rejected"].tolist() == [[1, 2]]
+    assert Dataset.from_classified({0: [[1]], 2: [[3]]}).names == [0, 1, 2]
+
+    # au-delà de 128 catégories, les étiquettes ne tiennent plus dans un int8
+    many = Dataset.from_classified({k: [[k]] for k in range(200)})
+    assert many.labels.dtype == np.int16 and many.labels.tolist() == list(range(200))
+    assert Dataset(np.zeros((2, 1)), [0, 1], names=["a", "b"]).labels.dtype == np.int8
+    with pytest.raises(ValueError, match="étiquettes"):
+        Dataset(np.zeros((2, 1)), [0, 2], names=["a", "b"])
+
+
+def test_collapse():
+    """
+    Les lignes identiques d'une même catégorie sont regroupées, avec leur nombre
+    d'occurrences comme poids
+    """
+    grades = np.array([[1, 2], [1, 2], [3, 4], [1, 2], [3, 4]], dtype=np.uint8)
+    dataset = Dataset(grades, [1, 1, 0, 0, 1])
+    collapsed, inverse = dataset.collapse(return_inverse=True)
+    assert collapsed.grades.dtype == np.uint8
+    assert collapsed.grades.tolist() == [[1, 2], [3, 4], [1, 2], [3, 4]]
+    assert collapsed.labels.tolist() == [0, 0, 1, 1]
+    assert collapsed.weights.tolist() == [1, 1, 2, 1]
+    assert (collapsed.grades[inverse] == grades).all()
+    assert collapsed.category_weights(1).tolist() == [2, 1]
+    assert dataset.positions().tolist() == [0, 1, 0, 1, 2]
+    assert dataset.expand_rows(collapsed, inverse, [(1, 0)]) == [(1, 0), (1, 1)]
+
+    # les poids existants sont additionnés
+    weighted = Dataset(grades, [1, 1, 0, 0, 1], weights=collapsed.weights[inverse])
+    assert weighted.collapse().weights.tolist() == [1, 1, 4, 1]
+
+    generator = NcsGenerator(
+        seed=0, max_grade=4, borders=[[2, 2, 2]], valid_set=[(1, 2), (3,)]
+    )
+    partition = generator.generate(2000)
+    collapsed = Dataset.from_classified(partition).collapse()
+    assert collapsed.weights.sum() == 2000 and len(collapsed) < 2000
+    for name in partition:
+        assert len(np.unique(collapsed.to_partition()[name], axis=0)) == len(
+            collapsed.to_partition()[name]
+        )
+
+
+def test_skyline():
+    """
+    Les lignes minimales et maximales trouvées par blocs sont celles de la comparaison
+    de toutes les paires de lignes
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        grades = np.unique(rng.integers(0, 6, (rng.integers(1, 500), 4)), axis=0)
+        dominates = (grades[:, None, :] <= grades[None, :, :]).all(axis=2)
+        np.fill_diagonal(dominates, False)
+        minimal = np.flatnonzero(~dominates.any(axis=0))
+        maximal = np.flatnonzero(~dominates.any(axis=1))
+        assert skyline(grades, block_size=37).tolist() == minimal.tolist()
+        assert skyline(grades, True, block_size=37).tolist() == maximal.tolist()
+
+
+def test_prune_dominated():
+    """
+    Seules les lignes minimales des catégories hautes et maximales des catégories
+    basses sont gardées, et des données incohérentes sont détectées
+    """
+    generator = NcsGenerator(seed=0, borders=[[8] * 5, [14] * 5])
+    dataset = Dataset.from_classified(generator.generate(5000))
+    pruned, nb_pruned = prune_dominated(dataset)
+    assert nb_pruned == len(dataset) - len(pruned) and len(pruned) < len(dataset) / 2
+    # chaque ligne supprimée domine (ou est dominée par) une ligne gardée de sa catégorie
+    for label in range(3):
+        kept = pruned.grades[pruned.labels == label]
+        rows = dataset.grades[dataset.labels == label]
+        above = (rows[:, None, :] >= kept[None, :, :]).all(axis=2).any(axis=1)
+        below = (rows[:, None, :] <= kept[None, :, :]).all(axis=2).any(axis=1)
+        assert (above if label == 2 else below if label == 0 else above & below).all()
+
+    inconsistent = Dataset(np.array([[5, 5], [9, 9], [9, 8]]), [1, 0, 1])
+    with pytest.raises(ValueError):
+        prune_dominated(inconsistent)
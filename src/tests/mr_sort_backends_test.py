@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+from src.datasets.dataset import Dataset
+from src.mr_sort.backends import BACKENDS, MatrixModel, get_backend
+from src.mr_sort.binary_generator import BinaryGenerator
+from src.mr_sort.multiclass_solver import MulticlassSolver
+from src.mr_sort.relaxed_binary_solver import RelaxedBinarySolver
+
+
+def test_matrix_model():
+    """
+    Les termes sont diffusés à la forme des contraintes, et sommés sur leur dernière
+    dimension quand ils en ont une de plus
+    """
+    model = MatrixModel()
+    x = model.add_variables((2, 3), ub=1)
+    y = model.add_variables(2, binary=True)
+    rows = model.add_constraints(2, [(1, x), (-2, y)], upper=[0, 1])
+    assert rows.tolist() == [0, 1]
+    model.add_constraints((2, 3), [(1, x), (1, y[:, None])], lower=0.5)
+    assert (model.nb_variables, model.nb_constraints) == (8, 8)
+    assert model.nb_nonzeros == 8 + 12
+    assert model.matrix.toarray()[0].tolist() == [1, 1, 1, 0, 0, 0, -2, 0]
+    assert model.lower[:2].tolist() == [-np.inf, -np.inf]
+    assert model.upper[:2].tolist() == [0, 1]
+    assert model.integrality.tolist() == [False] * 6 + [True] * 2
+
+
+def test_backends():
+    """
+    Gurobi et HiGHS trouvent le même optimum
+    """
+    model = MatrixModel()
+    # sac à dos: max 5a + 4b + 3c avec 2a + 3b + c <= 5, 4a + b + 2c <= 11
+    x = model.add_variables(3, binary=True)
+    model.add_constraints(2, [([[2, 3, 1], [4, 1, 2]], x[None, :])], upper=[5, 11])
+    model.set_objective([([5, 4, 3], x)], maximize=True)
+    for name in BACKENDS:
+        solution = get_backend(name).solve(model)
+        assert solution.objective == pytest.approx(9)
+        assert solution.x.round().tolist() == [1, 1, 0]
+
+    # un même backend reprend le modèle déjà chargé quand seuls les seconds membres
+    # changent, et le recharge quand la structure change
+    for name in BACKENDS:
+        backend = get_backend(name)
+        model = MatrixModel()
+        x = model.add_variables(3, binary=True)
+        rows = model.add_constraints(
+            2, [([[2, 3, 1], [4, 1, 2]], x[None, :])], upper=[5, 11]
+        )
+        model.set_objective([([5, 4, 3], x)], maximize=True)
+        assert backend.solve(model).objective == pytest.approx(9)
+        model.set_constraint_bounds(rows, upper=[3, 11])
+        assert backend.solve(model).objective == pytest.approx(8)
+        model.add_constraints((), [(1, x[0])], upper=0)
+        assert backend.solve(model).objective == pytest.approx(4)
+
+    # contrainte à deux bornes: sans sa borne supérieure, l'optimum serait 12
+    model = MatrixModel()
+    x = model.add_variables(3, binary=True)
+    model.add_constraints(
+        2, [([[2, 3, 1], [4, 1, 2]], x[None, :])], lower=[1, -np.inf], upper=[5, 11]
+    )
+    model.set_objective([([5, 4, 3], x)], maximize=True)
+    for name in BACKENDS:
+        solution = get_backend(name).solve(model)
+        assert solution.objective == pytest.approx(9)
+        assert solution.x.round().tolist() == [1, 1, 0]
+
+    with pytest.raises(ValueError, match="Backend inconnu"):
+        get_backend("cplex")
+
+
+def test_solvers_backends():
+    """
+    Les solveurs MR-Sort construisent le même modèle pour les deux backends
+    """
+    g = BinaryGenerator(seed=0, border=[12] * 3, poids=[1 / 3] * 3, lam=0.6)
+    data = Dataset.from_classified(g.generate(20, noise=1))
+    objectives = []
+    for name in BACKENDS:
+        solver = RelaxedBinarySolver(nb_grades=3, nb_students=20, backend=name)
+        solver.solve(data)
+        objectives.append(solver.solution.objective)
+    assert objectives[0] == pytest.approx(objectives[1])
+
+    classified = {0: [[5, 6]], 1: [[10, 12], [11, 9]], 2: [[15, 16]]}
+    objectives = []
+    for name in BACKENDS:
+        solver = MulticlassSolver(nb_grades=2, nb_students=4, backend=name)
+        solver.solve(classified, formulation="breakpoints")
+        objectives.append(solver.solution.objective)
+    assert objectives[0] == pytest.approx(objectives[1])
@@ -1,5 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pytest
+import numpy as np
+from src.datasets.dataset import Dataset, stack_classified
 from src.mr_sort.binary_generator import BinaryGenerator
 from src.mr_sort.binary_classifier import BinaryClassifier
 from src.mr_sort.binary_solver import BinarySolver
@@ -7,7 +9,10 @@ from src.mr_sort.relaxed_binary_solver import RelaxedBinarySolver
 
 
 def eval_solver(
-    gen_params: Dict[str, Any], solver_params: Dict[str, Any], ecart: float = 0.5
+    gen_params: Dict[str, Any],
+    solver_params: Dict[str, Any],
+    ecart: float = 0.5,
+    seed: Optional[Any] = None,
 ):
     """
     Compare les résultats réels et estimés
@@ -15,10 +20,12 @@ def eval_solver(
     :param comp_results: les paramètres du solver
     :param ecart: l'accuracy à vérifier sur les résultats
     :param noise: le bruit à ajouter sur les données générées
+    :param seed: la graine des données de test, None pour une graine aléatoire
     :return: None
     """
     # Generate data
     g = BinaryGenerator(
+        seed=seed,
         max_grade=gen_params["max_grade"],
         border=gen_params["border"],
         poids=gen_params["poids"],
@@ -31,15 +38,11 @@ def eval_solver(
         lam=solver_params["lam"],
     )
     # Verify data
-    nb_class_false = 0
-    nb_class_tot = 0
-    for category_real, grades_set_real in data_true_classified.items():
-        nb_class_tot += len(grades_set_real)
-        for grades_real in grades_set_real:
-            category_classified = classifier_solver.classify_one(grades_real)
-            if category_classified != category_real:
-                nb_class_false += 1
-    assert nb_class_false / nb_class_tot <= ecart
+    grades, true_classes = stack_classified(
+        data_true_classified, BinaryClassifier.categories
+    )
+    pred_classes = classifier_solver.classify_many(grades)
+    assert (pred_classes != true_classes).mean() <= ecart
 
 
 def test_basic():
@@ -143,3 +146,107 @@ def test_noisy_rd_params():
 
         # Génération des données de test et test
         eval_solver(gen_params=gen_params, solver_params=solver_params)
+
+
+def test_dataset_input():
+    """
+    Le solveur accepte directement un Dataset
+    """
+    g = BinaryGenerator(seed=0)
+    data = Dataset.from_classified(g.generate(20))
+    s = BinarySolver(nb_grades=5, nb_students=20)
+    solver_params = s.solve(data)
+    eval_solver(gen_params=g.get_parameters(), solver_params=solver_params, seed=1)
+
+
+def test_collapse():
+    """
+    Les étudiants en double ne sont gardés qu'une fois, mais comptent autant de fois
+    qu'ils apparaissent dans l'objectif du solveur relâché
+    """
+    accepted = np.array([[15, 16], [15, 16], [12, 17], [15, 16]], dtype=float)
+    refused = np.array([[2, 3], [2, 3], [4, 1]], dtype=float)
+    solver = RelaxedBinarySolver(nb_grades=2, nb_students=7)
+    solver.solve(accepted, refused)
+    assert solver.solution.objective == 7
+    full = RelaxedBinarySolver(nb_grades=2, nb_students=7)
+    full.solve(accepted, refused, collapse=False)
+    assert full.solution.objective == 7
+    assert solver.model.nb_constraints < full.model.nb_constraints
+
+
+def test_prune():
+    """
+    Les étudiants dominés sont supprimés sans changer la solution, et des données
+    incohérentes sont détectées avant la résolution
+    """
+    accepted = np.array([[15, 16], [16, 17], [12, 17], [18, 18]], dtype=float)
+    refused = np.array([[2, 3], [1, 2], [4, 1]], dtype=float)
+    solver = BinarySolver(nb_grades=2, nb_students=7)
+    assert solver.solve(accepted, refused)["nb_pruned"] == 3
+    full = BinarySolver(nb_grades=2, nb_students=7)
+    assert full.solve(accepted, refused, prune=False)["nb_pruned"] == 0
+    assert solver.solution.objective == pytest.approx(full.solution.objective)
+    assert solver.model.nb_constraints < full.model.nb_constraints
+
+    with pytest.raises(ValueError, match="incohérentes"):
+        BinarySolver(nb_grades=2, nb_students=3).solve(
+            accepted[:2], np.array([[17, 18]], dtype=float)
+        )
+
+
+def test_tight_bounds():
+    """
+    Les constantes big-M et les bornes des frontières sont calculées à partir des
+    notes: des notes supérieures à 100 sont possibles
+    """
+    accepted = np.array([[500, 600], [700, 450]], dtype=float)
+    refused = np.array([[100, 200], [50, 650]], dtype=float)
+    solver = BinarySolver(nb_grades=2, nb_students=4)
+    solver_params = solver.solve(accepted, refused)
+    assert (
+        (solver_params["border"] >= [50, 200])
+        & (solver_params["border"] <= [700, 650.001])
+    ).all()
+    relaxed = RelaxedBinarySolver(nb_grades=2, nb_students=4)
+    relaxed.solve(accepted, refused)
+    assert relaxed.solution.objective == 4
+
+    # avec la constante big-M fixe, aucune frontière n'est à moins de 100 de
+    # toutes les notes
+    with pytest.raises(ValueError):
+        BinarySolver(nb_grades=2, nb_students=4).solve(
+            accepted, refused, tight_bounds=False
+        )
+
+
+def test_breakpoints():
+    """
+    La formulation par chaînes de variables binaires trouve le même optimum avec une
+    variable binaire par note distincte, et la frontière est l'une des notes
+    """
+    g = BinaryGenerator(seed=0, border=[12] * 4, poids=[0.25] * 4, lam=0.6)
+    noisy = Dataset.from_classified(g.generate(30, noise=1))
+    noisy = Dataset(np.round(noisy.grades), noisy.labels, noisy.weights, noisy.names)
+    results = {}
+    for formulation in ("big-m", "breakpoints"):
+        solver = RelaxedBinarySolver(nb_grades=4, nb_students=30)
+        solver.solve(noisy, formulation=formulation)
+        results[formulation] = solver.solution.objective
+    assert results["breakpoints"] == pytest.approx(results["big-m"])
+    nb_breakpoints = sum(len(np.unique(column)) for column in noisy.collapse().grades.T)
+    assert solver.z_k.shape == (nb_breakpoints,)
+    assert solver.d_i_j is None
+
+    data = Dataset.from_classified(g.generate(30))
+    solver_params = BinarySolver(nb_grades=4, nb_students=30).solve(
+        data, formulation="breakpoints"
+    )
+    grades = np.asarray(data.grades)
+    assert all(
+        np.isclose(border, grades[:, i]).any() or border > grades[:, i].max()
+        for i, border in enumerate(solver_params["border"])
+    )
+
+    with pytest.raises(ValueError, match="Formulation inconnue"):
+        BinarySolver(nb_grades=4, nb_students=30).solve(data, formulation="chain")
@@ -0,0 +1,82 @@
+import numpy as np
+from src.mr_sort.classifier import Classifier
+from src.mr_sort.generator import Generator
+from src.ncs.coalitions import weighted_coalitions, weighted_sum
+
+
+def test_classify_many_matches_classify_one():
+    """
+    Les étiquettes vectorisées correspondent à classify_one, y compris sur les frontières
+    """
+    for _ in range(5):
+        generator = Generator()
+        generator.random_parameters()
+        gen_params = generator.get_parameters()
+        classifier = Classifier(
+            borders=gen_params["borders"],
+            poids=gen_params["poids"],
+            lam=gen_params["lam"],
+        )
+        data = np.random.rand(500, gen_params["nb_grades"]) * gen_params["max_grade"]
+        data[:50] = gen_params["borders"][0]
+        labels = classifier.classify_many(data)
+        assert labels.dtype == np.int8
+        assert list(labels) == [classifier.classify_one(row) for row in data]
+
+
+def test_classify_partition():
+    """
+    classify renvoie chaque ligne dans la catégorie de son étiquette, dans l'ordre d'origine
+    """
+    classifier = Classifier(
+        borders=[[10, 10, 10], [15, 15, 15]], poids=[0.2, 0.3, 0.5], lam=0.5
+    )
+    data = np.array([[16, 16, 0], [0, 0, 12], [0, 0, 0], [11, 11, 0], [20, 20, 20]])
+    results = classifier.classify(data)
+    assert list(results.keys()) == [2, 1, 0]
+    assert results[2].tolist() == [[16, 16, 0], [20, 20, 20]]
+    assert results[1].tolist() == [[0, 0, 12], [11, 11, 0]]
+    assert results[0].tolist() == [[0, 0, 0]]
+
+
+def test_many_categories():
+    """
+    Au-delà de 127 catégories, les étiquettes ne tiennent plus dans un int8
+    """
+    classifier = Classifier(borders=[[h] for h in range(1, 201)], poids=[1], lam=1)
+    labels = classifier.classify_many([[150], [200]])
+    assert labels.dtype == np.int16 and labels.tolist() == [150, 200]
+    assert classifier.classify_one(np.array([150])) == 150
+    assert classifier.classify([[150]])[150].tolist() == [[150]]
+
+
+def test_weighted_coalitions():
+    """
+    Les coalitions calculées à partir des poids donnent les mêmes décisions que les
+    sommes pondérées, avec la table dense comme avec l'énumération des coalitions minimales
+    """
+    for nb_grades, lam in [(3, 0.6), (7, 0.6), (22, 0.9)]:
+        poids = np.random.rand(nb_grades)
+        poids /= poids.sum()
+        coalitions = weighted_coalitions(poids, lam)
+        masks = np.random.randint(0, 1 << nb_grades, size=2000, dtype=np.uint64)
+        expected = [weighted_sum(poids, int(mask)) >= lam for mask in masks]
+        assert list(coalitions.contains(masks)) == expected
+        for mask in coalitions.minimal:
+            for i in range(nb_grades):
+                if int(mask) >> i & 1:
+                    assert weighted_sum(poids, int(mask) ^ (1 << i)) < lam
+
+
+def test_classify_many_without_table():
+    """
+    Au-delà de MAX_TABLE_GRADES matières, classify_many utilise les sommes pondérées
+    """
+    classifier = Classifier(
+        borders=[[10] * 24, [15] * 24], poids=[1 / 24] * 24, lam=0.55
+    )
+    data = np.random.randint(0, 21, size=(300, 24))
+    assert classifier.coalitions is None
+    assert list(classifier.classify_many(data)) == [
+        classifier.classify_one(row) for row in data
+    ]
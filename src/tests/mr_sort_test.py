@@ -1,5 +1,6 @@
 from typing import Dict
 import pytest
+from src.datasets.dataset import stack_classified
 from src.mr_sort.generator import Generator
 from src.mr_sort.classifier import Classifier
 from src.mr_sort.multiclass_solver import MulticlassSolver
@@ -28,15 +29,9 @@ def eval_solver(gen_params, solver_params, ecart: float = 0.2):
         lam=solver_params["lam"],
     )
     # Verify data
-    nb_class_false = 0
-    nb_class_tot = 0
-    for category_real, grades_set_real in data_true_classified.items():
-        nb_class_tot += len(grades_set_real)
-        for grades_real in grades_set_real:
-            category_classified = classifier_solver.classify_one(grades_real)
-            if category_classified != category_real:
-                nb_class_false += 1
-    assert nb_class_false / nb_class_tot <= ecart
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
+    assert (pred_classes != true_classes).mean() <= ecart
 
 
 def test_basic():
@@ -112,7 +107,8 @@ def test_rd_params():
 
         # Génération des données de test et test
         eval_solver(
-            gen_params=gen_params, solver_params=solver_params,
+            gen_params=gen_params,
+            solver_params=solver_params,
         )
 
 
@@ -139,3 +135,100 @@ def test_noisy_rd_params():
 
         # Génération des données de test et test
         eval_solver(gen_params=gen_params, solver_params=solver_params)
+
+
+def test_model_size():
+    """
+    Chaque contrainte n'est ajoutée qu'une fois, et seules les catégories au-dessus de
+    la catégorie 0 ont des variables
+    """
+    generator = Generator(
+        seed=0, borders=[[8] * 3, [13] * 3], poids=[0.3, 0.3, 0.4], lam=0.6
+    )
+    data = generator.generate(12)
+    solver = MulticlassSolver(nb_grades=3, nb_students=12, nb_categories=2)
+    solver_params = solver.solve(data, collapse=False)
+
+    nb_students, nb_levels, nb_grades = 12, 2, 3
+    # x_j_h, c_i_j_h et d_i_j_h, puis les poids, lambda et les frontières
+    assert solver.model.nb_variables == (
+        nb_students * nb_levels * (1 + 2 * nb_grades) + nb_grades + 1 + 2 * nb_grades
+    )
+    # somme des poids, liens c/w/d, big-M, une comparaison à lambda par
+    # (étudiant, catégorie) et l'ordre des frontières
+    assert solver.model.nb_constraints == (
+        1 + nb_students * nb_levels * (5 * nb_grades + 1) + (nb_levels - 1) * nb_grades
+    )
+    grades, labels = stack_classified(data)
+    classifier = Classifier(
+        # une note validée peut être égale à sa frontière, aux erreurs d'arrondi près,
+        # et une note non validée est au moins small en dessous
+        borders=solver_params["borders"] - solver.small / 2,
+        poids=solver_params["poids"],
+        lam=solver_params["lam"],
+    )
+    assert (classifier.classify_many(grades) == labels).all()
+
+
+def test_empty_category():
+    """
+    Une catégorie sans étudiant ne fait pas échouer la construction du modèle
+    """
+    data = {0: [], 1: [[12, 13]], 2: [[15, 16], [17, 18]]}
+    solver = MulticlassSolver(nb_grades=2, nb_students=3, nb_categories=2)
+    solver.solve(data)
+    # chaque étudiant atteint toutes les catégories jusqu'à la sienne: 1 + 2 + 2
+    assert solver.solution.objective == pytest.approx(5)
+
+
+def test_breakpoints():
+    """
+    La formulation par chaînes de variables binaires trouve le même optimum et classe
+    correctement les données
+    """
+    generator = Generator(
+        seed=0, borders=[[8] * 3, [13] * 3], poids=[0.3, 0.3, 0.4], lam=0.6
+    )
+    data = generator.generate(12)
+    big_m = MulticlassSolver(nb_grades=3, nb_students=12, nb_categories=2)
+    big_m.solve(data)
+    solver = MulticlassSolver(nb_grades=3, nb_students=12, nb_categories=2)
+    solver_params = solver.solve(data, formulation="breakpoints")
+    assert solver.solution.objective == pytest.approx(big_m.solution.objective)
+    assert solver.d_i_j_h is None
+
+    grades, labels = stack_classified(data)
+    classifier = Classifier(
+        borders=solver_params["borders"],
+        poids=solver_params["poids"],
+        lam=solver_params["lam"],
+    )
+    assert (classifier.classify_many(grades) == labels).all()
+
+
+def test_template():
+    """
+    Le modèle est réutilisé pour des données de même forme (seuls les seconds membres,
+    les bornes et l'objectif changent) et trouve le même optimum qu'un modèle neuf
+    """
+    solver = MulticlassSolver(nb_grades=3, nb_students=12, nb_categories=2)
+    models = []
+    for seed in range(6):
+        generator = Generator(
+            seed=seed, borders=[[8] * 3, [13] * 3], poids=[0.3, 0.3, 0.4], lam=0.6
+        )
+        data = generator.generate(12)
+        solver.solve(data, template=True)
+        models.append(solver.model)
+        fresh = MulticlassSolver(nb_grades=3, nb_students=12, nb_categories=2)
+        fresh.solve(data)
+        assert solver.solution.objective == pytest.approx(fresh.solution.objective)
+        assert solver.model.nb_constraints == fresh.model.nb_constraints
+
+    assert len(set(map(id, models))) < len(models)
+
+    # la formulation par chaînes dépend des notes: le modèle est toujours reconstruit
+    solver.solve(data, formulation="breakpoints", template=True)
+    model = solver.model
+    solver.solve(data, formulation="breakpoints", template=True)
+    assert solver.model is not model
@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+from src.ncs.classifier import Classifier
+from src.ncs.coalitions import CoalitionSet, coalition_mask, pack_masks
+from src.ncs.compiled_model import CompiledModel
+from src.ncs.generator import Generator
+from src.ncs.interval_classifier import IntervalClassifier
+from src.ncs.interval_generator import IntervalGenerator
+
+
+def test_classify_many_matches_classify_one():
+    """
+    Les étiquettes obtenues par la table correspondent à classify_one
+    """
+    g = Generator()
+    for _ in range(5):
+        g.random_parameters()
+        gen_params = g.get_parameters()
+        classifier = Classifier(
+            borders=gen_params["borders"], valid_set=gen_params["valid_set"]
+        )
+        data = np.random.randint(
+            0, gen_params["max_grade"] + 1, size=(300, gen_params["nb_grades"])
+        )
+        labels = classifier.classify_many(data)
+        assert labels.dtype == np.int8
+        assert list(labels) == [classifier.classify_one(row) for row in data]
+
+
+def test_interval_classify_many_matches_classify_one():
+    """
+    Les étiquettes obtenues par la table correspondent à classify_one, avec intervalles
+    """
+    g = IntervalGenerator()
+    for _ in range(5):
+        g.random_parameters()
+        gen_params = g.get_parameters()
+        classifier = IntervalClassifier(
+            borders=gen_params["borders"], valid_set=gen_params["valid_set"]
+        )
+        data = np.random.randint(
+            0, gen_params["max_grade"] + 1, size=(300, gen_params["nb_grades"])
+        )
+        assert list(classifier.classify_many(data)) == [
+            classifier.classify_one(row) for row in data
+        ]
+
+
+def test_classify_partition():
+    """
+    classify regroupe les lignes selon leur catégorie, dans l'ordre d'origine
+    """
+    classifier = Classifier(borders=[[10, 10, 10]], valid_set=[[1, 2], [3]])
+    data = np.array([[12, 12, 0], [0, 0, 0], [0, 0, 10], [10, 0, 0]])
+    results = classifier.classify(data)
+    assert list(results.keys()) == [1, 0]
+    assert results[1].tolist() == [[12, 12, 0], [0, 0, 10]]
+    assert results[0].tolist() == [[0, 0, 0], [10, 0, 0]]
+
+
+def test_pack_masks():
+    """
+    Les masques sont codés sur le plus petit entier suffisant, jusqu'à 64 matières
+    """
+    assert pack_masks(np.ones((1, 9), dtype=bool)).tolist() == [511]
+    passed = np.random.rand(3, 4, 13) < 0.5
+    assert (pack_masks(passed) == (passed * (1 << np.arange(13))).sum(axis=-1)).all()
+    assert pack_masks(np.ones((1, 64), dtype=bool)).dtype == np.uint64
+    with pytest.raises(ValueError, match="64 matières"):
+        pack_masks(np.ones((1, 65), dtype=bool))
+
+
+def test_many_categories():
+    """
+    Au-delà de 127 catégories, les étiquettes ne tiennent plus dans un int8
+    """
+    borders = [[h] for h in range(1, 201)]
+    for classifier in [
+        Classifier(borders=borders, valid_set=[[1]]),
+        IntervalClassifier(
+            borders=[([h], [300]) for h in range(1, 201)], valid_set=[[1]]
+        ),
+    ]:
+        labels = classifier.classify_many([[150], [200]])
+        assert labels.dtype == np.int16 and labels.tolist() == [150, 200]
+
+
+def test_minimal_coalitions():
+    """
+    Seules les coalitions minimales sont conservées, et leurs sur-ensembles sont acceptés
+    """
+    coalitions = CoalitionSet([[1, 3], [1, 2, 3], [2, 4], [1, 2, 5], [3, 1]], 5)
+    assert coalitions.to_list() == [(1, 3), (2, 4), (1, 2, 5)]
+    masks = np.arange(32)
+    expected = [
+        any(mask & coalition_mask(c) == coalition_mask(c) for c in coalitions)
+        for mask in masks
+    ]
+    assert list(coalitions.contains(masks)) == expected
+    assert Classifier(borders=[[12] * 5], valid_set=coalitions).valid_set == [
+        (1, 3),
+        (2, 4),
+        (1, 2, 5),
+    ]
+    # toutes les coalitions suffisantes, énumérées seulement à la demande
+    assert coalitions.sufficient()[:2] == [(1, 3), (1, 2, 3)]
+    assert sorted(map(coalition_mask, coalitions.sufficient())) == list(
+        np.flatnonzero(expected)
+    )
+
+
+def test_many_grades():
+    """
+    Au-delà de la table dense, le test sur les coalitions minimales donne les mêmes résultats
+    """
+    nb_grades = 24
+    valid_set = [[1, 2, 3], [5, 10, 20, 24], [7]]
+    classifier = Classifier(
+        borders=[[10] * nb_grades, [15] * nb_grades], valid_set=valid_set
+    )
+    data = np.random.randint(0, 21, size=(500, nb_grades))
+    labels = classifier.classify_many(data)
+    for row, label in zip(data, labels):
+        expected = 0
+        for k, border in ((1, 10), (2, 15)):
+            if any(all(row[i - 1] >= border for i in c) for c in valid_set):
+                expected = k
+        assert label == expected
+
+
+def test_compiled_model():
+    """
+    Le modèle compilé donne les mêmes étiquettes que les classifieurs, avec et sans intervalles
+    """
+    for g, classifier_class in [
+        (Generator(), Classifier),
+        (IntervalGenerator(), IntervalClassifier),
+    ]:
+        for _ in range(5):
+            g.random_parameters()
+            gen_params = g.get_parameters()
+            classifier = classifier_class(
+                borders=gen_params["borders"], valid_set=gen_params["valid_set"]
+            )
+            model = CompiledModel.from_classifier(classifier, gen_params["max_grade"])
+            data = np.random.randint(
+                0, gen_params["max_grade"] + 1, size=(300, gen_params["nb_grades"])
+            ).astype(np.uint8)
+            assert list(model.classify_many(data)) == list(
+                classifier.classify_many(data)
+            )
+
+
+def test_compiled_model_bounds():
+    """
+    Le modèle compilé gère les seuils non entiers, les intervalles vides et plus de 127 catégories
+    """
+    classifier = IntervalClassifier(
+        borders=[([2.5, 0], [7.5, 20]), ([6, 30], [4, 40])], valid_set=[[1], [2]]
+    )
+    model = CompiledModel.from_classifier(classifier, 20)
+    data = np.array([[g, 20 - g] for g in range(21)], dtype=np.uint8)
+    assert list(model.classify_many(data)) == list(classifier.classify_many(data))
+    classifier = Classifier(borders=[[h] for h in range(1, 201)], valid_set=[[1]])
+    model = CompiledModel.from_classifier(classifier, 255)
+    labels = model.classify_many(np.array([[150], [0], [255]], dtype=np.uint8))
+    assert labels.dtype == np.int16
+    assert list(labels) == [150, 0, 200]
@@ -1,5 +1,6 @@
 import pytest
 from typing import Any, Dict
+from src.datasets.dataset import stack_classified
 from src.ncs.generator import Generator
 from src.ncs.classifier import Classifier
 from src.ncs.relaxed_solver import RelaxedNcsSolver
@@ -26,15 +27,9 @@ def eval_solver(
         borders=solver_params["borders"], valid_set=solver_params["valid_set"]
     )
     # Verify data
-    nb_class_false = 0
-    nb_class_tot = 0
-    for category_real, grades_set_real in data_true_classified.items():
-        nb_class_tot += len(grades_set_real)
-        for grades_real in grades_set_real:
-            category_classified = classifier_solver.classify_one(grades_real)
-            if category_classified != category_real:
-                nb_class_false += 1
-    assert nb_class_false / nb_class_tot <= ecart
+    grades, true_classes = stack_classified(data_true_classified)
+    pred_classes = classifier_solver.classify_many(grades)
+    assert (pred_classes != true_classes).mean() <= ecart
 
 
 def test_basic():
@@ -0,0 +1,116 @@
+import numpy as np
+from src.mr_sort.binary_classifier import BinaryClassifier
+from src.mr_sort.classifier import Classifier
+from src.mr_sort.generator import Generator
+from src.ncs.classifier import Classifier as NcsClassifier
+from src.ncs.interval_classifier import IntervalClassifier
+from src.scoring.parallel import classify_parallel
+from src.scoring.scorer import compile_scorer
+from src.scoring.streaming import classify_stream, evaluate_stream
+
+
+def test_classify_stream(tmp_path):
+    """
+    La classification par blocs d'un fichier .npy donne les mêmes étiquettes que classify_many
+    """
+    data = np.random.randint(0, 21, size=(1000, 5))
+    np.save(tmp_path / "grades.npy", data)
+    for classifier in [
+        Classifier(borders=[[10] * 5, [15] * 5], poids=[0.2] * 5, lam=0.6),
+        BinaryClassifier(border=[12] * 5, poids=[0.2] * 5, lam=0.6),
+        NcsClassifier(borders=[[12] * 5], valid_set=[[1, 3], [2, 4]]),
+    ]:
+        labels = classify_stream(
+            classifier, tmp_path / "grades.npy", tmp_path / "labels.npy", chunk_size=64
+        )
+        assert list(labels) == list(classifier.classify_many(data))
+        assert list(np.load(tmp_path / "labels.npy")) == list(labels)
+
+
+def test_classify_stream_many_categories(tmp_path):
+    """
+    Le fichier d'étiquettes peut contenir plus de 127 catégories
+    """
+    classifier = Classifier(borders=[[h] for h in range(1, 201)], poids=[1], lam=0.5)
+    data = np.array([[150], [0], [200]])
+    np.save(tmp_path / "grades.npy", data)
+    labels = classify_stream(
+        classifier, tmp_path / "grades.npy", tmp_path / "labels.npy"
+    )
+    assert labels.dtype == np.int16
+    assert list(np.load(tmp_path / "labels.npy")) == [150, 0, 200]
+
+
+def test_classify_parallel():
+    """
+    La classification répartie sur plusieurs processus donne les mêmes étiquettes que classify_many
+    """
+    data = np.random.randint(0, 21, size=(5000, 5))
+    for classifier in [
+        Classifier(borders=[[10] * 5, [15] * 5], poids=[0.2] * 5, lam=0.6),
+        BinaryClassifier(border=[12] * 5, poids=[0.2] * 5, lam=0.6),
+        NcsClassifier(borders=[[12] * 5], valid_set=[[1, 3], [2, 4]]),
+        IntervalClassifier(borders=[([8] * 5, [12] * 5)], valid_set=[[1, 3]]),
+    ]:
+        labels, stats = classify_parallel(
+            classifier, data, nb_workers=2, chunk_size=700
+        )
+        assert list(labels) == list(classifier.classify_many(data))
+        assert sum(worker["rows"] for worker in stats) == len(data)
+
+
+def test_classify_parallel_many_categories():
+    """
+    Les étiquettes réparties sur plusieurs processus peuvent dépasser 127 catégories
+    """
+    classifier = Classifier(borders=[[h] for h in range(1, 201)], poids=[1], lam=0.5)
+    labels, _ = classify_parallel(
+        classifier, np.array([[150], [0], [200]]), nb_workers=2, chunk_size=2
+    )
+    assert labels.dtype == np.int16
+    assert list(labels) == [150, 0, 200]
+
+
+def test_compiled_scorer():
+    """
+    Les classifieurs ligne par ligne compilés renvoient le même résultat que classify_one
+    """
+    data = np.random.randint(0, 21, size=(300, 5))
+    for classifier in [
+        Classifier(
+            borders=[[10] * 5, [15] * 5], poids=[0.1, 0.2, 0.3, 0.15, 0.25], lam=0.6
+        ),
+        BinaryClassifier(border=[12] * 5, poids=[0.2] * 5, lam=0.6),
+        NcsClassifier(borders=[[10] * 5, [14] * 5], valid_set=[[1, 3], [2, 4, 5]]),
+        IntervalClassifier(borders=[([8] * 5, [12] * 5)], valid_set=[[1, 3]]),
+    ]:
+        scorer = compile_scorer(classifier)
+        for row in data:
+            assert scorer.classify_one(row) == classifier.classify_one(row)
+            assert scorer.classify_one(row.tolist()) == classifier.classify_one(row)
+
+    classifier = NcsClassifier(borders=[[12] * 24], valid_set=[[1, 3], [2, 24]])
+    scorer = compile_scorer(classifier)
+    for row in np.random.randint(0, 21, size=(300, 24)):
+        assert scorer.classify_one(row) == classifier.classify_one(row)
+
+    # avec une frontière infinie et des notes réelles
+    poids = np.random.dirichlet(np.ones(24))
+    classifier = Classifier(
+        borders=[[10.5] * 23 + [np.inf], [14.25] * 24], poids=poids, lam=0.55
+    )
+    scorer = compile_scorer(classifier)
+    for row in np.random.random((300, 24)) * 20:
+        assert scorer.classify_one(row) == classifier.classify_one(row)
+
+
+def test_evaluate_stream():
+    """
+    Le classifieur du générateur ne fait aucune erreur sur le flux de blocs non bruités
+    """
+    generator = Generator(seed=0)
+    stats = evaluate_stream(
+        generator.classifier, generator.iter_generate(1000, total=4500)
+    )
+    assert stats["rows"] == 4500
+    assert stats["errors"] == 0